@@ -1,5 +1,7 @@
 """
 ASGI config for HCMS Payor Backend project.
+Serve with an ASGI server (e.g. `uvicorn asgi:application`) so the async endpoints
+under /api/async/ run on the event loop instead of a worker thread per request.
 """
 
 import os
@@ -0,0 +1,281 @@
+"""
+Materialized claim analytics for the HCMS Payor Backend
+Monthly buckets are aggregated from claims_<payor_id> into analytics_<payor_id>; each
+refresh only recomputes the months touched since the last refresh watermark
+"""
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+from .models import CLAIM_AMOUNT_EXPR, MongoConnection
+
+logger = logging.getLogger(__name__)
+
+
+WATERMARK_ID = '_watermark'
+MONTH_FORMAT = '%Y-%m'
+
+# Statuses whose amount counts as paid; partial approvals pay decision.approved_amount
+PAID_STATUSES = ['approved', 'partially_approved']
+DENIED_STATUSES = ['rejected', 'denied']
+
+PAID_AMOUNT_EXPR = {
+    '$cond': [
+        {'$in': ['$status', PAID_STATUSES]},
+        {'$ifNull': ['$decision.approved_amount', CLAIM_AMOUNT_EXPR]},
+        0
+    ]
+}
+
+
+def month_key(value):
+    """Bucket key ('YYYY-MM') for a datetime"""
+    return value.strftime(MONTH_FORMAT)
+
+
+def month_bounds(key):
+    """[start, end) datetimes covered by a bucket key"""
+    start = datetime.strptime(key, MONTH_FORMAT)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def recent_month_keys(months, now=None):
+    """Bucket keys for the last `months` months, oldest first"""
+    current = (now or datetime.utcnow()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    keys = []
+    for _ in range(months):
+        keys.append(month_key(current))
+        current = (current - timedelta(days=1)).replace(day=1)
+    return list(reversed(keys))
+
+
+class ClaimAnalyticsRollup:
+    """Monthly claim, approval, procedure and payment rollups for one payor"""
+    
+    def __init__(self, payor_id):
+        self.db = MongoConnection.get_database()
+        self.payor_id = payor_id
+        # Claims and the refresh watermark are read from the primary so the watermark never runs ahead
+        # of replication or of the buckets it covers; only dashboard bucket reads may use a secondary
+        self.claims_collection = self.db[f"claims_{payor_id}"]
+        self.collection = self.db[f"analytics_{payor_id}"]
+        self.read_collection = MongoConnection.get_database('analytics')[f"analytics_{payor_id}"]
+        
+        rollup_settings = getattr(settings, 'ANALYTICS_ROLLUP', {})
+        self.refresh_seconds = rollup_settings.get('REFRESH_SECONDS', 300)
+        self.refresh_lease = timedelta(seconds=rollup_settings.get('REFRESH_LEASE_SECONDS', 120))
+        self.top_procedures_per_month = rollup_settings.get('TOP_PROCEDURES_PER_MONTH', 50)
+        # Re-read writes this close to the watermark to tolerate clock skew between app servers
+        self.overlap = timedelta(seconds=rollup_settings.get('WATERMARK_OVERLAP_SECONDS', 5))
+    
+    def _bucket_pipeline(self, match):
+        return [
+            {'$match': match},
+            {'$addFields': {
+                '_month': {'$dateToString': {'format': MONTH_FORMAT, 'date': '$submitted_date'}},
+                '_amount': CLAIM_AMOUNT_EXPR,
+                '_paid': PAID_AMOUNT_EXPR
+            }},
+            {'$facet': {
+                'months': [
+                    {'$group': {
+                        '_id': '$_month',
+                        'claims': {'$sum': 1},
+                        'approved': {'$sum': {'$cond': [{'$in': ['$status', PAID_STATUSES]}, 1, 0]}},
+                        'denied': {'$sum': {'$cond': [{'$in': ['$status', DENIED_STATUSES]}, 1, 0]}},
+                        'total_amount': {'$sum': '$_amount'},
+                        'paid_amount': {'$sum': '$_paid'}
+                    }}
+                ],
+                'procedures': [
+                    {'$match': {'procedure_code': {'$nin': [None, '']}}},
+                    {'$group': {
+                        '_id': {'month': '$_month', 'code': '$procedure_code'},
+                        'name': {'$first': '$procedure_description'},
+                        'count': {'$sum': 1}
+                    }},
+                    {'$sort': {'count': -1}}
+                ]
+            }}
+        ]
+    
+    def _touched_months(self, since):
+        """Bucket keys of claims written after `since`"""
+        pipeline = [
+            {'$match': {'last_updated': {'$gt': since}, 'submitted_date': {'$type': 'date'}}},
+            {'$group': {'_id': {'$dateToString': {'format': MONTH_FORMAT, 'date': '$submitted_date'}}}}
+        ]
+        return sorted(doc['_id'] for doc in self.claims_collection.aggregate(pipeline))
+    
+    def _build_buckets(self, months=None):
+        """Aggregate bucket documents for the given months, or for all history"""
+        match = {'submitted_date': {'$type': 'date'}}
+        if months is not None:
+            match['$or'] = [
+                {'submitted_date': {'$gte': start, '$lt': end}}
+                for start, end in (month_bounds(key) for key in months)
+            ]
+        
+        result = list(self.claims_collection.aggregate(self._bucket_pipeline(match)))
+        facets = result[0] if result else {'months': [], 'procedures': []}
+        
+        procedures = {}
+        for doc in facets['procedures']:
+            month_procedures = procedures.setdefault(doc['_id']['month'], [])
+            if len(month_procedures) < self.top_procedures_per_month:
+                month_procedures.append({
+                    'code': doc['_id']['code'],
+                    'name': doc.get('name') or '',
+                    'count': doc['count']
+                })
+        
+        now = datetime.utcnow()
+        buckets = {}
+        for doc in facets['months']:
+            buckets[doc['_id']] = {
+                '_id': doc['_id'],
+                'claims': doc['claims'],
+                'approved': doc['approved'],
+                'denied': doc['denied'],
+                'total_amount': doc['total_amount'],
+                'paid_amount': doc['paid_amount'],
+                'procedures': procedures.get(doc['_id'], []),
+                'refreshed_at': now
+            }
+        
+        # Months whose claims all disappeared still need their bucket reset
+        for key in months or []:
+            buckets.setdefault(key, {
+                '_id': key, 'claims': 0, 'approved': 0, 'denied': 0,
+                'total_amount': 0, 'paid_amount': 0, 'procedures': [], 'refreshed_at': now
+            })
+        return buckets
+    
+    def refresh(self, full=False):
+        """Recompute buckets touched since the watermark, or every bucket when full"""
+        started = datetime.utcnow()
+        watermark = None if full else self.collection.find_one({'_id': WATERMARK_ID})
+        
+        if watermark is None or 'refreshed_through' not in watermark:
+            months = None
+        else:
+            months = self._touched_months(watermark['refreshed_through'] - self.overlap)
+            if not months:
+                self._set_watermark(started)
+                return 0
+        
+        buckets = self._build_buckets(months)
+        if buckets:
+            self.collection.bulk_write(
+                [ReplaceOne({'_id': key}, bucket, upsert=True) for key, bucket in buckets.items()],
+                ordered=False
+            )
+        
+        if months is None:
+            # Full rebuilds also drop buckets for months that no longer have claims
+            self.collection.delete_many({'_id': {'$nin': list(buckets) + [WATERMARK_ID]}})
+        
+        self._set_watermark(started)
+        logger.info(f"Refreshed {len(buckets)} analytics bucket(s) for payor {self.payor_id}")
+        return len(buckets)
+    
+    def _set_watermark(self, refreshed_through):
+        # The watermark is the refresh start time so writes made during the refresh are picked up next time
+        self.collection.update_one(
+            {'_id': WATERMARK_ID},
+            {
+                '$set': {'refreshed_through': refreshed_through, 'last_refresh': datetime.utcnow()},
+                '$unset': {'refreshing_until': ''}
+            },
+            upsert=True
+        )
+    
+    def _acquire_refresh_lease(self, now):
+        """Claim the stale watermark for one refresher; False when it is fresh or another request holds it"""
+        lease = {'$set': {'refreshing_until': now + self.refresh_lease}}
+        claimed = self.collection.find_one_and_update(
+            {
+                '_id': WATERMARK_ID,
+                # $not also matches watermarks that have never been refreshed or leased
+                'last_refresh': {'$not': {'$gte': now - timedelta(seconds=self.refresh_seconds)}},
+                'refreshing_until': {'$not': {'$gt': now}}
+            },
+            lease
+        )
+        if claimed is not None:
+            return True
+        
+        # First refresh for this payor: whoever inserts the watermark refreshes
+        try:
+            self.collection.insert_one({'_id': WATERMARK_ID, **lease['$set']})
+            return True
+        except DuplicateKeyError:
+            return False
+    
+    def refresh_if_stale(self):
+        """
+        Refresh when the last refresh is older than REFRESH_SECONDS
+        A lease on the watermark lets one request refresh while concurrent ones serve the existing buckets
+        """
+        if not self._acquire_refresh_lease(datetime.utcnow()):
+            return 0
+        
+        try:
+            return self.refresh()
+        except Exception:
+            self.collection.update_one({'_id': WATERMARK_ID}, {'$unset': {'refreshing_until': ''}})
+            raise
+    
+    def get_analytics(self, months=6, top_n=10):
+        """Claims trend, top procedures and cost analysis for the last `months` months"""
+        self.refresh_if_stale()
+        
+        keys = recent_month_keys(months)
+        buckets = {
+            doc['_id']: doc
+            for doc in self.read_collection.find({'_id': {'$gte': keys[0], '$lte': keys[-1]}})
+        }
+        
+        claims_trend = []
+        monthly_paid = []
+        procedure_counts = {}
+        procedure_names = {}
+        total_claims = 0
+        total_amount = 0
+        
+        for key in keys:
+            bucket = buckets.get(key, {})
+            claims_trend.append({
+                'month': datetime.strptime(key, MONTH_FORMAT).strftime('%b'),
+                'period': key,
+                'claims': bucket.get('claims', 0),
+                'approved': bucket.get('approved', 0),
+                'denied': bucket.get('denied', 0)
+            })
+            monthly_paid.append(bucket.get('paid_amount', 0))
+            total_claims += bucket.get('claims', 0)
+            total_amount += bucket.get('total_amount', 0)
+            
+            for procedure in bucket.get('procedures', []):
+                code = procedure['code']
+                procedure_counts[code] = procedure_counts.get(code, 0) + procedure['count']
+                procedure_names.setdefault(code, procedure.get('name', ''))
+        
+        top_codes = sorted(procedure_counts, key=procedure_counts.get, reverse=True)[:top_n]
+        
+        return {
+            'claims_trend': claims_trend,
+            'top_procedures': [
+                {'code': code, 'name': procedure_names[code], 'count': procedure_counts[code]}
+                for code in top_codes
+            ],
+            'cost_analysis': {
+                'total_paid': sum(monthly_paid),
+                'average_claim_amount': round(total_amount / total_claims, 2) if total_claims else 0,
+                'monthly_trend': monthly_paid
+            }
+        }
@@ -0,0 +1,99 @@
+"""
+Async MongoDB access for the ASGI views of the HCMS Payor Backend
+A Motor client built from the same MONGODB_SETTINGS as MongoConnection, plus the few
+read helpers the async endpoints need; all writes stay on the synchronous models
+"""
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .models import CLAIM_PAGE_SORT, ClaimModel, ClaimStatsModel, MongoConnection
+from .pagination import fetch_page_async
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:  # motor is only required by the async endpoints
+    AsyncIOMotorClient = None
+
+
+class AsyncMongoConnection:
+    """Motor counterpart of MongoConnection; one client per live event loop"""
+    _clients = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def get_database(cls, workload=None):
+        """Motor database handle, with the read preference configured for a workload"""
+        if AsyncIOMotorClient is None:
+            raise ImproperlyConfigured("The async endpoints require the 'motor' package")
+        
+        # Motor clients are bound to the loop they were first used on. Under ASGI that is the
+        # server's loop; the WSGI dev server runs each async view in a fresh loop instead, so
+        # clients whose loop has closed are closed here rather than left holding their pools.
+        loop = asyncio.get_running_loop()
+        mongodb_settings = getattr(settings, 'MONGODB_SETTINGS', {})
+        host, database_name = MongoConnection.connection_target(mongodb_settings)
+        
+        with cls._lock:
+            client = cls._clients.get(loop)
+            if client is None:
+                for stale_loop in [stale_loop for stale_loop in cls._clients if stale_loop.is_closed()]:
+                    cls._clients.pop(stale_loop).close()
+                client = AsyncIOMotorClient(
+                    host,
+                    event_listeners=[MongoConnection._pool_listener],
+                    **MongoConnection._client_options(mongodb_settings)
+                )
+                cls._clients[loop] = client
+        
+        if workload is None:
+            return client[database_name]
+        return client.get_database(database_name, read_preference=MongoConnection.get_read_preference(workload))
+    
+    @classmethod
+    def close_connection(cls):
+        with cls._lock:
+            for client in cls._clients.values():
+                client.close()
+            cls._clients = {}
+
+
+async def get_claim_stats(payor_id):
+    """ClaimStatsModel.get_stats over Motor; the first-access rebuild runs on the sync model"""
+    stats = await AsyncMongoConnection.get_database().claim_stats.find_one({'_id': payor_id})
+    if stats is None:
+        return await sync_to_async(ClaimStatsModel().rebuild)(payor_id)
+    return ClaimStatsModel.from_document(stats)
+
+
+async def get_claims_page(payor_id, page=1, limit=20, cursor=None, projection=None):
+    """
+    Keyset page of a payor's claims, returning (claims, next_cursor)
+    Numbered pages beyond 1 without a cursor fall back to skip/limit, as in the sync views
+    """
+    collection = AsyncMongoConnection.get_database()[f"claims_{payor_id}"]
+    query = {'payor_id': payor_id}
+    
+    if cursor or page <= 1:
+        return await fetch_page_async(collection, query, CLAIM_PAGE_SORT, cursor=cursor, limit=limit, projection=projection)
+    
+    claims = await (
+        collection.find(query, projection)
+        .sort(CLAIM_PAGE_SORT)
+        .skip((page - 1) * limit)
+        .limit(limit)
+        .to_list(length=limit)
+    )
+    next_cursor = ClaimModel.page_cursor(claims[-1]) if len(claims) == limit else None
+    return claims, next_cursor
+
+
+async def count_active_members(payor_id):
+    return await AsyncMongoConnection.get_database()[f"members_{payor_id}"].count_documents({'is_active': True})
+
+
+async def get_policies(payor_id):
+    return await AsyncMongoConnection.get_database()[f"policies_{payor_id}"].find({}).to_list(length=None)
@@ -0,0 +1,172 @@
+"""
+Async (ASGI) variants of the hot read endpoints for the HCMS Payor Backend
+Plain async Django views over Motor, so a worker keeps serving other requests while it
+waits on MongoDB; responses match the synchronous DRF views they mirror
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+
+from .async_db import count_active_members, get_claim_stats, get_claims_page, get_policies
+from .authentication import resolve_payor
+from .models import CLAIM_PROJECTIONS
+from .renderers import BSONJSONRenderer
+from .views import (
+    ClaimSerializer, _dashboard_metrics, _dashboard_pagination, _get_claim_projection,
+    _health_status, _list_claim, _summarize_claim_stats
+)
+
+logger = logging.getLogger(__name__)
+
+_renderer = BSONJSONRenderer()
+
+
+def _json_response(data, status=200):
+    """Encode MongoDB documents with the same renderer the DRF views use"""
+    return HttpResponse(_renderer.render(data), content_type='application/json', status=status)
+
+
+def _method_not_allowed(request):
+    return _json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+
+async def _get_payor_id(request):
+    """Payor id from the JWT or legacy headers; credential checks may query MongoDB, so run off the loop"""
+    identity = await sync_to_async(resolve_payor)(request.headers)
+    return identity.get('payor_id') if identity else None
+
+
+def _unauthorized():
+    return _json_response(
+        {'error': 'Authentication required. Please provide valid credentials.'},
+        status=401
+    )
+
+
+async def health_check(request):
+    """Health check endpoint for monitoring"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    return _json_response(_health_status())
+
+
+async def claims_list(request):
+    """Get claims for the authenticated payor"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    
+    try:
+        payor_id = await _get_payor_id(request)
+        if not payor_id:
+            return _unauthorized()
+        
+        page = int(request.GET.get('page', 1))
+        limit = int(request.GET.get('limit', 20))
+        cursor = request.GET.get('cursor')
+        
+        try:
+            projection = _get_claim_projection(request, 'summary')
+            # The page and the total are independent reads
+            (claims, next_cursor), claim_stats = await asyncio.gather(
+                get_claims_page(payor_id, page, limit, cursor, projection),
+                get_claim_stats(payor_id)
+            )
+        except ValueError as e:
+            return _json_response({'error': str(e)}, status=400)
+        
+        return _json_response({
+            'success': True,
+            'results': [_list_claim(claim) for claim in claims],
+            'page': page,
+            'limit': limit,
+            'total': claim_stats['total_claims'],
+            'next_cursor': next_cursor,
+            'payor_id': payor_id
+        })
+    
+    except Exception as e:
+        logger.error(f"Error in async claims_list: {str(e)}")
+        return _json_response({'error': 'Failed to load claims. Please try again.'}, status=500)
+
+
+async def claims_summary(request):
+    """Get claims summary for the authenticated payor"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    
+    try:
+        payor_id = await _get_payor_id(request)
+        if not payor_id:
+            return _unauthorized()
+        
+        claim_stats = await get_claim_stats(payor_id)
+        return _json_response({
+            'success': True,
+            'summary': _summarize_claim_stats(claim_stats),
+            'payor_id': payor_id
+        })
+    
+    except Exception as e:
+        logger.error(f"Error in async claims_summary: {str(e)}")
+        return _json_response({'error': 'Failed to load claims summary. Please try again.'}, status=500)
+
+
+async def policies(request):
+    """Get policies for the authenticated payor"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    
+    try:
+        payor_id = await _get_payor_id(request)
+        if not payor_id:
+            return _unauthorized()
+        
+        payor_policies = await get_policies(payor_id)
+        return _json_response({
+            'success': True,
+            'count': len(payor_policies),
+            'policies': payor_policies,
+            'payor_id': payor_id
+        })
+    
+    except Exception as e:
+        logger.error(f"Error in async policies: {str(e)}")
+        return _json_response({'error': 'Failed to load policies. Please try again.'}, status=500)
+
+
+async def dashboard(request):
+    """Get dashboard data for the authenticated payor"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    
+    try:
+        payor_id = await _get_payor_id(request)
+        if not payor_id:
+            return _unauthorized()
+        
+        page = int(request.GET.get('page', 1))
+        page_size = int(request.GET.get('page_size', 20))
+        cursor = request.GET.get('cursor')
+        
+        # Counters, member count and the claims page are independent reads; issue them together
+        try:
+            claim_metrics, active_members, (claims, next_cursor) = await asyncio.gather(
+                get_claim_stats(payor_id),
+                count_active_members(payor_id),
+                get_claims_page(payor_id, page, page_size, cursor, CLAIM_PROJECTIONS['summary'])
+            )
+        except ValueError as e:
+            return _json_response({'error': str(e)}, status=400)
+        
+        metrics = _dashboard_metrics(claim_metrics, active_members)
+        return _json_response({
+            'metrics': metrics,
+            'claims': [ClaimSerializer.serialize(claim) for claim in claims],
+            'pagination': _dashboard_pagination(page, page_size, metrics['total_claims'], next_cursor)
+        })
+    
+    except Exception as e:
+        logger.error(f"Error in async dashboard: {str(e)}")
+        return _json_response({'error': 'Internal server error'}, status=500)
@@ -0,0 +1,170 @@
+"""
+Payor authentication for the HCMS Payor Backend
+Resolves the calling payor from a Bearer JWT or the legacy X-Payor-Email/X-Payor-Password
+headers, caching decoded tokens and verified credentials in-process
+"""
+import hashlib
+import logging
+import time
+
+import jwt
+from django.conf import settings
+from rest_framework.authentication import BaseAuthentication
+
+from .cache import TTLCache
+from .models import PayorModel
+
+logger = logging.getLogger(__name__)
+
+
+class PayorUser:
+    """Custom user class for payor authentication with JWT"""
+    def __init__(self, payor_data):
+        self.id = payor_data.get('payor_id')
+        self.payor_id = payor_data.get('payor_id')
+        self.email = payor_data.get('email')
+        self.name = payor_data.get('name')
+        self.organization = payor_data.get('organization')
+        self.is_active = payor_data.get('is_active', True)
+        self.is_authenticated = True
+    
+    @property
+    def is_anonymous(self):
+        return False
+
+
+_auth_cache_settings = getattr(settings, 'PAYOR_AUTH_CACHE', {})
+
+# Decoded JWT identities keyed by token digest
+_token_cache = TTLCache(
+    max_entries=_auth_cache_settings.get('MAX_ENTRIES', 10000),
+    ttl_seconds=_auth_cache_settings.get('TTL_SECONDS', 300)
+)
+
+# Verified header credentials keyed by digest of email and password (never the password itself)
+_credential_cache = TTLCache(
+    max_entries=_auth_cache_settings.get('MAX_ENTRIES', 10000),
+    ttl_seconds=_auth_cache_settings.get('TTL_SECONDS', 300)
+)
+
+# Failed header logins are remembered briefly so retries don't hit MongoDB
+_NEGATIVE_TTL_SECONDS = _auth_cache_settings.get('NEGATIVE_TTL_SECONDS', 30)
+
+
+def _digest(*parts):
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _identity(payor_id, email=None, name=None, organization=None):
+    return {
+        'payor_id': payor_id,
+        'email': email,
+        'name': name,
+        'organization': organization
+    }
+
+
+def _payor_from_token(token):
+    """Decode a Bearer token, reusing the cached identity when available"""
+    key = _digest(token)
+    identity = _token_cache.get(key)
+    if identity is not None:
+        return identity
+    
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        logger.warning("JWT token expired")
+        return None
+    except jwt.InvalidTokenError as e:
+        logger.warning(f"Invalid JWT token: {e}")
+        return None
+    
+    if not payload.get('user_id'):
+        return None
+    
+    identity = _identity(
+        payload['user_id'],
+        payload.get('email'),
+        payload.get('name'),
+        payload.get('organization')
+    )
+    
+    # Never serve a token from cache past its own expiry
+    ttl = _token_cache.ttl_seconds
+    if payload.get('exp'):
+        ttl = min(ttl, payload['exp'] - time.time())
+    _token_cache.set(key, identity, ttl=ttl)
+    
+    return identity
+
+
+def _payor_from_credentials(email, password):
+    """Verify header credentials, reusing the cached result when available"""
+    key = _digest(email, password)
+    identity = _credential_cache.get(key)
+    if identity is not None:
+        return identity or None
+    
+    payor = PayorModel().authenticate(email, password)
+    if not payor:
+        _credential_cache.set(key, {}, ttl=_NEGATIVE_TTL_SECONDS)
+        return None
+    
+    identity = _identity(
+        payor.get('payor_id'),
+        payor.get('email'),
+        payor.get('name'),
+        payor.get('organization')
+    )
+    _credential_cache.set(key, identity)
+    return identity
+
+
+def resolve_payor(headers):
+    """Resolve the payor identity from request headers, or None"""
+    try:
+        # Try JWT authentication first
+        auth_header = headers.get('Authorization')
+        if auth_header and auth_header.startswith('Bearer '):
+            identity = _payor_from_token(auth_header.split(' ')[1])
+            if identity:
+                return identity
+        
+        # Fall back to custom headers for backward compatibility
+        payor_email = headers.get('X-Payor-Email')
+        payor_password = headers.get('X-Payor-Password')
+        
+        if payor_email and payor_password:
+            return _payor_from_credentials(payor_email, payor_password)
+        
+        return None
+        
+    except Exception as e:
+        logger.error(f"Error extracting payor_id: {str(e)}")
+        return None
+
+
+def get_auth_cache_stats():
+    """Hit/miss counters for the authentication caches"""
+    return {
+        'tokens': _token_cache.stats(),
+        'credentials': _credential_cache.stats()
+    }
+
+
+class PayorAuthentication(BaseAuthentication):
+    """
+    DRF authentication class for payor API requests
+    Returns None (anonymous) when no valid credentials are supplied so views keep
+    their own 401 responses
+    """
+    
+    def authenticate(self, request):
+        identity = resolve_payor(request.headers)
+        if not identity:
+            return None
+        return (PayorUser(identity), None)
+    
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
@@ -0,0 +1,130 @@
+"""
+Claim detail assembly for the HCMS Payor Backend
+The claim review detail combines the claim with its member, policy, notifications and
+pre-authorization; independent lookups run concurrently on a shared thread pool so the
+response waits on the slowest query rather than the sum of them
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .models import ClaimModel, MemberModel, NotificationModel, PolicyModel, PreAuthorizationModel
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide pool for claim detail lookups (PyMongo releases the GIL while waiting on I/O)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'CLAIM_DETAIL', {}).get('WORKERS', 16)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='claim-detail')
+    return _executor
+
+
+def _first(*values):
+    return next((value for value in values if value), None)
+
+
+class ClaimDetailAssembler:
+    """Fetch a claim and its related documents for the review detail view"""
+    
+    def __init__(self, payor_id):
+        self.payor_id = payor_id
+        self.claim_model = ClaimModel(payor_id=payor_id)
+        self.member_model = MemberModel(payor_id=payor_id)
+        self.policy_model = PolicyModel(payor_id=payor_id)
+        self.preauth_model = PreAuthorizationModel(payor_id=payor_id)
+        self.notification_model = NotificationModel()
+    
+    def _find_claim(self, claim_id):
+        return self.claim_model.collection.find_one(self.claim_model._claim_query(claim_id))
+    
+    def _find_related(self, claim_id):
+        return (
+            self.notification_model.get_notifications_for_claim(claim_id, payor_id=self.payor_id),
+            self.preauth_model.get_by_claim_id(claim_id)
+        )
+    
+    def assemble(self, claim_id):
+        """Detail document for a claim (by claim_id or _id), or None if the payor has no such claim"""
+        executor = get_executor()
+        
+        # Notifications and pre-auth are keyed by the business claim_id, so they can start with the claim read
+        claim_future = executor.submit(self._find_claim, claim_id)
+        related_future = executor.submit(self._find_related, claim_id)
+        
+        claim = claim_future.result()
+        if claim is None:
+            related_future.cancel()
+            return None
+        
+        # Member and policy keys come from the claim; the policy can be found without waiting on the member
+        # unless only the member knows it
+        member_future = executor.submit(self.member_model.get_for_claim, claim)
+        policy = self.policy_model.get_for_claim(claim)
+        member = member_future.result()
+        if policy is None and member and (member.get('policy_id') or member.get('policy_number')):
+            policy = self.policy_model.get_for_claim(claim, member)
+        
+        notifications, preauth = related_future.result()
+        if claim.get('claim_id') != claim_id:
+            # Looked up by _id: the related documents need the business claim_id
+            notifications, preauth = self._find_related(claim.get('claim_id'))
+        
+        return self.build(claim, member, policy, notifications, preauth)
+    
+    @staticmethod
+    def build(claim, member, policy, notifications, preauth):
+        """Combine the fetched documents into the review detail shape"""
+        diagnosis_codes = claim.get('diagnosis_codes') or [code for code in [claim.get('diagnosis_code')] if code]
+        procedure_codes = claim.get('procedure_codes') or [code for code in [claim.get('procedure_code')] if code]
+        total_amount = claim.get('total_amount', claim.get('amount', 0))
+        
+        return {
+            'claim_id': claim.get('claim_id'),
+            'status': claim.get('status'),
+            'patient_info': {
+                'name': claim.get('patient_name'),
+                'member_id': _first(claim.get('member_id'), member and member.get('member_id')),
+                'dob': member.get('date_of_birth') if member else None,
+                'phone': member.get('phone_number') if member else None
+            },
+            'provider_info': {
+                'name': claim.get('provider_name'),
+                'npi': claim.get('provider_npi'),
+                'address': claim.get('provider_address')
+            },
+            'clinical_info': {
+                'diagnosis_codes': diagnosis_codes,
+                'procedure_codes': procedure_codes,
+                'service_date': _first(claim.get('service_date'), claim.get('date_of_service')),
+                'service_description': _first(claim.get('service_description'), claim.get('procedure_description'))
+            },
+            'financial_info': {
+                'billed_amount': claim.get('billed_amount', total_amount),
+                'covered_amount': claim.get('covered_amount', 0),
+                'patient_responsibility': claim.get('patient_responsibility', 0),
+                'total_amount': total_amount
+            },
+            'timeline': claim.get('timeline') or claim.get('audit_trail', []),
+            'policy_info': {
+                'policy_id': policy.get('policy_id') if policy else None,
+                'policy_number': _first(policy and policy.get('policy_number'), member and member.get('policy_number')),
+                'coverage_type': _first(policy and policy.get('coverage_type'), policy and policy.get('policy_type')),
+                'deductible_remaining': policy.get('deductible_remaining') if policy else None
+            },
+            'preauth': preauth,
+            'notifications': notifications,
+            'preauth_required': claim.get('preauth_required', False),
+            'preauth_status': claim.get('preauth_status'),
+            'urgency_level': claim.get('urgency_level', 'routine'),
+            'decision': claim.get('decision'),
+            'submitted_date': claim.get('submitted_date'),
+            'last_updated': claim.get('last_updated')
+        }
@@ -0,0 +1,208 @@
+"""
+Compiled policy coverage matching for the HCMS Payor Backend
+Policies are compiled once into frozensets of exact ICD-10/CPT codes plus prefix tries
+for range rules such as `E11.*`, and cached per process. Cached policies are
+revalidated against the stored `last_updated` stamp instead of refetched per check.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_POLICY_CACHE_SETTINGS = {
+    'MAX_ENTRIES': 50000,
+    'TTL_SECONDS': 3600,
+    # How long a cached policy is trusted before its last_updated stamp is rechecked
+    'REVALIDATE_SECONDS': 30,
+}
+
+
+def normalize_code(code):
+    """Canonical form for ICD-10/CPT codes: upper case, no dots or whitespace"""
+    return str(code).strip().upper().replace('.', '')
+
+
+class CodeMatcher:
+    """Set of exact codes plus a prefix trie for wildcard rules like `E11.*`"""
+    __slots__ = ('exact', 'trie', 'empty')
+    
+    _TERMINAL = ''
+    
+    def __init__(self, codes):
+        exact = set()
+        self.trie = {}
+        for code in codes or []:
+            normalized = normalize_code(code)
+            if normalized.endswith('*'):
+                self._add_prefix(normalized.rstrip('*'))
+            elif normalized:
+                exact.add(normalized)
+        self.exact = frozenset(exact)
+        self.empty = not exact and not self.trie
+    
+    def _add_prefix(self, prefix):
+        node = self.trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self._TERMINAL] = True
+    
+    def __contains__(self, code):
+        normalized = normalize_code(code)
+        if normalized in self.exact:
+            return True
+        
+        node = self.trie
+        if self._TERMINAL in node:
+            return True
+        for char in normalized:
+            node = node.get(char)
+            if node is None:
+                return False
+            if self._TERMINAL in node:
+                return True
+        return False
+    
+    def __bool__(self):
+        return not self.empty
+
+
+class CompiledPolicy:
+    """Policy coverage rules compiled for O(1)-O(code length) checks"""
+    __slots__ = (
+        'policy_id', 'is_active', 'last_updated',
+        'covered_diagnoses', 'excluded_diagnoses',
+        'covered_procedures', 'excluded_procedures'
+    )
+    
+    def __init__(self, policy):
+        self.policy_id = policy.get('policy_id')
+        self.is_active = policy.get('is_active', False)
+        self.last_updated = policy.get('last_updated')
+        self.covered_diagnoses = CodeMatcher(policy.get('covered_diagnoses'))
+        self.excluded_diagnoses = CodeMatcher(policy.get('excluded_diagnoses'))
+        self.covered_procedures = CodeMatcher(policy.get('covered_procedures'))
+        self.excluded_procedures = CodeMatcher(policy.get('excluded_procedures'))
+    
+    def check(self, diagnosis_code=None, procedure_code=None):
+        """Check if a diagnosis/procedure is covered, returning (covered, message)"""
+        if not self.is_active:
+            return False, "Policy is inactive"
+        
+        # Check diagnosis codes (ICD-10)
+        if diagnosis_code:
+            if diagnosis_code in self.excluded_diagnoses:
+                return False, f"Diagnosis {diagnosis_code} is explicitly excluded"
+            
+            # Check if diagnosis is covered (if list exists and is not empty)
+            if self.covered_diagnoses and diagnosis_code not in self.covered_diagnoses:
+                return False, f"Diagnosis {diagnosis_code} not covered under this policy"
+        
+        # Check procedure codes (CPT)
+        if procedure_code:
+            if procedure_code in self.excluded_procedures:
+                return False, f"Procedure {procedure_code} is explicitly excluded"
+            
+            if self.covered_procedures and procedure_code not in self.covered_procedures:
+                return False, f"Procedure {procedure_code} not covered under this policy"
+        
+        return True, "Coverage validated successfully"
+
+
+def check_policy_coverage(compiled_policy, diagnosis_code=None, procedure_code=None):
+    """Coverage check that treats a missing policy like PolicyModel.check_coverage does"""
+    if compiled_policy is None:
+        return False, "Policy not found"
+    return compiled_policy.check(diagnosis_code, procedure_code)
+
+
+class PolicyCoverageCache:
+    """Process-wide cache of compiled policies, keyed by policy collection and policy_id"""
+    
+    def __init__(self, config=None):
+        config = {**DEFAULT_POLICY_CACHE_SETTINGS, **(config or {})}
+        self.revalidate_seconds = config['REVALIDATE_SECONDS']
+        # Entries: (compiled policy or None when not found, monotonic time last verified)
+        self._entries = TTLCache(
+            max_entries=config['MAX_ENTRIES'],
+            ttl_seconds=config['TTL_SECONDS']
+        )
+    
+    def get_many(self, collection, policy_ids):
+        """Compiled policies keyed by policy_id (None for missing policies)"""
+        now = time.monotonic()
+        results = {}
+        stale = {}
+        
+        for policy_id in set(policy_ids):
+            entry = self._entries.get((collection.name, policy_id))
+            if entry is None:
+                stale[policy_id] = None
+            elif now - entry[1] >= self.revalidate_seconds:
+                stale[policy_id] = entry[0]
+            else:
+                results[policy_id] = entry[0]
+        
+        if stale:
+            results.update(self._revalidate(collection, stale, now))
+        return results
+    
+    def get(self, collection, policy_id):
+        """Compiled policy, or None if the policy does not exist"""
+        return self.get_many(collection, [policy_id]).get(policy_id)
+    
+    def _revalidate(self, collection, stale, now):
+        # Cheap stamp check first; only changed or unseen policies are refetched in full
+        stamps = {
+            policy['policy_id']: policy.get('last_updated')
+            for policy in collection.find(
+                {'policy_id': {'$in': list(stale)}},
+                {'_id': 0, 'policy_id': 1, 'last_updated': 1}
+            )
+        }
+        
+        results = {}
+        refetch = []
+        for policy_id, cached in stale.items():
+            if policy_id not in stamps:
+                results[policy_id] = None
+            elif cached is not None and cached.last_updated is not None and cached.last_updated == stamps[policy_id]:
+                results[policy_id] = cached
+            else:
+                refetch.append(policy_id)
+        
+        if refetch:
+            for policy in collection.find({'policy_id': {'$in': refetch}}):
+                results[policy['policy_id']] = CompiledPolicy(policy)
+        
+        for policy_id, compiled in results.items():
+            self._entries.set((collection.name, policy_id), (compiled, now))
+        return results
+    
+    def invalidate(self, collection, policy_id):
+        self._entries.invalidate((collection.name, policy_id))
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self):
+        return self._entries.stats()
+
+
+_policy_cache = None
+_policy_cache_lock = threading.Lock()
+
+
+def get_policy_cache():
+    """Process-wide compiled policy cache"""
+    global _policy_cache
+    if _policy_cache is None:
+        with _policy_cache_lock:
+            if _policy_cache is None:
+                _policy_cache = PolicyCoverageCache(getattr(settings, 'POLICY_COVERAGE_CACHE', {}))
+    return _policy_cache
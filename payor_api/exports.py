@@ -0,0 +1,96 @@
+"""
+Streaming claim exports for the HCMS Payor Backend
+Claims are read from a batched Mongo cursor and encoded one row at a time, so memory
+use stays constant regardless of export size
+"""
+import csv
+import json
+from datetime import datetime
+
+from bson import Decimal128, ObjectId
+
+from .models import CLAIM_PAGE_SORT, ClaimModel, MongoConnection
+from .renderers import BSONJSONEncoder, encode_bson_value
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Flat reconciliation columns; CSV rows and the NDJSON projection share them
+EXPORT_FIELDS = [
+    'claim_id', 'payor_id', 'provider_id', 'provider_name', 'patient_name', 'patient_id',
+    'insurance_id', 'diagnosis_code', 'procedure_code', 'amount', 'total_amount', 'status',
+    'preauth_status', 'auto_approved', 'coverage_validated', 'date_of_service',
+    'submitted_date', 'last_updated'
+]
+
+EXPORT_PROJECTION = {'_id': 0, **{field: 1 for field in EXPORT_FIELDS}}
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def _encode_value(value):
+    """CSV cell value: ISO 8601 datetimes, ObjectId and Decimal128 as strings"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (ObjectId, Decimal128)):
+        return encode_bson_value(value)
+    return value
+
+
+class _LineBuffer:
+    """File-like object whose write() hands the encoded line back to the caller"""
+    
+    def write(self, value):
+        return value
+
+
+def build_export_query(payor_id, status=None, start=None, end=None, provider_id=None):
+    """Claims filter for an export; payor_id first so the (payor_id, submitted_date) index applies"""
+    query = {'payor_id': payor_id}
+    if status:
+        query['status'] = status
+    if start or end:
+        query['submitted_date'] = {}
+        if start:
+            query['submitted_date']['$gte'] = start
+        if end:
+            query['submitted_date']['$lt'] = end
+    if provider_id:
+        query['provider_id'] = provider_id
+    return query
+
+
+def iter_claims(payor_id, query, batch_size=EXPORT_BATCH_SIZE):
+    """Projected claims in listing order, fetched from the server in batches"""
+    # Long export scans are routed by the 'export' read preference, usually to a secondary
+    collection = ClaimModel(payor_id=payor_id).collection.with_options(
+        read_preference=MongoConnection.get_read_preference('export')
+    )
+    cursor = (
+        collection.find(query, EXPORT_PROJECTION)
+        .sort(CLAIM_PAGE_SORT)
+        .batch_size(batch_size)
+    )
+    try:
+        for claim in cursor:
+            yield claim
+    finally:
+        # Release the server cursor if the client disconnects mid-export
+        cursor.close()
+
+
+def iter_ndjson(claims):
+    """One JSON object per line, encoded like the API responses so no BSON type can fail mid-stream"""
+    for claim in claims:
+        yield json.dumps(claim, cls=BSONJSONEncoder) + '\n'
+
+
+def iter_csv(claims):
+    """Header row followed by one row per claim"""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(EXPORT_FIELDS)
+    for claim in claims:
+        yield writer.writerow([_encode_value(claim.get(field, '')) for field in EXPORT_FIELDS])
@@ -0,0 +1,124 @@
+"""
+Index registry for the HCMS Payor Backend
+Index definitions for every collection family live here and are applied once per
+collection per process instead of on every model instantiation
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+# Index specs per collection family. Payor-partitioned collections such as
+# members_PAY001 or claims_PAY002 share the spec of their family prefix.
+INDEX_SPECS = {
+    'payors': [
+        ([('payor_id', 1)], {'unique': True}),
+        ([('email', 1)], {'unique': True}),
+        ([('is_active', 1)], {}),
+    ],
+    'members': [
+        ([('member_id', 1)], {'unique': True}),
+        ([('insurance_id', 1)], {}),
+        ([('policy_number', 1)], {}),
+        ([('is_active', 1)], {}),
+    ],
+    'policies': [
+        ([('policy_id', 1)], {'unique': True}),
+        ([('policy_type', 1)], {}),
+        ([('is_active', 1)], {}),
+    ],
+    'notifications': [
+        ([('claim_id', 1)], {}),
+        ([('recipient_type', 1)], {}),
+        ([('sent_date', -1)], {}),
+    ],
+    'claims': [
+        ([('claim_id', 1)], {}),
+        ([('payor_id', 1), ('submitted_date', -1), ('_id', -1)], {}),
+        ([('status', 1)], {}),
+        # Manual review queue: one index per $or branch, each in queue order, so the branches merge-sort
+        # instead of sorting in memory (under_review claims have no fixed preauth_status)
+        ([('status', 1), ('submitted_date', 1), ('_id', 1)], {}),
+        ([('status', 1), ('preauth_status', 1), ('submitted_date', 1), ('_id', 1)], {}),
+        ([('provider_id', 1)], {}),
+        ([('last_updated', -1)], {}),
+    ],
+    'pre_authorizations': [
+        ([('payor_id', 1), ('status', 1), ('urgency_rank', 1), ('created_date', 1), ('_id', 1)], {}),
+        ([('claim_id', 1)], {}),
+        ([('preauth_id', 1)], {}),
+    ],
+    'claim_events': [
+        ([('claim_id', 1), ('timestamp', -1), ('_id', -1)], {}),
+    ],
+    'insurance_payor_mappings': [
+        ([('insurance_id', 1)], {'unique': True}),
+        ([('payor_id', 1)], {}),
+    ],
+    'webhook_outbox': [
+        ([('status', 1), ('next_attempt_at', 1)], {}),
+        ([('status', 1), ('lease_expires_at', 1)], {}),
+        ([('provider_id', 1), ('status', 1)], {}),
+    ],
+}
+
+
+def get_family(collection_name):
+    """Map a collection name to its index family, or None if it has no specs"""
+    for family in sorted(INDEX_SPECS, key=len, reverse=True):
+        if collection_name == family or collection_name.startswith(f"{family}_"):
+            return family
+    return None
+
+
+class IndexRegistry:
+    """Process-wide record of which collections already have their indexes"""
+    _ensured = set()
+    _lock = threading.Lock()
+    
+    @classmethod
+    def ensure(cls, collection, force=False):
+        """Create the indexes for a collection once per process"""
+        key = (collection.database.name, collection.name)
+        if key in cls._ensured and not force:
+            return False
+        
+        with cls._lock:
+            if key in cls._ensured and not force:
+                return False
+            
+            family = get_family(collection.name)
+            for keys, options in INDEX_SPECS.get(family, []):
+                try:
+                    collection.create_index(keys, **options)
+                except Exception as e:
+                    logger.warning(f"Index creation warning for {collection.name}: {e}")
+            
+            # Failed specs are not retried per request; run ensure_indexes to retry
+            cls._ensured.add(key)
+            return True
+    
+    @classmethod
+    def ensure_all(cls, db, force=False):
+        """Ensure indexes on every existing collection with a known family"""
+        names = set(db.list_collection_names())
+        
+        # Unpartitioned families are indexed even before their first insert
+        names.update(('payors', 'notifications', 'webhook_outbox', 'insurance_payor_mappings'))
+        
+        ensured = []
+        for name in sorted(names):
+            if get_family(name) and cls.ensure(db[name], force=force):
+                ensured.append(name)
+        return ensured
+    
+    @classmethod
+    def is_ensured(cls, collection):
+        return (collection.database.name, collection.name) in cls._ensured
+    
+    @classmethod
+    def reset(cls):
+        """Forget which collections were indexed (e.g. after dropping collections)"""
+        with cls._lock:
+            cls._ensured.clear()
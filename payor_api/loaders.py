@@ -0,0 +1,127 @@
+"""
+Request-scoped batch loaders for the HCMS Payor Backend
+List views collect the member, policy and routing keys of a whole page of claims and
+resolve each collection with a single $in query, deduplicating and caching the results
+for the rest of the request
+"""
+from .models import InsurancePayorMappingModel, MemberModel, PolicyModel
+
+
+# Related context a list view can attach to each claim with ?include=
+CLAIM_INCLUDES = ('member', 'policy', 'payor')
+
+# Claim fields the loaders read; added to narrowed list projections when includes are requested
+CLAIM_CONTEXT_FIELDS = ('member_id', 'insurance_id', 'policy_id')
+
+
+class BatchLoader:
+    """Deduplicating, caching key -> document loader around a batch function"""
+    
+    def __init__(self, batch_fn):
+        # batch_fn(keys) returns {key: document} for the keys it found
+        self.batch_fn = batch_fn
+        self._cache = {}
+        self.batches = 0
+    
+    def load_many(self, keys):
+        """{key: document or None} for the given keys, fetching only keys not seen before"""
+        keys = {key for key in keys if key is not None}
+        missing = [key for key in keys if key not in self._cache]
+        if missing:
+            self.batches += 1
+            found = self.batch_fn(missing)
+            for key in missing:
+                self._cache[key] = found.get(key)
+        return {key: self._cache[key] for key in keys}
+    
+    def load(self, key):
+        return self.load_many([key]).get(key)
+
+
+class ClaimContextLoaders:
+    """Member, policy and insurance routing loaders for one payor, scoped to one request"""
+    
+    def __init__(self, payor_id):
+        self.payor_id = payor_id
+        self.member_model = MemberModel(payor_id=payor_id)
+        self.policy_model = PolicyModel(payor_id=payor_id)
+        self.mapping_model = InsurancePayorMappingModel()
+        
+        # Members are keyed by (field, value) so member_id and insurance_id matches share one query
+        self.members = BatchLoader(self.member_model.get_by_lookup_keys)
+        self.policies = BatchLoader(self.policy_model.get_by_policy_ids)
+        self.payors = BatchLoader(self.mapping_model.get_payors_by_insurance)
+    
+    def load_members(self, claims):
+        """{id(claim): member} matched by member_id, falling back to insurance_id"""
+        found = self.members.load_many(
+            key for claim in claims for key in MemberModel.claim_lookup_keys(claim)
+        )
+        return {id(claim): MemberModel.match_claim(claim, found) for claim in claims}
+    
+    def load_policies(self, claims, members):
+        """{id(claim): policy} using the claim's policy_id, its member's policy, or its insurance_id"""
+        candidates = {id(claim): PolicyModel.claim_policy_ids(claim, members.get(id(claim))) for claim in claims}
+        policies = self.policies.load_many(
+            policy_id for policy_ids in candidates.values() for policy_id in policy_ids
+        )
+        return {
+            claim_key: PolicyModel.first_match(policy_ids, policies)
+            for claim_key, policy_ids in candidates.items()
+        }
+    
+    def enrich(self, claims, include=CLAIM_INCLUDES):
+        """Attach member_info, policy_info and routed_payor_id to a page of claims in place"""
+        include = set(include)
+        members = self.load_members(claims) if include & {'member', 'policy'} else {}
+        policies = self.load_policies(claims, members) if 'policy' in include else {}
+        payors = self.payors.load_many(claim.get('insurance_id') for claim in claims) if 'payor' in include else {}
+        
+        for claim in claims:
+            if 'member' in include:
+                member = members.get(id(claim))
+                claim['member_info'] = {
+                    'member_id': member.get('member_id'),
+                    'name': member.get('name'),
+                    'date_of_birth': member.get('date_of_birth'),
+                    'phone_number': member.get('phone_number'),
+                    'is_active': member.get('is_active', False)
+                } if member else None
+            if 'policy' in include:
+                policy = policies.get(id(claim))
+                claim['policy_info'] = {
+                    'policy_id': policy.get('policy_id'),
+                    'policy_name': policy.get('policy_name'),
+                    'policy_type': policy.get('policy_type'),
+                    'is_active': policy.get('is_active', False)
+                } if policy else None
+            if 'payor' in include:
+                claim['routed_payor_id'] = payors.get(claim.get('insurance_id'))
+        return claims
+
+
+def parse_includes(value):
+    """Validated ?include= list; raises ValueError for unknown names"""
+    if not value:
+        return []
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in CLAIM_INCLUDES]
+    if unknown:
+        raise ValueError(f"Unknown include(s): {', '.join(unknown)}. Must be one of {', '.join(CLAIM_INCLUDES)}")
+    return names
+
+
+def with_context_fields(projection):
+    """Projection widened to the claim fields the loaders need (None already returns everything)"""
+    if projection is None:
+        return None
+    return {**projection, **{field: 1 for field in CLAIM_CONTEXT_FIELDS}}
+
+
+def get_claim_context_loaders(request, payor_id):
+    """Loaders cached on the request, so every enrichment in one request shares their caches"""
+    loaders = getattr(request, '_claim_context_loaders', None)
+    if loaders is None or loaders.payor_id != payor_id:
+        loaders = ClaimContextLoaders(payor_id)
+        request._claim_context_loaders = loaders
+    return loaders
@@ -0,0 +1,28 @@
+"""
+Rebuild the claim_volume_<payor_id> time-series rollups from claim history
+"""
+from django.core.management.base import BaseCommand
+
+from payor_api.models import MongoConnection
+from payor_api.rollups import ClaimVolumeRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild hourly, daily and monthly claim volume buckets from claims_<payor_id> collections'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--payor',
+            action='append',
+            dest='payor_ids',
+            help='Payor ID to backfill (repeatable). Defaults to every claims_* collection.'
+        )
+    
+    def handle(self, *args, **options):
+        payor_ids = options.get('payor_ids') or MongoConnection.list_partitions('claims')
+        
+        for payor_id in payor_ids:
+            buckets = ClaimVolumeRollup(payor_id).backfill()
+            self.stdout.write(f"{payor_id}: wrote {buckets} bucket(s)")
+        
+        self.stdout.write(self.style.SUCCESS(f"Backfilled claim volume for {len(payor_ids)} payor(s)"))
@@ -0,0 +1,93 @@
+"""
+Benchmark claim list rendering: convert_objectid_to_string + JSONRenderer vs BSONJSONRenderer
+"""
+import time
+from datetime import datetime, timedelta
+
+from bson import Int64, ObjectId
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from payor_api.models import convert_objectid_to_string
+from payor_api.renderers import BSONJSONRenderer, orjson
+
+
+def build_sample_claims(count, timeline_entries=12, documents=4):
+    """Synthetic claims shaped like claims_<payor_id> documents, with timeline and documents arrays"""
+    now = datetime.utcnow()
+    claims = []
+    for index in range(count):
+        submitted = now - timedelta(minutes=index)
+        claims.append({
+            '_id': ObjectId(),
+            'claim_id': f"CLM-{submitted.strftime('%Y%m%d')}-{index:06d}",
+            'payor_id': 'PAY001',
+            'provider_id': 'PROV-001',
+            'provider_name': 'Healthcare Provider',
+            'patient_name': f'Patient {index}',
+            'patient_id': f'P-{index:05d}',
+            'insurance_id': f'INS-{index:08d}',
+            'diagnosis_code': 'J20.9',
+            'procedure_code': '99213',
+            'amount': 250.0 + index,
+            'units': Int64(1),
+            'status': 'pending',
+            'preauth_status': 'pending',
+            'auto_approved': False,
+            'submitted_date': submitted,
+            'last_updated': submitted,
+            'timeline': [
+                {
+                    '_id': ObjectId(),
+                    'timestamp': submitted + timedelta(seconds=step),
+                    'action': f'Step {step}',
+                    'notes': 'Automated processing step',
+                    'automated': True
+                }
+                for step in range(timeline_entries)
+            ],
+            'documents': [
+                {'document_id': ObjectId(), 'name': f'doc-{doc}.pdf', 'uploaded_at': submitted}
+                for doc in range(documents)
+            ]
+        })
+    return claims
+
+
+class Command(BaseCommand):
+    help = 'Compare the legacy and BSON-aware JSON rendering paths on a claims list response'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--claims', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20)
+    
+    def handle(self, *args, **options):
+        claims = build_sample_claims(options['claims'])
+        iterations = options['iterations']
+        
+        legacy_renderer = JSONRenderer()
+        bson_renderer = BSONJSONRenderer()
+        
+        def legacy():
+            # Previous path: deep copy through convert_objectid_to_string, then DRF's encoder
+            data = {'success': True, 'results': [convert_objectid_to_string(claim) for claim in claims]}
+            return legacy_renderer.render(data)
+        
+        def bson():
+            return bson_renderer.render({'success': True, 'results': claims})
+        
+        results = {}
+        for name, render in (('legacy', legacy), ('bson', bson)):
+            render()  # warm up
+            started = time.perf_counter()
+            for _ in range(iterations):
+                body = render()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / iterations
+            results[name] = elapsed_ms
+            self.stdout.write(f"{name:>7}: {elapsed_ms:8.2f} ms/response, {len(body) / 1024:.0f} KiB")
+        
+        backend = 'orjson' if orjson is not None else 'stdlib json'
+        self.stdout.write(self.style.SUCCESS(
+            f"BSONJSONRenderer ({backend}) is {results['legacy'] / results['bson']:.1f}x faster "
+            f"than the legacy path on {len(claims)} claims"
+        ))
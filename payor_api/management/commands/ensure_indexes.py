@@ -0,0 +1,20 @@
+"""
+Create MongoDB indexes for every known collection, including payor partitions
+"""
+from django.core.management.base import BaseCommand
+
+from payor_api.indexes import IndexRegistry
+from payor_api.models import MongoConnection
+
+
+class Command(BaseCommand):
+    help = 'Create indexes for payors, notifications and every *_<payor_id> collection'
+    
+    def handle(self, *args, **options):
+        db = MongoConnection.get_database()
+        ensured = IndexRegistry.ensure_all(db, force=True)
+        
+        for name in ensured:
+            self.stdout.write(f"Indexed {name}")
+        
+        self.stdout.write(self.style.SUCCESS(f"Ensured indexes on {len(ensured)} collection(s)"))
@@ -0,0 +1,62 @@
+"""
+Move pre-authorizations from the shared collection into pre_authorizations_<payor_id>
+"""
+from django.core.management.base import BaseCommand
+from pymongo import InsertOne
+
+from payor_api.models import MongoConnection, PreAuthorizationModel
+
+
+class Command(BaseCommand):
+    help = 'Copy pre_authorizations into per-payor queues with urgency_rank, then remove the originals'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--keep-source',
+            action='store_true',
+            help='Leave migrated documents in the shared pre_authorizations collection'
+        )
+    
+    def handle(self, *args, **options):
+        db = MongoConnection.get_database()
+        source = db.pre_authorizations
+        batch_size = options['batch_size']
+        migrated = 0
+        skipped = 0
+        
+        batch = []
+        for preauth in source.find({}).sort('_id', 1).batch_size(batch_size):
+            if not preauth.get('payor_id'):
+                skipped += 1
+                continue
+            
+            batch.append(preauth)
+            if len(batch) >= batch_size:
+                migrated += self._migrate(source, batch, options['keep_source'])
+                batch = []
+        
+        if batch:
+            migrated += self._migrate(source, batch, options['keep_source'])
+        
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped {skipped} request(s) without a payor_id"))
+        self.stdout.write(self.style.SUCCESS(f"Migrated {migrated} pre-authorization request(s)"))
+    
+    def _migrate(self, source, batch, keep_source):
+        by_payor = {}
+        for preauth in batch:
+            preauth['urgency_rank'] = PreAuthorizationModel.urgency_rank(preauth.get('urgency'))
+            by_payor.setdefault(preauth['payor_id'], []).append(preauth)
+        
+        for payor_id, preauths in by_payor.items():
+            target = PreAuthorizationModel(payor_id=payor_id).collection
+            # Re-running after a partial failure skips documents that were already copied
+            existing = {doc['_id'] for doc in target.find({'_id': {'$in': [p['_id'] for p in preauths]}}, {'_id': 1})}
+            operations = [InsertOne(preauth) for preauth in preauths if preauth['_id'] not in existing]
+            if operations:
+                target.bulk_write(operations, ordered=False)
+        
+        if not keep_source:
+            source.delete_many({'_id': {'$in': [preauth['_id'] for preauth in batch]}})
+        return len(batch)
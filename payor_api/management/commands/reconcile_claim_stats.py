@@ -0,0 +1,31 @@
+"""
+Rebuild the per-payor claim_stats counters from the raw claims collections
+"""
+from django.core.management.base import BaseCommand
+
+from payor_api.models import ClaimStatsModel, MongoConnection
+
+
+class Command(BaseCommand):
+    help = 'Rebuild claim_stats counters from claims_<payor_id> collections'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--payor',
+            action='append',
+            dest='payor_ids',
+            help='Payor ID to reconcile (repeatable). Defaults to every claims_* collection.'
+        )
+    
+    def handle(self, *args, **options):
+        payor_ids = options.get('payor_ids') or MongoConnection.list_partitions('claims')
+        stats_model = ClaimStatsModel()
+        
+        for payor_id in payor_ids:
+            metrics = stats_model.rebuild(payor_id)
+            self.stdout.write(
+                f"{payor_id}: {metrics['total_claims']} claims, "
+                f"total amount {metrics['total_amount']}"
+            )
+        
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {len(payor_ids)} payor(s)"))
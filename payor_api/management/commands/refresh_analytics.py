@@ -0,0 +1,33 @@
+"""
+Refresh the materialized analytics_<payor_id> rollups
+"""
+from django.core.management.base import BaseCommand
+
+from payor_api.analytics import ClaimAnalyticsRollup
+from payor_api.models import MongoConnection
+
+
+class Command(BaseCommand):
+    help = 'Recompute analytics_<payor_id> monthly buckets touched since the last refresh'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--payor',
+            action='append',
+            dest='payor_ids',
+            help='Payor ID to refresh (repeatable). Defaults to every claims_* collection.'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild every bucket from all claim history'
+        )
+    
+    def handle(self, *args, **options):
+        payor_ids = options.get('payor_ids') or MongoConnection.list_partitions('claims')
+        
+        for payor_id in payor_ids:
+            refreshed = ClaimAnalyticsRollup(payor_id).refresh(full=options['full'])
+            self.stdout.write(f"{payor_id}: refreshed {refreshed} bucket(s)")
+        
+        self.stdout.write(self.style.SUCCESS(f"Refreshed analytics for {len(payor_ids)} payor(s)"))
@@ -0,0 +1,37 @@
+"""
+Report dashboard metrics across all payor claim partitions
+"""
+from django.core.management.base import BaseCommand
+
+from payor_api.models import PayorAnalyticsModel
+
+
+class Command(BaseCommand):
+    help = 'Aggregate claim metrics over every claims_<payor_id> collection in parallel'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--payor',
+            action='append',
+            dest='payor_ids',
+            help='Payor ID to include (repeatable). Defaults to every claims_* collection.'
+        )
+        parser.add_argument('--workers', type=int, default=8)
+    
+    def handle(self, *args, **options):
+        report = PayorAnalyticsModel.get_network_metrics(
+            payor_ids=options.get('payor_ids'),
+            max_workers=options['workers']
+        )
+        
+        for payor_id, metrics in report['payors'].items():
+            self.stdout.write(
+                f"{payor_id}: {metrics['total_claims']} claims, total amount {metrics['total_amount']}, "
+                f"approval rate {metrics['approval_rate']:.1f}%"
+            )
+        
+        totals = report['totals']
+        self.stdout.write(self.style.SUCCESS(
+            f"All payors: {totals['total_claims']} claims, total amount {totals['total_amount']}, "
+            f"average {totals['average_claim_amount']:.2f}"
+        ))
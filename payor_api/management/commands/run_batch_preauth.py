@@ -0,0 +1,36 @@
+"""
+Evaluate every pending pre-authorization in bulk
+"""
+from django.core.management.base import BaseCommand
+
+from payor_api.models import MongoConnection
+from payor_api.preauth import BatchPreAuthEngine, np
+
+
+class Command(BaseCommand):
+    help = 'Apply pre-authorization rules to all pending claims with one bulk_write per chunk'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--payor',
+            action='append',
+            dest='payor_ids',
+            help='Payor ID to process (repeatable). Defaults to every claims_* collection.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=10000)
+    
+    def handle(self, *args, **options):
+        payor_ids = options.get('payor_ids') or MongoConnection.list_partitions('claims')
+        
+        if np is None:
+            self.stdout.write(self.style.WARNING("NumPy not installed; using the pure-Python evaluator"))
+        
+        for payor_id in payor_ids:
+            engine = BatchPreAuthEngine(payor_id, chunk_size=options['chunk_size'])
+            summary = engine.run()
+            self.stdout.write(
+                f"{payor_id}: evaluated {summary['evaluated']}, approved {summary['approved']}, "
+                f"manual review {summary['manual_review']}"
+            )
+        
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(payor_ids)} payor(s)"))
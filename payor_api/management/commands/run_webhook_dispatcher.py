@@ -0,0 +1,42 @@
+"""
+Run the provider webhook dispatcher as a dedicated process
+"""
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from payor_api.webhooks import WebhookDispatcher, WebhookOutboxModel, get_dispatcher_settings
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued provider webhooks from the webhook_outbox collection'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Worker threads (defaults to settings)')
+        parser.add_argument(
+            '--requeue-dead',
+            action='store_true',
+            help='Reset dead-lettered deliveries to pending before starting'
+        )
+    
+    def handle(self, *args, **options):
+        config = get_dispatcher_settings()
+        if options.get('workers'):
+            config['WORKERS'] = options['workers']
+        
+        if options.get('requeue_dead'):
+            requeued = WebhookOutboxModel().requeue_dead_letters()
+            self.stdout.write(f"Requeued {requeued} dead-lettered deliveries")
+        
+        dispatcher = WebhookDispatcher(config)
+        stop = threading.Event()
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        
+        dispatcher.start()
+        self.stdout.write(self.style.SUCCESS(f"Webhook dispatcher running with {config['WORKERS']} workers"))
+        stop.wait()
+        
+        dispatcher.stop()
+        self.stdout.write("Webhook dispatcher stopped")
@@ -1,31 +1,235 @@
 """
 Clean models without HIPAA encryption for HCMS Payor Backend
 """
-from pymongo import MongoClient
-from bson import ObjectId
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from bson import Decimal128, ObjectId
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from django.conf import settings
+import importlib
 import logging
+import threading
+
+from .cache import TTLCache
+from .indexes import IndexRegistry
+from .monitoring import PoolStatsListener
+from .pagination import decode_cursor, encode_cursor, fetch_page
 
 logger = logging.getLogger(__name__)
 
+# Claims submitted through the provider API carry `amount`; older seeded claims use `total_amount`
+CLAIM_AMOUNT_EXPR = {'$ifNull': ['$total_amount', {'$ifNull': ['$amount', 0]}]}
+
+
+def claim_amount(claim):
+    """
+    A claim's amount as $sum adds CLAIM_AMOUNT_EXPR, so incremental counters match a rebuild:
+    total_amount, else amount; Decimal128 is converted, and bools and other non-numbers count as 0
+    """
+    amount = claim.get('total_amount')
+    if amount is None:
+        amount = claim.get('amount')
+    if isinstance(amount, Decimal128):
+        return float(amount.to_decimal())
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        return 0
+    return amount
+
+
+# Fields that feed the incrementally maintained claim_stats counters and volume rollups
+CLAIM_STATS_PROJECTION = {
+    'submitted_date': 1,
+    'status': 1,
+    'amount': 1,
+    'total_amount': 1,
+    'auto_approved': 1,
+    'preauth_status': 1
+}
+
+# Keyset order for claim listings: newest first, _id breaks ties within a timestamp
+CLAIM_PAGE_SORT = [('submitted_date', -1), ('_id', -1)]
+
+DECISION_STATUSES = ['approved', 'rejected', 'partially_approved']
+
+# Review queue lease fields (see review_queue.py); decisions only write claims the reviewer may hold
+REVIEW_LEASE_OWNER = 'review_lease_owner'
+REVIEW_LEASE_EXPIRES = 'review_lease_expires_at'
+
+# Pre-auth queue order: lower urgency_rank first, then oldest request, _id breaks ties
+PREAUTH_URGENCY_RANKS = {'emergency': 0, 'urgent': 1, 'expedited': 2, 'routine': 3, 'standard': 3}
+PREAUTH_QUEUE_SORT = [('urgency_rank', 1), ('created_date', 1), ('_id', 1)]
+
+# Timeline pages are ordered newest first; `skip` counts entries already returned at the cursor timestamp
+TIMELINE_CURSOR_KEYS = [('timestamp', -1), ('skip', 1)]
+
+
+def get_timeline_inline_limit():
+    """Number of most recent timeline entries kept inside the claim document"""
+    return getattr(settings, 'CLAIM_TIMELINE', {}).get('INLINE_LIMIT', 20)
+
+
+_CLAIM_SUMMARY_FIELDS = [
+    'claim_id', 'payor_id', 'patient_name', 'patient_id', 'insurance_id', 'member_id',
+    'provider_id', 'provider_name', 'diagnosis_code', 'procedure_code', 'amount', 'total_amount',
+    'priority', 'status', 'preauth_status', 'auto_approved', 'date_of_service',
+    'submitted_date', 'last_updated'
+]
+
+_CLAIM_REVIEW_FIELDS = _CLAIM_SUMMARY_FIELDS + [
+    'diagnosis_description', 'procedure_description', 'diagnosis', 'treatment', 'notes',
+    'policy_id', 'coverage_validated', 'coverage_message', 'preauth_required', 'preauth_notes',
+    'urgency_level', 'decision', 'review'
+]
+
+# Named field sets for list views; None returns the whole document (timeline, documents, ...)
+CLAIM_PROJECTIONS = {
+    'summary': {field: 1 for field in _CLAIM_SUMMARY_FIELDS},
+    'review': {field: 1 for field in _CLAIM_REVIEW_FIELDS},
+    'full': None,
+}
+
+# Payor business-rule settings; writes invalidate locally, the TTL bounds staleness across processes
+_payor_settings_config = getattr(settings, 'PAYOR_SETTINGS_CACHE', {})
+_payor_settings_cache = TTLCache(
+    max_entries=_payor_settings_config.get('MAX_ENTRIES', 1000),
+    ttl_seconds=_payor_settings_config.get('TTL_SECONDS', 60)
+)
+
+
+# Read preference classes by settings name; 'primary' never takes maxStalenessSeconds
+READ_PREFERENCE_MODES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+
+_COMPRESSOR_MODULES = {'zstd': 'zstandard', 'snappy': 'snappy', 'zlib': 'zlib'}
+
+
+def _compressor_available(name):
+    module = _COMPRESSOR_MODULES.get(name)
+    if module is None:
+        return False
+    try:
+        importlib.import_module(module)
+        return True
+    except ImportError:
+        return False
+
 
 class MongoConnection:
     """MongoDB connection handler using PyMongo"""
     _client = None
     _db = None
+    _workload_dbs = {}
+    _supports_transactions = None
+    _pool_listener = PoolStatsListener()
+    _lock = threading.Lock()
     
     @classmethod
-    def get_database(cls):
+    def get_database(cls, workload=None):
+        """
+        Get the database handle, optionally with the read preference configured for a workload
+        Workloads (e.g. 'analytics', 'export') come from MONGODB_SETTINGS['READ_PREFERENCES'];
+        writes always go to the primary whatever the read preference
+        """
         if cls._db is None:
-            mongodb_settings = getattr(settings, 'MONGODB_SETTINGS', {})
-            host = mongodb_settings.get('host', 'mongodb://localhost:27017/')
-            database_name = mongodb_settings.get('database', 'hcms_payor_db')
-            
-            cls._client = MongoClient(host)
-            cls._db = cls._client[database_name]
-        
-        return cls._db
+            with cls._lock:
+                if cls._db is None:
+                    mongodb_settings = getattr(settings, 'MONGODB_SETTINGS', {})
+                    host, database_name = cls.connection_target(mongodb_settings)
+                    
+                    cls._client = MongoClient(
+                        host,
+                        event_listeners=[cls._pool_listener],
+                        **cls._client_options(mongodb_settings)
+                    )
+                    cls._db = cls._client[database_name]
+        
+        if workload is None:
+            return cls._db
+        
+        db = cls._workload_dbs.get(workload)
+        if db is None:
+            db = cls._db.client.get_database(cls._db.name, read_preference=cls.get_read_preference(workload))
+            cls._workload_dbs[workload] = db
+        return db
+    
+    @staticmethod
+    def connection_target(mongodb_settings):
+        """(host, database name) from MONGODB_SETTINGS"""
+        return (
+            mongodb_settings.get('HOST', mongodb_settings.get('host', 'mongodb://localhost:27017/')),
+            mongodb_settings.get('DB_NAME', mongodb_settings.get('database', 'hcms_payor_db'))
+        )
+    
+    @staticmethod
+    def _client_options(mongodb_settings):
+        """MongoClient pool and compression keyword arguments from MONGODB_SETTINGS['POOL']"""
+        options = dict(mongodb_settings.get('POOL', {}))
+        
+        # Only request compressors whose Python packages are installed; zlib is always available
+        compressors = options.pop('compressors', None)
+        if compressors:
+            names = compressors.split(',') if isinstance(compressors, str) else list(compressors)
+            available = [name.strip() for name in names if _compressor_available(name.strip())]
+            if available:
+                options['compressors'] = ','.join(available)
+        return options
+    
+    @classmethod
+    def get_read_preference(cls, workload):
+        """Read preference for a workload, defaulting to the primary"""
+        mongodb_settings = getattr(settings, 'MONGODB_SETTINGS', {})
+        mode = mongodb_settings.get('READ_PREFERENCES', {}).get(workload, 'primary')
+        max_staleness = mongodb_settings.get('MAX_STALENESS_SECONDS', -1)
+        
+        if mode not in READ_PREFERENCE_MODES:
+            raise ValueError(f"Unknown read preference '{mode}' for workload '{workload}'")
+        if mode == 'primary':
+            return Primary()
+        return READ_PREFERENCE_MODES[mode](max_staleness=max_staleness)
+    
+    @classmethod
+    def get_pool_stats(cls):
+        """Connection pool counters per server, plus the configured pool limits"""
+        mongodb_settings = getattr(settings, 'MONGODB_SETTINGS', {})
+        pool_settings = mongodb_settings.get('POOL', {})
+        return {
+            'max_pool_size': pool_settings.get('maxPoolSize', 100),
+            'min_pool_size': pool_settings.get('minPoolSize', 0),
+            'servers': cls._pool_listener.stats()
+        }
+    
+    @classmethod
+    def get_client(cls):
+        cls.get_database()
+        return cls._client
+    
+    @classmethod
+    def supports_transactions(cls):
+        """Whether the deployment accepts multi-document transactions (replica set or sharded)"""
+        if cls._supports_transactions is None:
+            try:
+                hello = cls.get_database().command('hello')
+                cls._supports_transactions = bool(hello.get('setName')) or hello.get('msg') == 'isdbgrid'
+            except Exception as e:
+                logger.warning(f"Could not detect transaction support, writing without transactions: {e}")
+                cls._supports_transactions = False
+        return cls._supports_transactions
+    
+    @classmethod
+    def list_partitions(cls, prefix):
+        """List payor IDs that own a `<prefix>_<payor_id>` collection"""
+        db = cls.get_database()
+        return sorted(
+            name[len(prefix) + 1:] for name in db.list_collection_names()
+            if name.startswith(f"{prefix}_")
+        )
     
     @classmethod
     def close_connection(cls):
@@ -33,6 +237,16 @@ class MongoConnection:
             cls._client.close()
             cls._client = None
             cls._db = None
+            cls._workload_dbs = {}
+
+
+class ClaimLeasedError(Exception):
+    """The claim is leased to another reviewer on the review queue"""
+    
+    def __init__(self, leases, message="Claim is leased to another reviewer"):
+        super().__init__(message)
+        # {claim_id: lease expiry}
+        self.leases = leases
 
 
 class ClaimModel:
@@ -44,9 +258,10 @@ class ClaimModel:
         # Use payor-specific collection for data isolation
         collection_name = f"claims_{payor_id}" if payor_id else "claims"
         self.collection = self.db[collection_name]
+        IndexRegistry.ensure(self.collection)
     
-    def create(self, claim_data):
-        """Create a new claim"""
+    def _prepare_new_claim(self, claim_data):
+        """Assign identifiers, timestamps and defaults to a new claim"""
         claim_data['_id'] = ObjectId()
         claim_data['submitted_date'] = datetime.utcnow()
         claim_data['last_updated'] = datetime.utcnow()
@@ -67,9 +282,46 @@ class ClaimModel:
         if 'claim_id' not in claim_data:
             claim_data['claim_id'] = f"CLM-{datetime.utcnow().strftime('%Y%m%d')}-{str(claim_data['_id'])[-6:]}"
         
+        return claim_data
+    
+    def create(self, claim_data):
+        """Create a new claim"""
+        self._prepare_new_claim(claim_data)
         result = self.collection.insert_one(claim_data)
+        self._record_change(None, claim_data)
         return self.get_by_id(result.inserted_id)
     
+    def create_many(self, claims):
+        """
+        Create a batch of new claims with a single unordered insert_many
+        Returns (inserted_claims, failures) where failures maps batch index to error message
+        """
+        for claim_data in claims:
+            self._prepare_new_claim(claim_data)
+        
+        failures = {}
+        if claims:
+            try:
+                self.collection.insert_many(claims, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get('writeErrors', []):
+                    failures[error['index']] = error.get('errmsg', 'Insert failed')
+        
+        inserted = [claim for index, claim in enumerate(claims) if index not in failures]
+        self._record_changes([(None, claim) for claim in inserted])
+        return inserted, failures
+    
+    def _record_change(self, old_claim, new_claim):
+        """Propagate a claim write to the payor's claim_stats counters and volume rollups"""
+        self._record_changes([(old_claim, new_claim)])
+    
+    def _record_changes(self, changes):
+        """Propagate a batch of (old_claim, new_claim) writes to the claim_stats counters and volume rollups"""
+        if self.payor_id and changes:
+            from .rollups import ClaimVolumeRollup
+            ClaimStatsModel().apply_changes(self.payor_id, changes)
+            ClaimVolumeRollup(self.payor_id).apply_changes(changes)
+    
     def get_by_id(self, claim_id):
         """Get claim by ObjectId"""
         if isinstance(claim_id, str):
@@ -89,7 +341,30 @@ class ClaimModel:
         
         return self.collection.find_one(query)
     
-    def get_all(self, filters=None, skip=0, limit=20, sort=None):
+    @staticmethod
+    def resolve_projection(view=None, fields=None):
+        """
+        Projection for a named view ('summary', 'review', 'full') or a comma-separated field list
+        Raises ValueError for unknown views or invalid field names
+        """
+        if fields:
+            names = [name.strip() for name in fields.split(',') if name.strip()]
+            invalid = [name for name in names if name.startswith('$') or not name.replace('_', '').replace('.', '').isalnum()]
+            if not names or invalid:
+                raise ValueError(f"Invalid fields: {', '.join(invalid) or fields}")
+            
+            projection = {name: 1 for name in names}
+            # Listing keys are always returned so next_cursor can be built from the page
+            projection.update({key: 1 for key, _ in CLAIM_PAGE_SORT})
+            return projection
+        
+        if view is None:
+            return None
+        if view not in CLAIM_PROJECTIONS:
+            raise ValueError(f"Unknown view '{view}'. Must be one of: {', '.join(CLAIM_PROJECTIONS)}")
+        return CLAIM_PROJECTIONS[view]
+    
+    def get_all(self, filters=None, skip=0, limit=20, sort=None, projection=None):
         """Get all claims with optional filtering and pagination"""
         query = filters or {}
         
@@ -97,7 +372,7 @@ class ClaimModel:
         if self.payor_id:
             query['payor_id'] = self.payor_id
         
-        cursor = self.collection.find(query)
+        cursor = self.collection.find(query, projection)
         
         if sort:
             cursor = cursor.sort(sort)
@@ -107,6 +382,37 @@ class ClaimModel:
         cursor = cursor.skip(skip).limit(limit)
         return list(cursor)
     
+    def get_page(self, filters=None, cursor=None, limit=20, projection=None):
+        """
+        Get a page of claims using keyset pagination on (submitted_date, _id)
+        Returns (claims, next_cursor); next_cursor is None on the last page
+        """
+        query = dict(filters or {})
+        
+        # Add payor filter for data isolation
+        if self.payor_id:
+            query['payor_id'] = self.payor_id
+        
+        return fetch_page(
+            self.collection, query, CLAIM_PAGE_SORT,
+            cursor=cursor, limit=limit, projection=projection
+        )
+    
+    def get_claims_for_review(self, payor_id=None, status='pending', limit=50, projection=CLAIM_PROJECTIONS['review']):
+        """Get claims awaiting review, oldest first, without timeline or document arrays"""
+        query = {'status': status}
+        payor_id = payor_id or self.payor_id
+        if payor_id:
+            query['payor_id'] = payor_id
+        
+        cursor = self.collection.find(query, projection).sort([('submitted_date', 1), ('_id', 1)]).limit(limit)
+        return list(cursor)
+    
+    @staticmethod
+    def page_cursor(claim):
+        """Cursor pointing just past the given claim in listing order"""
+        return encode_cursor(claim, CLAIM_PAGE_SORT)
+    
     def update(self, claim_id, update_data):
         """Update a claim"""
         if isinstance(claim_id, str):
@@ -118,14 +424,81 @@ class ClaimModel:
         if self.payor_id:
             query['payor_id'] = self.payor_id
         
-        result = self.collection.update_one(
+        old_claim = self.collection.find_one_and_update(
             query,
-            {'$set': update_data}
+            {'$set': update_data},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.modified_count > 0:
+        if old_claim is None:
+            return None
+        
+        new_claim = {**old_claim, **update_data}
+        self._record_change(old_claim, new_claim)
+        
+        # Dotted paths only touch nested fields, so re-read to return the stored document
+        if any('.' in key for key in update_data):
             return self.get_by_id(claim_id)
-        return None
+        return new_claim
+    
+    @staticmethod
+    def metrics_pipeline(match=None):
+        """
+        Single-pass $facet of claim totals, amount stats and per-status counts
+        Shared by compute_metrics and PayorAnalyticsModel so both report the same figures
+        """
+        pipeline = [{'$match': match}] if match else []
+        pipeline.append({'$facet': {
+            'totals': [
+                {'$group': {
+                    '_id': None,
+                    'total_claims': {'$sum': 1},
+                    'total_amount': {'$sum': CLAIM_AMOUNT_EXPR},
+                    'avg_amount': {'$avg': CLAIM_AMOUNT_EXPR},
+                    'min_amount': {'$min': CLAIM_AMOUNT_EXPR},
+                    'max_amount': {'$max': CLAIM_AMOUNT_EXPR},
+                    'auto_approved_count': {
+                        '$sum': {'$cond': [{'$eq': ['$auto_approved', True]}, 1, 0]}
+                    },
+                    'preauth_pending': {
+                        '$sum': {'$cond': [{'$eq': ['$preauth_status', 'pending']}, 1, 0]}
+                    }
+                }}
+            ],
+            'by_status': [
+                {'$group': {
+                    '_id': '$status',
+                    'count': {'$sum': 1},
+                    'total_amount': {'$sum': CLAIM_AMOUNT_EXPR}
+                }}
+            ]
+        }})
+        return pipeline
+    
+    def compute_metrics(self):
+        """Compute claim metrics with a single server-side aggregation"""
+        match = {'payor_id': self.payor_id} if self.payor_id else {}
+        result = next(self.collection.aggregate(self.metrics_pipeline(match)), {})
+        totals = (result.get('totals') or [{}])[0]
+        
+        total_claims = totals.get('total_claims', 0)
+        auto_approved_count = totals.get('auto_approved_count', 0)
+        
+        return {
+            'total_claims': total_claims,
+            'total_amount': totals.get('total_amount', 0),
+            'auto_approved_count': auto_approved_count,
+            'manual_review_count': total_claims - auto_approved_count,
+            'preauth_pending': totals.get('preauth_pending', 0),
+            'status_counts': {
+                bucket['_id']: bucket['count']
+                for bucket in result.get('by_status', []) if bucket['_id']
+            },
+            'amount_by_status': {
+                bucket['_id']: bucket['total_amount']
+                for bucket in result.get('by_status', []) if bucket['_id']
+            }
+        }
     
     def get_payor_claims(self, payor_id, status=None):
         """Get claims for a specific payor"""
@@ -147,39 +520,91 @@ class ClaimModel:
             return False, "Claim not found"
         
         # Get payor settings
-        payor_model = PayorModel()
-        payor_settings = payor_model.get_settings(self.payor_id)
-        
-        amount = claim.get('amount', 0)
-        treatment = claim.get('treatment', {})
-        diagnosis = claim.get('diagnosis', {})
-        
-        # Emergency cases - auto approve if enabled
-        if (payor_settings.get('emergency_auto_approve', True) and 
-            diagnosis.get('emergency', False)):
-            self.update_preauth_status(claim_id, 'approved', 'Auto-approved: Emergency case')
-            return True, "Auto-approved for emergency treatment"
-        
-        # Routine procedures under limit - auto approve
-        auto_limit = payor_settings.get('auto_preauth_limit', 500.0)
-        if amount <= auto_limit and treatment.get('urgency', '').lower() in ['routine', 'standard']:
-            self.update_preauth_status(claim_id, 'approved', f'Auto-approved: Amount under ${auto_limit}')
-            return True, f"Auto-approved for routine treatment under ${auto_limit}"
-        
-        # Preventive care - auto approve
-        if treatment.get('type', '').lower() in ['preventive', 'wellness', 'screening']:
-            self.update_preauth_status(claim_id, 'approved', 'Auto-approved: Preventive care')
-            return True, "Auto-approved for preventive care"
-        
-        # High amount claims - require manual review
-        manual_limit = payor_settings.get('require_manual_review_over', 2000.0)
-        if amount > manual_limit:
-            self.update_preauth_status(claim_id, 'manual_review', f'Requires manual review: Amount over ${manual_limit}')
-            return False, f"Requires manual review - amount exceeds ${manual_limit}"
-        
-        # Default to manual review for other cases
-        self.update_preauth_status(claim_id, 'manual_review', 'Standard manual review required')
-        return False, "Requires manual review"
+        payor_settings = get_payor_settings(self.payor_id)
+        
+        # Rules are shared with the batch engine so both paths decide identically
+        from .preauth import decide_preauth, describe_outcome, get_preauth_limits
+        limits = get_preauth_limits(payor_settings)
+        outcome = decide_preauth(claim, limits)
+        preauth_status, notes, approved, message = describe_outcome(outcome, limits)
+        
+        self.update_preauth_status(claim_id, preauth_status, notes)
+        return approved, message
+    
+    @staticmethod
+    def timeline_push(*entries):
+        """$push spec that appends entries and keeps only the newest inline"""
+        return {'$each': list(entries), '$slice': -get_timeline_inline_limit()}
+    
+    def spill_timeline(self, claim_id, previous_timeline, pushed=1):
+        """Move the entries a timeline_push trimmed from the claim into claim_events_<payor_id>"""
+        self.spill_timelines([(claim_id, previous_timeline)], pushed=pushed)
+    
+    def spill_timelines(self, timelines, pushed=1):
+        """Spill trimmed entries for several (claim_id, previous_timeline) pairs with one insert"""
+        limit = get_timeline_inline_limit()
+        events = []
+        for claim_id, previous_timeline in timelines:
+            previous_timeline = previous_timeline or []
+            overflow = len(previous_timeline) + pushed - limit
+            events.extend((claim_id, entry) for entry in previous_timeline[:max(overflow, 0)])
+        
+        if not events:
+            return
+        
+        try:
+            ClaimEventModel(self.payor_id).add_events(events)
+        except Exception as e:
+            logger.error(f"Failed to spill {len(events)} timeline entries for payor {self.payor_id}: {e}")
+    
+    def get_timeline(self, claim_id, limit=20, cursor=None):
+        """
+        Get a claim's timeline newest first, returning (entries, next_cursor), or None if the claim is missing
+        Inline entries are served first, then older entries from claim_events_<payor_id>
+        """
+        before, skip = decode_cursor(cursor, TIMELINE_CURSOR_KEYS) if cursor else (None, 0)
+        
+        query = {'claim_id': claim_id}
+        if self.payor_id:
+            query['payor_id'] = self.payor_id
+        
+        claim = self.collection.find_one(query, {'timeline': 1})
+        if claim is None:
+            return None
+        
+        inline = sorted(claim.get('timeline') or [], key=lambda entry: entry.get('timestamp') or datetime.min, reverse=True)
+        entries = [entry for entry in inline if before is None or (entry.get('timestamp') or datetime.min) <= before]
+        
+        # Older entries live in claim_events; fetch only as many as the page still needs
+        needed = limit + skip + 1 - len(entries)
+        if needed > 0:
+            # An entry spilled between the two reads can appear in both, so over-fetch by the inline count
+            seen = {(entry.get('timestamp'), entry.get('action')) for entry in entries}
+            for event in ClaimEventModel(self.payor_id).get_events(claim_id, before=before, limit=needed + len(seen)):
+                if (event.get('timestamp'), event.get('action')) not in seen:
+                    entries.append(event)
+        
+        # Drop the entries at the cursor timestamp that earlier pages already returned
+        if skip:
+            remaining = skip
+            kept = []
+            for entry in entries:
+                if remaining and entry.get('timestamp') == before:
+                    remaining -= 1
+                    continue
+                kept.append(entry)
+            entries = kept
+        
+        page = entries[:limit]
+        next_cursor = None
+        if len(entries) > limit and page:
+            last_timestamp = page[-1].get('timestamp')
+            returned_ties = sum(1 for entry in page if entry.get('timestamp') == last_timestamp)
+            if last_timestamp == before:
+                returned_ties += skip
+            next_cursor = encode_cursor({'timestamp': last_timestamp, 'skip': returned_ties}, TIMELINE_CURSOR_KEYS)
+        
+        return page, next_cursor
     
     def update_preauth_status(self, claim_id, status, notes=None):
         """Update pre-authorization status"""
@@ -202,82 +627,387 @@ class ClaimModel:
         if self.payor_id:
             query['payor_id'] = self.payor_id
         
-        result = self.collection.update_one(
+        old_claim = self.collection.find_one_and_update(
             query,
             {
                 '$set': update_data,
-                '$push': {'timeline': timeline_entry}
-            }
+                '$push': {'timeline': self.timeline_push(timeline_entry)}
+            },
+            projection={**CLAIM_STATS_PROJECTION, 'timeline': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
-    
-    def process_claim_decision(self, claim_id, decision_data, reviewer_id=None):
-        """Process payor decision on a claim"""
-        claim = self.get_by_claim_id(claim_id)
-        if not claim:
-            return False, "Claim not found"
         
-        decision_status = decision_data.get('status')  # approved, rejected, partially_approved
-        decision_notes = decision_data.get('notes', '')
-        approved_amount = decision_data.get('approved_amount', 0)
+        if old_claim is None:
+            return False
         
-        # Validate decision
-        if decision_status not in ['approved', 'rejected', 'partially_approved']:
-            return False, "Invalid decision status"
+        self.spill_timeline(claim_id, old_claim.get('timeline'))
+        self._record_change(old_claim, {**old_claim, 'preauth_status': status})
+        return True
+    
+    def _claim_query(self, claim_id):
+        """Match a claim by business claim_id, or by ObjectId for callers holding the document _id"""
+        query = {'claim_id': claim_id}
+        if ObjectId.is_valid(claim_id):
+            query = {'$or': [query, {'_id': ObjectId(claim_id)}]}
+        if self.payor_id:
+            query['payor_id'] = self.payor_id
+        return query
+    
+    @staticmethod
+    def _lease_guard(reviewer_id, now):
+        """Filter matching claims that are unleased, leased to this reviewer, or whose lease expired"""
+        return {
+            '$or': [
+                {REVIEW_LEASE_OWNER: {'$in': [None, reviewer_id]}},
+                {REVIEW_LEASE_EXPIRES: {'$lte': now}}
+            ]
+        }
+    
+    def _leased_elsewhere(self, query, reviewer_id, now):
+        """{claim_id: lease expiry} for claims matching `query` that another reviewer currently holds"""
+        leased = self.collection.find(
+            {'$and': [query, {REVIEW_LEASE_OWNER: {'$nin': [None, reviewer_id]}, REVIEW_LEASE_EXPIRES: {'$gt': now}}]},
+            {'claim_id': 1, REVIEW_LEASE_EXPIRES: 1}
+        )
+        return {claim['claim_id']: claim[REVIEW_LEASE_EXPIRES] for claim in leased}
+    
+    def _build_decision(self, decision_data, reviewer_id, now):
+        """($set fields, timeline entry) for a validated decision; raises ValueError when invalid"""
+        decision_status = decision_data.get('status')  # approved, rejected, partially_approved
+        if decision_status not in DECISION_STATUSES:
+            raise ValueError("Invalid decision status")
         
-        # Update claim with decision
+        decision_notes = decision_data.get('notes', '')
         update_data = {
             'status': decision_status,
-            'last_updated': datetime.utcnow(),
+            'last_updated': now,
             'decision': {
                 'status': decision_status,
-                'approved_amount': approved_amount,
+                'approved_amount': decision_data.get('approved_amount', 0),
+                'reason_code': decision_data.get('reason_code', ''),
                 'notes': decision_notes,
                 'reviewer_id': reviewer_id,
-                'decision_date': datetime.utcnow()
+                'decision_date': now
             }
         }
-        
-        # Add timeline entry
         timeline_entry = {
-            'timestamp': datetime.utcnow(),
+            'timestamp': now,
             'action': f'Decision: {decision_status}',
             'notes': decision_notes,
             'reviewer_id': reviewer_id,
             'automated': False
         }
-        
-        # Create audit log entry
-        audit_entry = {
-            'timestamp': datetime.utcnow(),
+        return update_data, timeline_entry
+    
+    def _audit_entry(self, claim_id, previous_status, decision_data, reviewer_id, now):
+        return {
+            'timestamp': now,
             'claim_id': claim_id,
             'action': 'claim_decision',
             'payor_id': self.payor_id,
             'reviewer_id': reviewer_id,
-            'old_status': claim.get('status'),
-            'new_status': decision_status,
+            'old_status': previous_status,
+            'new_status': decision_data.get('status'),
             'decision_data': decision_data
         }
+    
+    def _run_in_transaction(self, callback):
+        """Run callback(session) in a transaction, or without one on standalone servers"""
+        if not MongoConnection.supports_transactions():
+            return callback(None)
         
-        query = {'claim_id': claim_id}
+        with MongoConnection.get_client().start_session() as session:
+            return session.with_transaction(callback)
+    
+    def apply_decision(self, claim_id, decision_data, reviewer_id=None):
+        """
+        Record a payor decision with one claim write plus an audit insert in the same transaction
+        Returns the updated claim, or None if the claim does not exist; raises ValueError for invalid
+        decisions and ClaimLeasedError when another reviewer holds the claim's review lease
+        """
+        now = datetime.utcnow()
+        update_data, timeline_entry = self._build_decision(decision_data, reviewer_id, now)
+        # The lease check is part of the write filter, so a lease taken after any earlier read still blocks it
+        query = {'$and': [self._claim_query(claim_id), self._lease_guard(reviewer_id, now)]}
+        
+        def write(session):
+            # BEFORE gives the previous status and the timeline entries $slice trims in the same round trip
+            previous = self.collection.find_one_and_update(
+                query,
+                {
+                    '$set': update_data,
+                    '$push': {'timeline': self.timeline_push(timeline_entry)}
+                },
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            if previous is not None:
+                self.db.audit_logs.insert_one(
+                    self._audit_entry(previous.get('claim_id'), previous.get('status'), decision_data, reviewer_id, now),
+                    session=session
+                )
+            return previous
+        
+        previous = self._run_in_transaction(write)
+        if previous is None:
+            leased = self._leased_elsewhere(self._claim_query(claim_id), reviewer_id, now)
+            if leased:
+                raise ClaimLeasedError(leased)
+            return None
+        
+        self.spill_timeline(previous.get('claim_id'), previous.get('timeline'))
+        
+        updated = {**previous, **update_data}
+        updated['timeline'] = ((previous.get('timeline') or []) + [timeline_entry])[-get_timeline_inline_limit():]
+        self._record_change(previous, updated)
+        return updated
+    
+    def apply_decisions(self, decisions, reviewer_id=None):
+        """
+        Record many decisions with one bulk_write and one audit insert_many
+        `decisions` is a list of (claim_id, decision_data); returns {claim_id: (updated_claim or None, error)}
+        """
+        # BSON dates keep milliseconds; truncate so the stored decision_date compares equal
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        results = {}
+        prepared = {}
+        for claim_id, decision_data in decisions:
+            try:
+                prepared[claim_id] = (decision_data, *self._build_decision(decision_data, reviewer_id, now))
+            except ValueError as e:
+                results[claim_id] = (None, str(e))
+        
+        if not prepared:
+            return results
+        
+        query = {'claim_id': {'$in': list(prepared)}}
         if self.payor_id:
             query['payor_id'] = self.payor_id
+        previous_claims = {claim['claim_id']: claim for claim in self.collection.find(query)}
+        
+        operations = []
+        for claim_id, (decision_data, update_data, timeline_entry) in prepared.items():
+            previous = previous_claims.get(claim_id)
+            if previous is None:
+                results[claim_id] = (None, 'Claim not found')
+                continue
+            
+            # Guard on the version we read so stats deltas, audit old_status and timeline spills stay exact,
+            # and on the review lease so a claim leased by another reviewer after the read is not written
+            operations.append(UpdateOne(
+                {
+                    '_id': previous['_id'],
+                    'status': previous.get('status'),
+                    'last_updated': previous.get('last_updated'),
+                    'preauth_updated': previous.get('preauth_updated'),
+                    **self._lease_guard(reviewer_id, now)
+                },
+                {
+                    '$set': update_data,
+                    '$push': {'timeline': self.timeline_push(timeline_entry)}
+                }
+            ))
         
-        # Update claim and add audit log
-        result = self.collection.update_one(
-            query,
-            {
-                '$set': update_data,
-                '$push': {'timeline': timeline_entry}
-            }
+        if not operations:
+            return results
+        
+        def write(session):
+            result = self.collection.bulk_write(operations, ordered=False, session=session)
+            
+            # Claims changed between the read and the write did not match their guard
+            written = [claim_id for claim_id in prepared if claim_id in previous_claims]
+            if result.modified_count != len(operations):
+                current = self.collection.find(
+                    {'_id': {'$in': [previous_claims[claim_id]['_id'] for claim_id in written]}},
+                    {'claim_id': 1, 'decision.decision_date': 1},
+                    session=session
+                )
+                decided = {claim['claim_id'] for claim in current if claim.get('decision', {}).get('decision_date') == now}
+                written = [claim_id for claim_id in written if claim_id in decided]
+            
+            if written:
+                self.db.audit_logs.insert_many(
+                    [
+                        self._audit_entry(claim_id, previous_claims[claim_id].get('status'), prepared[claim_id][0], reviewer_id, now)
+                        for claim_id in written
+                    ],
+                    ordered=False,
+                    session=session
+                )
+            return set(written)
+        
+        written = self._run_in_transaction(write)
+        
+        unwritten = [claim_id for claim_id in prepared if claim_id in previous_claims and claim_id not in written]
+        leased = {}
+        if unwritten:
+            leased = self._leased_elsewhere({'_id': {'$in': [previous_claims[claim_id]['_id'] for claim_id in unwritten]}}, reviewer_id, now)
+        
+        changes = []
+        for claim_id in prepared:
+            previous = previous_claims.get(claim_id)
+            if previous is None:
+                continue
+            if claim_id in leased:
+                results[claim_id] = (None, str(ClaimLeasedError({claim_id: leased[claim_id]})))
+                continue
+            if claim_id not in written:
+                results[claim_id] = (None, 'Claim was modified concurrently; retry the decision')
+                continue
+            
+            decision_data, update_data, timeline_entry = prepared[claim_id]
+            updated = {**previous, **update_data}
+            updated['timeline'] = ((previous.get('timeline') or []) + [timeline_entry])[-get_timeline_inline_limit():]
+            changes.append((previous, updated))
+            results[claim_id] = (updated, None)
+        
+        self.spill_timelines([(previous.get('claim_id'), previous.get('timeline')) for previous, _ in changes])
+        self._record_changes(changes)
+        return results
+    
+    def process_claim_decision(self, claim_id, decision_data, reviewer_id=None):
+        """Process payor decision on a claim"""
+        try:
+            updated = self.apply_decision(claim_id, decision_data, reviewer_id)
+        except (ValueError, ClaimLeasedError) as e:
+            return False, str(e)
+        
+        if updated is None:
+            return False, "Claim not found"
+        return True, "Decision processed successfully"
+
+
+class ClaimEventModel:
+    """Timeline entries trimmed from claim documents, kept per payor in claim_events_<payor_id>"""
+    
+    def __init__(self, payor_id=None):
+        self.db = MongoConnection.get_database()
+        self.payor_id = payor_id
+        collection_name = f"claim_events_{payor_id}" if payor_id else "claim_events"
+        self.collection = self.db[collection_name]
+        IndexRegistry.ensure(self.collection)
+    
+    def add_events(self, events):
+        """Store (claim_id, timeline_entry) pairs"""
+        if not events:
+            return
+        self.collection.insert_many(
+            [{**entry, 'claim_id': claim_id, 'payor_id': self.payor_id} for claim_id, entry in events],
+            ordered=False
         )
+    
+    def get_events(self, claim_id, before=None, limit=20):
+        """Stored entries for a claim, newest first, at or before a timestamp"""
+        query = {'claim_id': claim_id}
+        if before is not None:
+            query['timestamp'] = {'$lte': before}
         
-        if result.modified_count > 0:
-            # Log audit entry
-            self.db.audit_logs.insert_one(audit_entry)
-            return True, "Decision processed successfully"
+        cursor = self.collection.find(query, {'claim_id': 0, 'payor_id': 0})
+        return list(cursor.sort([('timestamp', -1), ('_id', -1)]).limit(limit))
+
+
+class ClaimStatsModel:
+    """Per-payor claim counters maintained with atomic $inc updates"""
+    
+    def __init__(self):
+        self.db = MongoConnection.get_database()
+        self.collection = self.db.claim_stats
+    
+    @staticmethod
+    def claim_contribution(claim):
+        """Counter values a single claim contributes to its payor's stats"""
+        if not claim:
+            return {}
+        
+        amount = claim_amount(claim)
+        
+        auto_approved = claim.get('auto_approved') is True
+        contribution = {
+            'total_claims': 1,
+            'total_amount': amount,
+            'auto_approved_count': 1 if auto_approved else 0,
+            'manual_review_count': 0 if auto_approved else 1,
+            'preauth_pending': 1 if claim.get('preauth_status') == 'pending' else 0
+        }
+        
+        status = claim.get('status')
+        if status:
+            contribution[f'status_counts.{status}'] = 1
+            contribution[f'amount_by_status.{status}'] = amount
+        
+        return contribution
+    
+    def apply_change(self, payor_id, old_claim=None, new_claim=None):
+        """Apply the counter delta between two versions of a claim"""
+        self.apply_changes(payor_id, [(old_claim, new_claim)])
+    
+    def apply_changes(self, payor_id, changes):
+        """Apply the summed counter deltas of several (old_claim, new_claim) pairs in one update"""
+        increments = {}
+        for old_claim, new_claim in changes:
+            old_values = self.claim_contribution(old_claim)
+            new_values = self.claim_contribution(new_claim)
+            for key in set(old_values) | set(new_values):
+                increments[key] = increments.get(key, 0) + new_values.get(key, 0) - old_values.get(key, 0)
+        
+        increments = {key: delta for key, delta in increments.items() if delta}
+        if not increments:
+            return
+        
+        try:
+            # No upsert: a document created by $inc would hold only this delta, not the payor's totals
+            result = self.collection.update_one(
+                {'_id': payor_id},
+                {
+                    '$inc': increments,
+                    '$set': {'last_updated': datetime.utcnow()}
+                }
+            )
+            if result.matched_count == 0:
+                # First write since deploy: seed from the claims collection, which already includes this change
+                self.rebuild(payor_id)
+        except Exception as e:
+            # Counters can be rebuilt with reconcile_claim_stats; never fail the claim write
+            logger.warning(f"Claim stats update failed for payor {payor_id}: {e}")
+    
+    def get_stats(self, payor_id):
+        """Get counters for a payor, building them on first access"""
+        stats = self.collection.find_one({'_id': payor_id})
+        if stats is None:
+            return self.rebuild(payor_id)
+        return self.from_document(stats)
+    
+    @staticmethod
+    def from_document(stats):
+        """Normalize a stored claim_stats document into the get_stats shape"""
+        total_claims = stats.get('total_claims', 0)
+        auto_approved_count = stats.get('auto_approved_count', 0)
         
-        return False, "Failed to update claim"
+        return {
+            'total_claims': total_claims,
+            'total_amount': stats.get('total_amount', 0),
+            'auto_approved_count': auto_approved_count,
+            'manual_review_count': stats.get('manual_review_count', total_claims - auto_approved_count),
+            'preauth_pending': stats.get('preauth_pending', 0),
+            'status_counts': {k: v for k, v in stats.get('status_counts', {}).items() if v},
+            'amount_by_status': {
+                k: v for k, v in stats.get('amount_by_status', {}).items()
+                if stats.get('status_counts', {}).get(k)
+            }
+        }
+    
+    def rebuild(self, payor_id):
+        """Rebuild a payor's counters from the raw claims collection"""
+        metrics = ClaimModel(payor_id=payor_id).compute_metrics()
+        now = datetime.utcnow()
+        
+        self.collection.replace_one(
+            {'_id': payor_id},
+            {**metrics, 'last_updated': now, 'reconciled_at': now},
+            upsert=True
+        )
+        return metrics
 
 
 class PayorModel:
@@ -286,16 +1016,7 @@ class PayorModel:
     def __init__(self):
         self.db = MongoConnection.get_database()
         self.collection = self.db.payors
-        self._ensure_indexes()
-    
-    def _ensure_indexes(self):
-        """Ensure proper indexes for performance"""
-        try:
-            self.collection.create_index([('payor_id', 1)], unique=True)
-            self.collection.create_index([('email', 1)], unique=True)
-            self.collection.create_index([('is_active', 1)])
-        except Exception as e:
-            logger.warning(f"Index creation warning: {e}")
+        IndexRegistry.ensure(self.collection)
     
     def authenticate(self, email_or_username, password):
         """Authenticate payor by email/username and password"""
@@ -334,12 +1055,21 @@ class PayorModel:
         })
         
         result = self.collection.insert_one(payor_data)
+        invalidate_payor_settings(payor_data['payor_id'])
         return self.get_by_id(payor_data['payor_id'])
     
     def get_settings(self, payor_id):
         """Get payor settings for business rules"""
-        payor = self.get_by_id(payor_id)
-        return payor.get('settings', {}) if payor else {}
+        return get_payor_settings(payor_id)
+    
+    def update_settings(self, payor_id, settings_update):
+        """Update payor business-rule settings and drop the cached copy"""
+        update = {f'settings.{key}': value for key, value in settings_update.items()}
+        update['last_updated'] = datetime.utcnow()
+        
+        result = self.collection.update_one({'payor_id': payor_id}, {'$set': update})
+        invalidate_payor_settings(payor_id)
+        return result.matched_count > 0
     
     def ensure_default_payors(self):
         """Ensure default payor accounts exist for testing/demo"""
@@ -397,26 +1127,47 @@ class PayorModel:
         return created_count
 
 
+def get_payor_settings(payor_id):
+    """Payor settings for business rules, served from the process-wide cache"""
+    cached = _payor_settings_cache.get(payor_id)
+    if cached is None:
+        payor = MongoConnection.get_database().payors.find_one(
+            {'payor_id': payor_id},
+            {'settings': 1}
+        )
+        cached = payor.get('settings', {}) if payor else {}
+        _payor_settings_cache.set(payor_id, cached)
+    
+    # Callers get a copy so they cannot mutate the shared entry
+    return dict(cached)
+
+
+def invalidate_payor_settings(payor_id=None):
+    """Drop cached settings for one payor, or for all payors"""
+    if payor_id is None:
+        _payor_settings_cache.clear()
+    else:
+        _payor_settings_cache.invalidate(payor_id)
+
+
+def get_payor_settings_cache_stats():
+    """Payor settings cache counters for monitoring"""
+    return _payor_settings_cache.stats()
+
+
 class MemberModel:
     """Enhanced Member/Patient model with payor-specific collections"""
     
+    # Claim fields that identify a member, in match priority order
+    CLAIM_LOOKUP_FIELDS = ('member_id', 'insurance_id')
+    
     def __init__(self, payor_id=None):
         self.db = MongoConnection.get_database()
         self.payor_id = payor_id
         # Use payor-specific collection for data isolation
         collection_name = f"members_{payor_id}" if payor_id else "members"
         self.collection = self.db[collection_name]
-        self._ensure_indexes()
-    
-    def _ensure_indexes(self):
-        """Ensure proper indexes for performance"""
-        try:
-            self.collection.create_index([('member_id', 1)], unique=True)
-            self.collection.create_index([('insurance_id', 1)])
-            self.collection.create_index([('policy_number', 1)])
-            self.collection.create_index([('is_active', 1)])
-        except Exception as e:
-            logger.warning(f"Member index creation warning: {e}")
+        IndexRegistry.ensure(self.collection)
     
     def get_by_member_id(self, member_id):
         """Get member by member_id within payor's collection"""
@@ -430,6 +1181,38 @@ class MemberModel:
         """Get member by insurance_id within payor's collection"""
         return self.collection.find_one({'insurance_id': insurance_id})
     
+    @classmethod
+    def claim_lookup_keys(cls, claim):
+        """(field, value) keys identifying a claim's member, in match priority order"""
+        return [(field, claim[field]) for field in cls.CLAIM_LOOKUP_FIELDS if claim.get(field)]
+    
+    @classmethod
+    def match_claim(cls, claim, members):
+        """A claim's member from {(field, value): member}: the member_id match, else the insurance_id match"""
+        return next((members[key] for key in cls.claim_lookup_keys(claim) if members.get(key)), None)
+    
+    def get_by_lookup_keys(self, keys):
+        """{(field, value): member} for member_id / insurance_id keys, with one $or query"""
+        keys = set(keys)
+        values = {}
+        for field, value in keys:
+            values.setdefault(field, set()).add(value)
+        if not values:
+            return {}
+        
+        found = {}
+        clauses = [{field: {'$in': list(field_values)}} for field, field_values in values.items()]
+        for member in self.collection.find({'$or': clauses}):
+            for field in self.CLAIM_LOOKUP_FIELDS:
+                key = (field, member.get(field))
+                if key in keys:
+                    found.setdefault(key, member)
+        return found
+    
+    def get_for_claim(self, claim):
+        """The claim's member, preferring a member_id match over an insurance_id match"""
+        return self.match_claim(claim, self.get_by_lookup_keys(self.claim_lookup_keys(claim)))
+    
     def verify_eligibility(self, member_id):
         """Comprehensive eligibility check for payor's member"""
         member = self.get_by_member_id(member_id)
@@ -460,6 +1243,10 @@ class MemberModel:
         
         return True, "Member is eligible for coverage"
     
+    def get_active_count(self):
+        """Count active members for this payor"""
+        return self.collection.count_documents({'is_active': True})
+    
     def get_all(self, filters=None, skip=0, limit=20):
         """Get all members for this payor with filtering"""
         query = filters or {}
@@ -485,54 +1272,70 @@ class PolicyModel:
         # Use payor-specific collection for data isolation
         collection_name = f"policies_{payor_id}" if payor_id else "policies"
         self.collection = self.db[collection_name]
-        self._ensure_indexes()
-    
-    def _ensure_indexes(self):
-        """Ensure proper indexes"""
-        try:
-            self.collection.create_index([('policy_id', 1)], unique=True)
-            self.collection.create_index([('policy_type', 1)])
-            self.collection.create_index([('is_active', 1)])
-        except Exception as e:
-            logger.warning(f"Policy index creation warning: {e}")
+        IndexRegistry.ensure(self.collection)
     
     def get_by_policy_id(self, policy_id):
         """Get policy by ID"""
         return self.collection.find_one({'policy_id': policy_id})
     
+    def get_by_policy_ids(self, policy_ids):
+        """Get several policies with one $in query, keyed by policy_id"""
+        policy_ids = list(set(policy_ids))
+        if not policy_ids:
+            return {}
+        return {
+            policy['policy_id']: policy
+            for policy in self.collection.find({'policy_id': {'$in': policy_ids}})
+        }
+    
+    @staticmethod
+    def claim_policy_ids(claim, member=None):
+        """Candidate policy_ids for a claim in priority order: its policy_id, its member's policy, its insurance_id"""
+        member = member or {}
+        return [
+            policy_id for policy_id in (
+                claim.get('policy_id'), member.get('policy_id'), member.get('policy_number'), claim.get('insurance_id')
+            ) if policy_id
+        ]
+    
+    @staticmethod
+    def first_match(policy_ids, policies):
+        """The first candidate found in {policy_id: policy}"""
+        return next((policies[policy_id] for policy_id in policy_ids if policies.get(policy_id)), None)
+    
+    def get_for_claim(self, claim, member=None):
+        """The claim's policy, falling back to its member's policy and the insurance_id used for coverage checks"""
+        policy_ids = self.claim_policy_ids(claim, member)
+        return self.first_match(policy_ids, self.get_by_policy_ids(policy_ids))
+    
+    def get_compiled_policies(self, policy_ids):
+        """Compiled coverage rules for several policies from the process-wide cache"""
+        from .coverage import get_policy_cache
+        return get_policy_cache().get_many(self.collection, policy_ids)
+    
     def check_coverage(self, policy_id, diagnosis_code=None, procedure_code=None):
         """Check if a diagnosis/procedure is covered under the policy"""
-        policy = self.get_by_policy_id(policy_id)
-        if not policy:
-            return False, "Policy not found"
-        
-        if not policy.get('is_active', False):
-            return False, "Policy is inactive"
-        
-        # Check diagnosis codes (ICD-10)
-        if diagnosis_code:
-            covered_diagnoses = policy.get('covered_diagnoses', [])
-            excluded_diagnoses = policy.get('excluded_diagnoses', [])
-            
-            if diagnosis_code in excluded_diagnoses:
-                return False, f"Diagnosis {diagnosis_code} is explicitly excluded"
-            
-            # Check if diagnosis is covered (if list exists and is not empty)
-            if covered_diagnoses and diagnosis_code not in covered_diagnoses:
-                return False, f"Diagnosis {diagnosis_code} not covered under this policy"
-        
-        # Check procedure codes (CPT)
-        if procedure_code:
-            covered_procedures = policy.get('covered_procedures', [])
-            excluded_procedures = policy.get('excluded_procedures', [])
-            
-            if procedure_code in excluded_procedures:
-                return False, f"Procedure {procedure_code} is explicitly excluded"
-            
-            if covered_procedures and procedure_code not in covered_procedures:
-                return False, f"Procedure {procedure_code} not covered under this policy"
-        
-        return True, "Coverage validated successfully"
+        from .coverage import check_policy_coverage, get_policy_cache
+        compiled = get_policy_cache().get(self.collection, policy_id)
+        return check_policy_coverage(compiled, diagnosis_code, procedure_code)
+    
+    @staticmethod
+    def evaluate_coverage(policy, diagnosis_code=None, procedure_code=None):
+        """Check a diagnosis/procedure against an already loaded policy document"""
+        from .coverage import CompiledPolicy, check_policy_coverage
+        compiled = CompiledPolicy(policy) if policy else None
+        return check_policy_coverage(compiled, diagnosis_code, procedure_code)
+    
+    def update_policy(self, policy_id, update_data):
+        """Update a policy and drop its compiled coverage rules from the cache"""
+        from .coverage import get_policy_cache
+        update_data['last_updated'] = datetime.utcnow()
+        result = self.collection.update_one(
+            {'policy_id': policy_id},
+            {'$set': update_data}
+        )
+        get_policy_cache().invalidate(self.collection, policy_id)
+        return result.modified_count > 0
     
     def get_coverage_limits(self, policy_id):
         """Get coverage limits for a policy"""
@@ -554,11 +1357,34 @@ class InsurancePayorMappingModel:
     def __init__(self):
         self.db = MongoConnection.get_database()
         self.collection = self.db.insurance_payor_mappings
+        IndexRegistry.ensure(self.collection)
     
     def get_payor_by_insurance(self, insurance_id):
-        """Get payor ID by insurance ID"""
-        mapping = self.collection.find_one({'insurance_id': insurance_id})
-        return mapping.get('payor_id') if mapping else None
+        """Get payor ID by insurance ID from the in-memory routing table"""
+        from .routing import get_routing_table
+        return get_routing_table().lookup(insurance_id)
+    
+    def get_payors_by_insurance(self, insurance_ids):
+        """Resolve several insurance IDs from the routing table, keyed by insurance_id"""
+        from .routing import get_routing_table
+        return get_routing_table().lookup_many(set(insurance_ids))
+    
+    def set_mapping(self, insurance_id, payor_id):
+        """Create or update a mapping and bump the routing version stamp"""
+        from .routing import MongoRoutingSource
+        self.collection.update_one(
+            {'insurance_id': insurance_id},
+            {'$set': {'payor_id': payor_id, 'last_updated': datetime.utcnow()}},
+            upsert=True
+        )
+        MongoRoutingSource().bump_version()
+    
+    def remove_mapping(self, insurance_id):
+        """Delete a mapping and bump the routing version stamp"""
+        from .routing import MongoRoutingSource
+        result = self.collection.delete_one({'insurance_id': insurance_id})
+        MongoRoutingSource().bump_version()
+        return result.deleted_count > 0
     
     def get_all_mappings(self):
         """Get all insurance to payor mappings"""
@@ -566,12 +1392,20 @@ class InsurancePayorMappingModel:
 
 
 class PreAuthorizationModel:
-    """Pre-authorization model"""
+    """Pre-authorization model with a per-payor, urgency-ordered work queue"""
     
     def __init__(self, payor_id=None):
         self.db = MongoConnection.get_database()
-        self.collection = self.db.pre_authorizations
+        # Use payor-specific collection for data isolation
+        collection_name = f"pre_authorizations_{payor_id}" if payor_id else "pre_authorizations"
+        self.collection = self.db[collection_name]
         self.payor_id = payor_id
+        IndexRegistry.ensure(self.collection)
+    
+    @staticmethod
+    def urgency_rank(urgency):
+        """Sort rank for an urgency level; unknown levels queue with routine requests"""
+        return PREAUTH_URGENCY_RANKS.get(str(urgency or '').lower(), PREAUTH_URGENCY_RANKS['routine'])
     
     def create(self, preauth_data):
         """Create a new pre-authorization request"""
@@ -579,10 +1413,15 @@ class PreAuthorizationModel:
         preauth_data['created_date'] = datetime.utcnow()
         preauth_data['last_updated'] = datetime.utcnow()
         preauth_data.setdefault('status', 'pending')
+        preauth_data.setdefault('urgency', 'routine')
+        preauth_data['urgency_rank'] = self.urgency_rank(preauth_data['urgency'])
         
         if self.payor_id:
             preauth_data['payor_id'] = self.payor_id
         
+        if 'preauth_id' not in preauth_data:
+            preauth_data['preauth_id'] = f"PRE-{datetime.utcnow().strftime('%Y%m%d')}-{str(preauth_data['_id'])[-6:]}"
+        
         result = self.collection.insert_one(preauth_data)
         return self.get_by_id(result.inserted_id)
     
@@ -605,6 +1444,24 @@ class PreAuthorizationModel:
         
         return self.collection.find_one(query)
     
+    def get_queue(self, status='pending', cursor=None, limit=20):
+        """
+        Get a page of the work queue, most urgent first and oldest first within an urgency
+        Returns (requests, next_cursor); each page is one index seek on (payor_id, status, urgency_rank, created_date, _id)
+        """
+        query = {'status': status}
+        if self.payor_id:
+            query['payor_id'] = self.payor_id
+        
+        return fetch_page(self.collection, query, PREAUTH_QUEUE_SORT, cursor=cursor, limit=limit)
+    
+    def count_by_status(self, status='pending'):
+        """Count requests in a status (an index range scan, so it grows with the backlog)"""
+        query = {'status': status}
+        if self.payor_id:
+            query['payor_id'] = self.payor_id
+        return self.collection.count_documents(query)
+    
     def update_status(self, preauth_id, status, notes=None):
         """Update pre-authorization status"""
         if isinstance(preauth_id, str):
@@ -624,78 +1481,115 @@ class PreAuthorizationModel:
         
         result = self.collection.update_one(query, {'$set': update_data})
         return result.modified_count > 0
+    
+    def update_urgency(self, preauth_id, urgency):
+        """Change a request's urgency, moving it within the queue"""
+        if isinstance(preauth_id, str):
+            preauth_id = ObjectId(preauth_id)
+        
+        query = {'_id': preauth_id}
+        if self.payor_id:
+            query['payor_id'] = self.payor_id
+        
+        result = self.collection.update_one(query, {'$set': {
+            'urgency': urgency,
+            'urgency_rank': self.urgency_rank(urgency),
+            'last_updated': datetime.utcnow()
+        }})
+        return result.modified_count > 0
 
 
 class PayorAnalyticsModel:
     """Analytics model for payor dashboard"""
     
     def __init__(self, payor_id):
-        self.db = MongoConnection.get_database()
+        # Read-only reporting queries may be served by secondaries
+        self.db = MongoConnection.get_database('analytics')
         self.payor_id = payor_id
-        self.claims_collection = self.db.claims
-        self.preauth_collection = self.db.pre_authorizations
+        # Claims live in the payor-partitioned collection, not the legacy shared db.claims
+        self.claims_collection = self.db[f"claims_{payor_id}"]
+    
+    def _fetch_metrics(self):
+        """Totals, status counts and amount stats in one round trip"""
+        result = next(self.claims_collection.aggregate(ClaimModel.metrics_pipeline()), {})
+        totals = (result.get('totals') or [{}])[0]
+        by_status = [bucket for bucket in result.get('by_status', []) if bucket['_id']]
+        return totals, by_status
     
     def get_dashboard_metrics(self):
         """Get key metrics for payor dashboard"""
-        # Claims metrics
-        total_claims = self.claims_collection.count_documents({'payor_id': self.payor_id})
-        pending_claims = self.claims_collection.count_documents({
-            'payor_id': self.payor_id,
-            'status': 'pending'
-        })
-        approved_claims = self.claims_collection.count_documents({
-            'payor_id': self.payor_id,
-            'status': 'approved'
-        })
-        
-        # Pre-auth metrics
-        preauth_pending = self.preauth_collection.count_documents({
-            'payor_id': self.payor_id,
-            'status': 'pending'
-        })
-        
-        # Amount metrics
-        pipeline = [
-            {'$match': {'payor_id': self.payor_id}},
-            {'$group': {
-                '_id': None,
-                'total_amount': {'$sum': '$amount'},
-                'avg_amount': {'$avg': '$amount'}
-            }}
-        ]
-        
-        amount_result = list(self.claims_collection.aggregate(pipeline))
-        total_amount = amount_result[0]['total_amount'] if amount_result else 0
-        avg_amount = amount_result[0]['avg_amount'] if amount_result else 0
+        totals, by_status = self._fetch_metrics()
+        return self._summarize(totals, by_status)
+    
+    @staticmethod
+    def _summarize(totals, by_status):
+        status_counts = {bucket['_id']: bucket['count'] for bucket in by_status}
+        total_claims = totals.get('total_claims', 0)
+        approved_claims = status_counts.get('approved', 0)
         
         return {
             'total_claims': total_claims,
-            'pending_claims': pending_claims,
+            'pending_claims': status_counts.get('pending', 0),
             'approved_claims': approved_claims,
-            'preauth_pending': preauth_pending,
-            'total_amount': total_amount,
-            'average_claim_amount': avg_amount,
+            'preauth_pending': totals.get('preauth_pending', 0),
+            'total_amount': totals.get('total_amount', 0),
+            'average_claim_amount': totals.get('avg_amount') or 0,
+            'min_claim_amount': totals.get('min_amount') or 0,
+            'max_claim_amount': totals.get('max_amount') or 0,
+            'status_counts': status_counts,
             'approval_rate': (approved_claims / total_claims * 100) if total_claims > 0 else 0
         }
     
     def get_claims_by_status(self):
         """Get claims grouped by status"""
-        pipeline = [
-            {'$match': {'payor_id': self.payor_id}},
-            {'$group': {
-                '_id': '$status',
-                'count': {'$sum': 1},
-                'total_amount': {'$sum': '$amount'}
-            }}
-        ]
-        
-        return list(self.claims_collection.aggregate(pipeline))
+        return self._fetch_metrics()[1]
     
     def get_recent_activity(self, limit=10):
         """Get recent claims activity"""
-        return list(self.claims_collection.find(
-            {'payor_id': self.payor_id}
-        ).sort('last_updated', -1).limit(limit))
+        return list(self.claims_collection.find().sort('last_updated', -1).limit(limit))
+    
+    @classmethod
+    def get_network_metrics(cls, payor_ids=None, max_workers=8):
+        """Admin view of dashboard metrics across every claims_* collection, queried in parallel"""
+        payor_ids = payor_ids or MongoConnection.list_partitions('claims')
+        if not payor_ids:
+            return {'payors': {}, 'totals': cls._summarize({}, [])}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(payor_ids))) as executor:
+            results = dict(zip(
+                payor_ids,
+                executor.map(lambda payor_id: cls(payor_id)._fetch_metrics(), payor_ids)
+            ))
+        
+        # Combine the raw aggregates so the network-wide average is weighted by claim count
+        combined = {'total_claims': 0, 'total_amount': 0, 'preauth_pending': 0}
+        combined_status = {}
+        mins = []
+        maxes = []
+        for totals, by_status in results.values():
+            for key in combined:
+                combined[key] += totals.get(key, 0)
+            if totals.get('min_amount') is not None:
+                mins.append(totals['min_amount'])
+            if totals.get('max_amount') is not None:
+                maxes.append(totals['max_amount'])
+            for bucket in by_status:
+                entry = combined_status.setdefault(bucket['_id'], {'_id': bucket['_id'], 'count': 0, 'total_amount': 0})
+                entry['count'] += bucket['count']
+                entry['total_amount'] += bucket['total_amount']
+        
+        if combined['total_claims']:
+            combined['avg_amount'] = combined['total_amount'] / combined['total_claims']
+        combined['min_amount'] = min(mins) if mins else None
+        combined['max_amount'] = max(maxes) if maxes else None
+        
+        return {
+            'payors': {
+                payor_id: cls._summarize(totals, by_status)
+                for payor_id, (totals, by_status) in results.items()
+            },
+            'totals': cls._summarize(combined, list(combined_status.values()))
+        }
 
 
 class NotificationModel:
@@ -704,16 +1598,7 @@ class NotificationModel:
     def __init__(self):
         self.db = MongoConnection.get_database()
         self.collection = self.db.notifications
-        self._ensure_indexes()
-    
-    def _ensure_indexes(self):
-        """Ensure proper indexes"""
-        try:
-            self.collection.create_index([('claim_id', 1)])
-            self.collection.create_index([('recipient_type', 1)])
-            self.collection.create_index([('sent_date', -1)])
-        except Exception as e:
-            logger.warning(f"Notification index creation warning: {e}")
+        IndexRegistry.ensure(self.collection)
     
     def send_claim_notification(self, claim_data, notification_type, payor_info=None):
         """Send notification for claim status change"""
@@ -776,6 +1661,7 @@ class NotificationModel:
         return {
             '_id': ObjectId(),
             'claim_id': claim_id,
+            'payor_id': claim_data.get('payor_id'),
             'recipient_type': 'patient',
             'recipient_id': patient.get('member_id'),
             'recipient_name': patient.get('name'),
@@ -808,6 +1694,7 @@ class NotificationModel:
         return {
             '_id': ObjectId(),
             'claim_id': claim_id,
+            'payor_id': claim_data.get('payor_id'),
             'recipient_type': 'provider',
             'recipient_id': provider.get('provider_id'),
             'recipient_name': provider.get('name'),
@@ -818,9 +1705,12 @@ class NotificationModel:
             'payor_info': payor_info
         }
     
-    def get_notifications_for_claim(self, claim_id):
-        """Get all notifications sent for a claim"""
-        return list(self.collection.find({'claim_id': claim_id}).sort('sent_date', -1))
+    def get_notifications_for_claim(self, claim_id, payor_id=None):
+        """Get all notifications sent for a claim, scoped to the payor when given"""
+        query = {'claim_id': claim_id}
+        if payor_id:
+            query['payor_id'] = payor_id
+        return list(self.collection.find(query).sort('sent_date', -1))
 
 
 # Utility function to convert ObjectId to string for JSON serialization
@@ -0,0 +1,109 @@
+"""
+MongoDB connection pool monitoring for the HCMS Payor Backend
+Counts pool events per server so capacity planning can see pool size, checkout
+pressure and wait-queue timeouts without enabling driver debug logging
+"""
+import threading
+import time
+
+from pymongo import monitoring
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Thread-safe per-server counters fed by PyMongo connection pool events"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = {}
+        self._checkout_started = threading.local()
+    
+    def _server(self, address):
+        key = f"{address[0]}:{address[1]}"
+        server = self._servers.get(key)
+        if server is None:
+            server = self._servers[key] = {
+                'open_connections': 0,
+                'in_use': 0,
+                'max_in_use': 0,
+                'connections_created': 0,
+                'connections_closed': 0,
+                'checkouts': 0,
+                'checkout_failures': {},
+                'checkout_wait_ms_total': 0.0,
+                'checkout_wait_ms_max': 0.0,
+                'pool_clears': 0,
+            }
+        return server
+    
+    def pool_created(self, event):
+        with self._lock:
+            self._server(event.address)
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        with self._lock:
+            self._server(event.address)['pool_clears'] += 1
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server['connections_created'] += 1
+            server['open_connections'] += 1
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server['connections_closed'] += 1
+            server['open_connections'] = max(server['open_connections'] - 1, 0)
+    
+    def connection_check_out_started(self, event):
+        self._checkout_started.value = time.monotonic()
+    
+    def _checkout_wait_ms(self):
+        started = getattr(self._checkout_started, 'value', None)
+        return (time.monotonic() - started) * 1000 if started is not None else 0.0
+    
+    def connection_check_out_failed(self, event):
+        wait_ms = self._checkout_wait_ms()
+        with self._lock:
+            server = self._server(event.address)
+            reason = str(event.reason)
+            server['checkout_failures'][reason] = server['checkout_failures'].get(reason, 0) + 1
+            server['checkout_wait_ms_max'] = max(server['checkout_wait_ms_max'], wait_ms)
+    
+    def connection_checked_out(self, event):
+        wait_ms = self._checkout_wait_ms()
+        with self._lock:
+            server = self._server(event.address)
+            server['checkouts'] += 1
+            server['in_use'] += 1
+            server['max_in_use'] = max(server['max_in_use'], server['in_use'])
+            server['checkout_wait_ms_total'] += wait_ms
+            server['checkout_wait_ms_max'] = max(server['checkout_wait_ms_max'], wait_ms)
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server['in_use'] = max(server['in_use'] - 1, 0)
+    
+    def stats(self):
+        """Snapshot of the counters, with the average checkout wait per server"""
+        with self._lock:
+            snapshot = {}
+            for address, server in self._servers.items():
+                checkouts = server['checkouts']
+                snapshot[address] = {
+                    **{key: value for key, value in server.items() if key != 'checkout_wait_ms_total'},
+                    'checkout_failures': dict(server['checkout_failures']),
+                    'checkout_wait_ms_avg': round(server['checkout_wait_ms_total'] / checkouts, 3) if checkouts else 0.0,
+                    'checkout_wait_ms_max': round(server['checkout_wait_ms_max'], 3)
+                }
+            return snapshot
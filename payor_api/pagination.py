@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination helpers for MongoDB queries
+Cursors are opaque URL-safe tokens encoding the sort key of the last item on a page,
+so fetching page N costs the same index seek as fetching page 1
+"""
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'d': value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {'o': str(value)}
+    return {'v': value}
+
+
+def _decode_value(value):
+    if 'd' in value:
+        return datetime.fromisoformat(value['d'])
+    if 'o' in value:
+        return ObjectId(value['o'])
+    return value['v']
+
+
+def encode_cursor(document, sort):
+    """Build an opaque cursor from the sort key of the last document on a page"""
+    values = [_encode_value(document.get(field)) for field, _ in sort]
+    payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Decode a cursor into sort key values, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = [_decode_value(value) for value in values]
+    except (ValueError, TypeError, KeyError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    
+    if len(values) != len(sort):
+        raise ValueError("Invalid cursor: sort key mismatch")
+    return values
+
+
+def keyset_filter(sort, values):
+    """Query matching documents strictly after the given sort key"""
+    clauses = []
+    for position, (field, direction) in enumerate(sort):
+        clause = {sort[i][0]: values[i] for i in range(position)}
+        clause[field] = {'$lt' if direction < 0 else '$gt': values[position]}
+        clauses.append(clause)
+    return {'$or': clauses}
+
+
+def page_query(query, sort, cursor=None):
+    """Query for the page after `cursor`, or the first page"""
+    if cursor:
+        return {'$and': [query, keyset_filter(sort, decode_cursor(cursor, sort))]}
+    return query
+
+
+def split_page(documents, sort, limit):
+    """Trim a limit + 1 fetch to one page, returning (documents, next_cursor)"""
+    if len(documents) > limit:
+        documents = documents[:limit]
+        return documents, encode_cursor(documents[-1], sort)
+    return documents, None
+
+
+def fetch_page(collection, query, sort, cursor=None, limit=20, projection=None):
+    """Fetch one keyset page, returning (documents, next_cursor)"""
+    query = page_query(query, sort, cursor)
+    documents = list(collection.find(query, projection).sort(sort).limit(limit + 1))
+    return split_page(documents, sort, limit)
+
+
+async def fetch_page_async(collection, query, sort, cursor=None, limit=20, projection=None):
+    """fetch_page for a Motor collection"""
+    query = page_query(query, sort, cursor)
+    documents = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+    return split_page(documents, sort, limit)
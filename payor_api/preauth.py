@@ -0,0 +1,262 @@
+"""
+Pre-authorization rules and batch evaluation for the HCMS Payor Backend
+The same ordered rules drive single-claim evaluation (ClaimModel.evaluate_preauth)
+and the batch engine, which evaluates a payor's whole pending backlog in vectorized
+passes and writes the outcomes with one bulk_write per chunk
+"""
+import logging
+import math
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from bson import Decimal128
+from pymongo import UpdateMany
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the batch engine falls back to a Python loop
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+ROUTINE_URGENCIES = ('routine', 'standard')
+PREVENTIVE_TYPES = ('preventive', 'wellness', 'screening')
+
+# Outcome codes in rule order; the first matching rule wins
+EMERGENCY, UNREADABLE_AMOUNT, ROUTINE_UNDER_LIMIT, PREVENTIVE, OVER_MANUAL_LIMIT, STANDARD_REVIEW = range(6)
+
+
+def get_preauth_limits(payor_settings):
+    """Business rule thresholds from payor settings, with the documented defaults"""
+    return {
+        'emergency_auto_approve': payor_settings.get('emergency_auto_approve', True),
+        'auto_limit': payor_settings.get('auto_preauth_limit', 500.0),
+        'manual_limit': payor_settings.get('require_manual_review_over', 2000.0)
+    }
+
+
+def describe_outcome(outcome, limits):
+    """(preauth_status, timeline notes, approved, caller message) for an outcome code"""
+    auto_limit = limits['auto_limit']
+    manual_limit = limits['manual_limit']
+    return {
+        EMERGENCY: (
+            'approved', 'Auto-approved: Emergency case',
+            True, "Auto-approved for emergency treatment"
+        ),
+        UNREADABLE_AMOUNT: (
+            'manual_review', 'Requires manual review: Amount missing or not numeric',
+            False, "Requires manual review - amount missing or not numeric"
+        ),
+        ROUTINE_UNDER_LIMIT: (
+            'approved', f'Auto-approved: Amount under ${auto_limit}',
+            True, f"Auto-approved for routine treatment under ${auto_limit}"
+        ),
+        PREVENTIVE: (
+            'approved', 'Auto-approved: Preventive care',
+            True, "Auto-approved for preventive care"
+        ),
+        OVER_MANUAL_LIMIT: (
+            'manual_review', f'Requires manual review: Amount over ${manual_limit}',
+            False, f"Requires manual review - amount exceeds ${manual_limit}"
+        ),
+        STANDARD_REVIEW: (
+            'manual_review', 'Standard manual review required',
+            False, "Requires manual review"
+        ),
+    }[outcome]
+
+
+def _claim_amount(claim):
+    """The claim amount as a float, or NaN when it is missing or not numeric"""
+    amount = claim.get('amount')
+    if isinstance(amount, Decimal128):
+        amount = amount.to_decimal()
+    if isinstance(amount, bool) or not isinstance(amount, (int, float, Decimal, str)):
+        return math.nan
+    try:
+        amount = float(Decimal(amount.strip()) if isinstance(amount, str) else amount)
+    except (InvalidOperation, ValueError, OverflowError):
+        return math.nan
+    return amount if math.isfinite(amount) else math.nan
+
+
+def _claim_features(claim):
+    treatment = claim.get('treatment') or {}
+    diagnosis = claim.get('diagnosis') or {}
+    return (
+        _claim_amount(claim),
+        bool(diagnosis.get('emergency', False)),
+        str(treatment.get('urgency') or '').lower(),
+        str(treatment.get('type') or '').lower()
+    )
+
+
+def decide_preauth(claim, limits):
+    """Outcome code for a single claim"""
+    amount, emergency, urgency, treatment_type = _claim_features(claim)
+    
+    # Emergency cases - auto approve if enabled
+    if limits['emergency_auto_approve'] and emergency:
+        return EMERGENCY
+    
+    # Unreadable amounts cannot be checked against the limits - require manual review
+    if math.isnan(amount):
+        return UNREADABLE_AMOUNT
+    
+    # Routine procedures under limit - auto approve
+    if amount <= limits['auto_limit'] and urgency in ROUTINE_URGENCIES:
+        return ROUTINE_UNDER_LIMIT
+    
+    # Preventive care - auto approve
+    if treatment_type in PREVENTIVE_TYPES:
+        return PREVENTIVE
+    
+    # High amount claims - require manual review
+    if amount > limits['manual_limit']:
+        return OVER_MANUAL_LIMIT
+    
+    # Default to manual review for other cases
+    return STANDARD_REVIEW
+
+
+def decide_preauth_batch(claims, limits):
+    """Outcome codes for many claims, vectorized with NumPy when it is installed"""
+    if np is None:
+        return [decide_preauth(claim, limits) for claim in claims]
+    
+    features = [_claim_features(claim) for claim in claims]
+    if not features:
+        return []
+    
+    amounts = np.fromiter((f[0] for f in features), dtype=np.float64, count=len(features))
+    emergency = np.fromiter((f[1] for f in features), dtype=bool, count=len(features))
+    routine = np.fromiter((f[2] in ROUTINE_URGENCIES for f in features), dtype=bool, count=len(features))
+    preventive = np.fromiter((f[3] in PREVENTIVE_TYPES for f in features), dtype=bool, count=len(features))
+    
+    conditions = [
+        emergency & bool(limits['emergency_auto_approve']),
+        np.isnan(amounts),
+        (amounts <= limits['auto_limit']) & routine,
+        preventive,
+        amounts > limits['manual_limit'],
+    ]
+    choices = [EMERGENCY, UNREADABLE_AMOUNT, ROUTINE_UNDER_LIMIT, PREVENTIVE, OVER_MANUAL_LIMIT]
+    return np.select(conditions, choices, default=STANDARD_REVIEW).tolist()
+
+
+class BatchPreAuthEngine:
+    """Evaluate every pending pre-authorization for a payor in chunks"""
+    
+    PROJECTION = {
+        'claim_id': 1,
+        'amount': 1,
+        'total_amount': 1,
+        'status': 1,
+        'auto_approved': 1,
+        'preauth_status': 1,
+        'treatment.urgency': 1,
+        'treatment.type': 1,
+        'diagnosis.emergency': 1,
+        'timeline': 1
+    }
+    
+    def __init__(self, payor_id, chunk_size=10000):
+        from .models import ClaimModel, get_payor_settings
+        self.payor_id = payor_id
+        self.chunk_size = chunk_size
+        self.claim_model = ClaimModel(payor_id=payor_id)
+        self.limits = get_preauth_limits(get_payor_settings(payor_id))
+    
+    def run(self):
+        """Evaluate the pending backlog, returning counts per preauth outcome"""
+        summary = {'evaluated': 0, 'approved': 0, 'manual_review': 0}
+        last_id = None
+        
+        while True:
+            query = {'preauth_status': 'pending'}
+            if last_id is not None:
+                query['_id'] = {'$gt': last_id}
+            
+            claims = list(
+                self.claim_model.collection.find(query, self.PROJECTION)
+                .sort('_id', 1)
+                .limit(self.chunk_size)
+            )
+            if not claims:
+                break
+            
+            last_id = claims[-1]['_id']
+            chunk_summary = self._apply_chunk(claims)
+            for key, count in chunk_summary.items():
+                summary[key] += count
+            
+            if len(claims) < self.chunk_size:
+                break
+        
+        logger.info(f"Batch pre-auth for payor {self.payor_id}: {summary}")
+        return summary
+    
+    def _apply_chunk(self, claims):
+        outcomes = decide_preauth_batch(claims, self.limits)
+        
+        ids_by_outcome = {}
+        for claim, outcome in zip(claims, outcomes):
+            ids_by_outcome.setdefault(outcome, []).append(claim['_id'])
+        
+        # BSON dates keep milliseconds; truncate so the stored preauth_updated compares equal
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        operations = []
+        for outcome, claim_ids in ids_by_outcome.items():
+            preauth_status, notes, _, _ = describe_outcome(outcome, self.limits)
+            operations.append(UpdateMany(
+                # Re-check pending so claims decided concurrently are left alone
+                {'_id': {'$in': claim_ids}, 'preauth_status': 'pending'},
+                {
+                    '$set': {
+                        'preauth_status': preauth_status,
+                        'preauth_updated': now,
+                        'preauth_notes': notes,
+                        'last_updated': now
+                    },
+                    '$push': {'timeline': self.claim_model.timeline_push({
+                        'timestamp': now,
+                        'action': f'Pre-auth {preauth_status}',
+                        'notes': notes,
+                        'automated': True
+                    })}
+                }
+            ))
+        
+        result = self.claim_model.collection.bulk_write(operations, ordered=False)
+        written = zip(claims, outcomes)
+        if result.modified_count != len(claims):
+            # Claims decided concurrently were skipped by the pending guard; only the ones stamped
+            # with this chunk's preauth_updated were written
+            written_ids = {
+                claim['_id'] for claim in self.claim_model.collection.find(
+                    {'_id': {'$in': [claim['_id'] for claim in claims]}, 'preauth_updated': now}, {'_id': 1}
+                )
+            }
+            written = [(claim, outcome) for claim, outcome in written if claim['_id'] in written_ids]
+            logger.info(
+                f"Batch pre-auth for payor {self.payor_id} updated {len(written)} of {len(claims)} claims; "
+                f"the rest were decided concurrently"
+            )
+        written = list(written)
+        
+        # Inline timelines are bounded, so the entries trimmed by $slice were read with the chunk
+        self.claim_model.spill_timelines(
+            [(claim.get('claim_id'), claim.get('timeline')) for claim, _ in written]
+        )
+        self.claim_model._record_changes([
+            (claim, {**claim, 'preauth_status': describe_outcome(outcome, self.limits)[0]})
+            for claim, outcome in written
+        ])
+        
+        summary = {'evaluated': len(written), 'approved': 0, 'manual_review': 0}
+        for _, outcome in written:
+            summary[describe_outcome(outcome, self.limits)[0]] += 1
+        return summary
@@ -0,0 +1,61 @@
+"""
+JSON rendering of raw MongoDB documents for the HCMS Payor Backend
+Encodes BSON types (ObjectId, datetime, Decimal128, Int64) while serializing, so views
+can return PyMongo documents without copying them through convert_objectid_to_string
+"""
+from datetime import date, datetime
+
+from bson import Decimal128, ObjectId
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+
+def encode_bson_value(value):
+    """JSON-compatible value for a BSON type, raising TypeError for anything else"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class BSONJSONEncoder(JSONEncoder):
+    """DRF JSON encoder that also understands BSON types"""
+    
+    def default(self, obj):
+        # Full isoformat, matching convert_objectid_to_string (DRF would truncate to milliseconds)
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        try:
+            return encode_bson_value(obj)
+        except TypeError:
+            return super().default(obj)
+
+
+def _orjson_default(obj):
+    try:
+        return encode_bson_value(obj)
+    except TypeError:
+        # Decimal, UUID, lazy translation strings and the like
+        return BSONJSONEncoder().default(obj)
+
+
+class BSONJSONRenderer(JSONRenderer):
+    """JSON renderer that serializes MongoDB documents in a single pass, using orjson when installed"""
+    encoder_class = BSONJSONEncoder
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        # Indented output (browsable API, ?indent=) keeps DRF's formatting
+        if orjson is None or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        # Int64 is an int subclass, and orjson's native datetime output matches isoformat()
+        return orjson.dumps(data, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
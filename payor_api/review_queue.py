@@ -0,0 +1,132 @@
+"""
+Lease-based manual review queue for the HCMS Payor Backend
+Reviewers atomically lease the oldest unassigned claims awaiting manual review; leases
+expire unless renewed by a heartbeat, so claims held by a closed browser tab return to
+the queue without a cleanup job
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from pymongo import ReturnDocument
+
+from .models import CLAIM_PROJECTIONS, REVIEW_LEASE_EXPIRES, REVIEW_LEASE_OWNER, ClaimModel
+
+
+DEFAULT_REVIEW_QUEUE_SETTINGS = {
+    'LEASE_SECONDS': 300,
+    'MAX_LEASE_SECONDS': 1800,
+    'MAX_LEASE_COUNT': 25,
+}
+
+# Claims submitted for review, and pending claims pre-auth routed to manual review
+REVIEW_QUEUE_QUERY = {
+    '$or': [
+        {'status': 'under_review'},
+        {'status': 'pending', 'preauth_status': 'manual_review'}
+    ]
+}
+
+# Oldest submission first; _id breaks ties within a timestamp
+REVIEW_QUEUE_SORT = [('submitted_date', 1), ('_id', 1)]
+
+LEASE_OWNER = REVIEW_LEASE_OWNER
+LEASE_EXPIRES = REVIEW_LEASE_EXPIRES
+
+REVIEW_QUEUE_PROJECTION = {**CLAIM_PROJECTIONS['review'], LEASE_OWNER: 1, LEASE_EXPIRES: 1}
+
+
+def get_review_queue_settings():
+    return {**DEFAULT_REVIEW_QUEUE_SETTINGS, **getattr(settings, 'REVIEW_QUEUE', {})}
+
+
+class ReviewQueue:
+    """Manual review work queue over one payor's claims"""
+    
+    def __init__(self, payor_id):
+        self.payor_id = payor_id
+        self.collection = ClaimModel(payor_id=payor_id).collection
+        self.config = get_review_queue_settings()
+    
+    def _lease_duration(self, lease_seconds=None):
+        seconds = lease_seconds or self.config['LEASE_SECONDS']
+        return timedelta(seconds=min(max(int(seconds), 1), self.config['MAX_LEASE_SECONDS']))
+    
+    def _available_query(self, now):
+        """Queue claims with no lease, or whose lease has expired"""
+        return {
+            'payor_id': self.payor_id,
+            '$and': [
+                REVIEW_QUEUE_QUERY,
+                # $not also matches claims that were never leased
+                {LEASE_EXPIRES: {'$not': {'$gt': now}}}
+            ]
+        }
+    
+    def _held_query(self, reviewer_id, now, claim_ids=None):
+        """Queue claims the reviewer holds an unexpired lease on"""
+        query = {
+            'payor_id': self.payor_id,
+            LEASE_OWNER: reviewer_id,
+            LEASE_EXPIRES: {'$gt': now},
+            '$and': [REVIEW_QUEUE_QUERY]
+        }
+        if claim_ids is not None:
+            query['claim_id'] = {'$in': list(claim_ids)}
+        return query
+    
+    def lease(self, reviewer_id, count=1, lease_seconds=None):
+        """Lease up to `count` of the oldest available claims to a reviewer"""
+        count = min(max(int(count), 1), self.config['MAX_LEASE_COUNT'])
+        now = datetime.utcnow()
+        expires_at = now + self._lease_duration(lease_seconds)
+        
+        # Each find_one_and_update takes one claim atomically, so concurrent reviewers never share a claim.
+        # Leasing leaves last_updated alone: it is not a claim change and must not break decision guards.
+        leased = []
+        for _ in range(count):
+            claim = self.collection.find_one_and_update(
+                self._available_query(now),
+                {'$set': {LEASE_OWNER: reviewer_id, LEASE_EXPIRES: expires_at}},
+                sort=REVIEW_QUEUE_SORT,
+                projection=REVIEW_QUEUE_PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
+            if claim is None:
+                break
+            leased.append(claim)
+        return leased
+    
+    def renew(self, reviewer_id, claim_ids, lease_seconds=None):
+        """
+        Heartbeat: extend the reviewer's unexpired leases
+        Returns (renewed {claim_id: expires_at}, lost claim_ids) for leases that expired or were decided
+        """
+        now = datetime.utcnow()
+        expires_at = now + self._lease_duration(lease_seconds)
+        
+        query = self._held_query(reviewer_id, now, claim_ids)
+        self.collection.update_many(query, {'$set': {LEASE_EXPIRES: expires_at}})
+        
+        renewed = {
+            claim['claim_id']: claim[LEASE_EXPIRES]
+            for claim in self.collection.find(query, {'claim_id': 1, LEASE_EXPIRES: 1})
+        }
+        lost = [claim_id for claim_id in claim_ids if claim_id not in renewed]
+        return renewed, lost
+    
+    def release(self, reviewer_id, claim_ids):
+        """Return the reviewer's leased claims to the queue"""
+        result = self.collection.update_many(
+            {'payor_id': self.payor_id, 'claim_id': {'$in': list(claim_ids)}, LEASE_OWNER: reviewer_id},
+            {'$unset': {LEASE_OWNER: '', LEASE_EXPIRES: ''}}
+        )
+        return result.modified_count
+    
+    def get_leases(self, reviewer_id):
+        """Claims currently leased to a reviewer, oldest first"""
+        query = self._held_query(reviewer_id, datetime.utcnow())
+        return list(self.collection.find(query, REVIEW_QUEUE_PROJECTION).sort(REVIEW_QUEUE_SORT))
+    
+    def count_available(self):
+        """Queue depth: claims awaiting review that nobody holds"""
+        return self.collection.count_documents(self._available_query(datetime.utcnow()))
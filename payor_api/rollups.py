@@ -0,0 +1,188 @@
+"""
+Claim volume time-series rollups for the HCMS Payor Backend
+Claim counts and amounts are kept per payor in hourly, daily and monthly buckets of
+submitted_date, updated with $inc on every claim write and rebuilt by backfill
+"""
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from .models import CLAIM_AMOUNT_EXPR, MongoConnection, claim_amount
+
+logger = logging.getLogger(__name__)
+
+
+HOUR, DAY, MONTH = 'hour', 'day', 'month'
+
+# Bucket _ids sort chronologically within a granularity, e.g. 'H:2024-10-16T13'
+BUCKET_FORMATS = {
+    HOUR: 'H:%Y-%m-%dT%H',
+    DAY: 'D:%Y-%m-%d',
+    MONTH: 'M:%Y-%m',
+}
+
+
+def truncate(value, granularity):
+    """Start of the bucket containing a datetime"""
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if granularity in (DAY, MONTH):
+        value = value.replace(hour=0)
+    if granularity == MONTH:
+        value = value.replace(day=1)
+    return value
+
+
+def next_bucket(start, granularity):
+    """Start of the bucket after the one beginning at `start`"""
+    if granularity == HOUR:
+        return start + timedelta(hours=1)
+    if granularity == DAY:
+        return start + timedelta(days=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def bucket_id(start, granularity):
+    return start.strftime(BUCKET_FORMATS[granularity])
+
+
+# Widest range a volume query may cover (about ten years)
+MAX_RANGE_DAYS = 3660
+
+# Bucket arithmetic steps up to a month past `end`, so keep it clear of datetime.max
+LATEST_END = datetime.max - timedelta(days=62)
+
+
+def validate_range(start, end):
+    """Raise ValueError unless [start, end) is ordered, in range and at most MAX_RANGE_DAYS long"""
+    if start >= end:
+        raise ValueError('start must be before end')
+    if end > LATEST_END:
+        raise ValueError(f'end must be before {LATEST_END.date().isoformat()}')
+    if end - start > timedelta(days=MAX_RANGE_DAYS):
+        raise ValueError(f'The range may cover at most {MAX_RANGE_DAYS} days')
+
+
+def cover_range(start, end):
+    """Coarsest (granularity, bucket_start) list covering [start, end), widened to whole hours"""
+    # Whole months use month buckets, remaining whole days use day buckets, ragged edges use hours
+    start = truncate(start, HOUR)
+    if end != truncate(end, HOUR):
+        end = truncate(end, HOUR) + timedelta(hours=1)
+    
+    buckets = []
+    cursor = start
+    while cursor < end:
+        for granularity in (MONTH, DAY, HOUR):
+            if truncate(cursor, granularity) == cursor and next_bucket(cursor, granularity) <= end:
+                buckets.append((granularity, cursor))
+                cursor = next_bucket(cursor, granularity)
+                break
+    return buckets
+
+
+class ClaimVolumeRollup:
+    """Hourly, daily and monthly claim volume buckets for one payor"""
+    
+    def __init__(self, payor_id):
+        self.db = MongoConnection.get_database()
+        self.payor_id = payor_id
+        # Range queries may use a secondary; the $inc writes always go to the primary
+        self.collection = MongoConnection.get_database('analytics')[f"claim_volume_{payor_id}"]
+    
+    @staticmethod
+    def claim_contribution(claim):
+        """{bucket_id: (count, amount)} a single claim contributes"""
+        submitted = (claim or {}).get('submitted_date')
+        if not isinstance(submitted, datetime):
+            return {}
+        
+        amount = claim_amount(claim)
+        return {
+            bucket_id(truncate(submitted, granularity), granularity): (1, amount)
+            for granularity in BUCKET_FORMATS
+        }
+    
+    def apply_changes(self, changes):
+        """Apply the summed bucket deltas of several (old_claim, new_claim) pairs"""
+        deltas = {}
+        for old_claim, new_claim in changes:
+            for sign, claim in ((-1, old_claim), (1, new_claim)):
+                for key, (count, amount) in self.claim_contribution(claim).items():
+                    current = deltas.get(key, (0, 0))
+                    deltas[key] = (current[0] + sign * count, current[1] + sign * amount)
+        
+        operations = [
+            UpdateOne(
+                {'_id': key},
+                {'$inc': {'count': count, 'amount': amount}},
+                upsert=True
+            )
+            for key, (count, amount) in deltas.items() if count or amount
+        ]
+        if not operations:
+            return
+        
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            # Buckets can be rebuilt with backfill_claim_volume; never fail the claim write
+            logger.warning(f"Claim volume rollup update failed for payor {self.payor_id}: {e}")
+    
+    def backfill(self):
+        """Rebuild every bucket from the payor's claim history"""
+        pipeline = [
+            {'$match': {'submitted_date': {'$type': 'date'}}},
+            {'$group': {
+                '_id': {'$dateToString': {'format': BUCKET_FORMATS[HOUR], 'date': '$submitted_date'}},
+                'count': {'$sum': 1},
+                'amount': {'$sum': CLAIM_AMOUNT_EXPR}
+            }}
+        ]
+        claims_collection = self.db[f"claims_{self.payor_id}"]
+        
+        # Day and month buckets are summed from the hourly groups rather than rescanning claims
+        buckets = {}
+        for doc in claims_collection.aggregate(pipeline, allowDiskUse=True):
+            hour_start = datetime.strptime(doc['_id'], BUCKET_FORMATS[HOUR])
+            for granularity in BUCKET_FORMATS:
+                key = bucket_id(truncate(hour_start, granularity), granularity)
+                count, amount = buckets.get(key, (0, 0))
+                buckets[key] = (count + doc['count'], amount + doc['amount'])
+        
+        # Live $inc updates made while the backfill runs can be lost; run it while claim intake is quiet
+        self.collection.delete_many({})
+        if buckets:
+            self.collection.insert_many(
+                [{'_id': key, 'count': count, 'amount': amount} for key, (count, amount) in buckets.items()],
+                ordered=False
+            )
+        
+        logger.info(f"Backfilled {len(buckets)} claim volume bucket(s) for payor {self.payor_id}")
+        return len(buckets)
+    
+    def get_volume(self, start, end):
+        """Claim volume over [start, end) as the coarsest buckets that cover it; raises ValueError for invalid ranges"""
+        validate_range(start, end)
+        cover = cover_range(start, end)
+        ids = [bucket_id(bucket_start, granularity) for granularity, bucket_start in cover]
+        stored = {doc['_id']: doc for doc in self.collection.find({'_id': {'$in': ids}})}
+        
+        buckets = []
+        for key, (granularity, bucket_start) in zip(ids, cover):
+            doc = stored.get(key, {})
+            buckets.append({
+                'granularity': granularity,
+                'start': bucket_start,
+                'end': next_bucket(bucket_start, granularity),
+                'count': doc.get('count', 0),
+                'amount': doc.get('amount', 0)
+            })
+        
+        return {
+            'start': cover[0][1] if cover else start,
+            'end': buckets[-1]['end'] if buckets else end,
+            'total_count': sum(bucket['count'] for bucket in buckets),
+            'total_amount': sum(bucket['amount'] for bucket in buckets),
+            'buckets': buckets
+        }
@@ -0,0 +1,238 @@
+"""
+In-memory insurance -> payor routing for claim submission
+The insurance_payor_mappings collection is preloaded into a compact dict and kept
+fresh by a MongoDB change stream, falling back to polling a version stamp when
+change streams are unavailable (standalone servers)
+"""
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ROUTING_SETTINGS = {
+    'USE_CHANGE_STREAMS': True,
+    'POLL_INTERVAL_SECONDS': 30,
+    # Full reload even without a version bump, for mappings written outside the model
+    'MAX_AGE_SECONDS': 600,
+}
+
+VERSION_KEY = 'insurance_payor_mappings'
+
+
+def get_routing_settings():
+    return {**DEFAULT_ROUTING_SETTINGS, **getattr(settings, 'INSURANCE_ROUTING', {})}
+
+
+class MongoRoutingSource:
+    """Routing data backed by the insurance_payor_mappings collection"""
+    
+    def __init__(self):
+        from .models import MongoConnection
+        self.db = MongoConnection.get_database()
+        self.collection = self.db.insurance_payor_mappings
+        self.versions = self.db.collection_versions
+    
+    def load_all(self):
+        cursor = self.collection.find({}, {'_id': 0, 'insurance_id': 1, 'payor_id': 1})
+        return {
+            mapping['insurance_id']: mapping['payor_id']
+            for mapping in cursor
+            if mapping.get('insurance_id') and mapping.get('payor_id')
+        }
+    
+    def get_version(self):
+        stamp = self.versions.find_one({'_id': VERSION_KEY})
+        return stamp.get('version', 0) if stamp else 0
+    
+    def bump_version(self):
+        self.versions.update_one(
+            {'_id': VERSION_KEY},
+            {'$inc': {'version': 1}, '$set': {'last_updated': datetime.utcnow()}},
+            upsert=True
+        )
+    
+    def watch(self, on_change, stop_event):
+        """Stream mapping changes to on_change(insurance_id, payor_id_or_None, reload)"""
+        with self.collection.watch(full_document='updateLookup') as stream:
+            # Pick up anything written between the initial load and the stream opening
+            on_change(None, None, True)
+            while not stop_event.is_set():
+                change = stream.try_next()
+                if change is None:
+                    stop_event.wait(1)
+                    continue
+                
+                operation = change.get('operationType')
+                document = change.get('fullDocument') or {}
+                if operation in ('insert', 'update', 'replace') and document.get('insurance_id'):
+                    on_change(document['insurance_id'], document.get('payor_id'), False)
+                else:
+                    # Deletes only carry _id, and drops/renames invalidate everything
+                    on_change(None, None, True)
+
+
+class StaticRoutingSource:
+    """Local in-memory stand-in for MongoRoutingSource, for tests and scripts"""
+    
+    def __init__(self, mappings=None):
+        self.mappings = dict(mappings or {})
+        self.version = 0
+    
+    def load_all(self):
+        return dict(self.mappings)
+    
+    def get_version(self):
+        return self.version
+    
+    def bump_version(self):
+        self.version += 1
+    
+    def set_mapping(self, insurance_id, payor_id):
+        self.mappings[insurance_id] = payor_id
+        self.bump_version()
+    
+    def remove_mapping(self, insurance_id):
+        self.mappings.pop(insurance_id, None)
+        self.bump_version()
+
+
+class InsuranceRoutingTable:
+    """Preloaded insurance_id -> payor_id table; lookups never touch the database"""
+    
+    def __init__(self, source, config=None):
+        self.source = source
+        self.config = config or get_routing_settings()
+        self._routes = {}
+        self._version = None
+        self._loaded_at = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Serializes the first load; reload() itself takes _lock, so it cannot be held here
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher = None
+        self.mode = 'manual'
+    
+    def lookup(self, insurance_id):
+        """Payor ID for an insurance ID, or None"""
+        self._ensure_loaded()
+        return self._routes.get(insurance_id)
+    
+    def lookup_many(self, insurance_ids):
+        """Payor IDs for several insurance IDs, keyed by insurance_id (unknown IDs omitted)"""
+        self._ensure_loaded()
+        routes = self._routes
+        return {
+            insurance_id: routes[insurance_id]
+            for insurance_id in insurance_ids if insurance_id in routes
+        }
+    
+    def reload(self):
+        """Rebuild the table from the source"""
+        version = self.source.get_version()
+        # Payor IDs repeat across millions of members; intern them so the table stays compact
+        routes = {
+            sys.intern(str(insurance_id)): sys.intern(str(payor_id))
+            for insurance_id, payor_id in self.source.load_all().items()
+        }
+        
+        with self._lock:
+            self._routes = routes
+            self._version = version
+            self._loaded_at = time.monotonic()
+            self._loaded = True
+        
+        logger.info(f"Insurance routing table loaded: {len(routes)} mappings (version {version})")
+    
+    def apply_change(self, insurance_id, payor_id=None, reload=False):
+        """Apply a single mapping change, or reload everything"""
+        if reload or insurance_id is None:
+            self.reload()
+            return
+        
+        # A single dict set or pop is atomic for concurrent readers, so the table is updated in place
+        # rather than copied per event
+        with self._lock:
+            if payor_id:
+                self._routes[sys.intern(str(insurance_id))] = sys.intern(str(payor_id))
+            else:
+                self._routes.pop(insurance_id, None)
+    
+    def stats(self):
+        return {
+            'mappings': len(self._routes),
+            'version': self._version,
+            'mode': self.mode,
+            'age_seconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded else None
+        }
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        # Concurrent first lookups wait for one full load instead of each scanning the collection
+        with self._load_lock:
+            if not self._loaded:
+                self.reload()
+        self.start()
+    
+    def start(self):
+        """Start keeping the table fresh in the background (idempotent)"""
+        if isinstance(self.source, StaticRoutingSource):
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(
+                target=self._refresh_loop,
+                name='insurance-routing-refresher',
+                daemon=True
+            )
+            self._refresher.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _refresh_loop(self):
+        if self.config['USE_CHANGE_STREAMS']:
+            try:
+                self.mode = 'change_stream'
+                self.source.watch(self.apply_change, self._stop)
+                return
+            except Exception as e:
+                logger.info(f"Change streams unavailable for insurance routing, polling instead: {e}")
+        
+        self.mode = 'polling'
+        while not self._stop.wait(self.config['POLL_INTERVAL_SECONDS']):
+            try:
+                too_old = time.monotonic() - self._loaded_at > self.config['MAX_AGE_SECONDS']
+                if too_old or self.source.get_version() != self._version:
+                    self.reload()
+            except Exception as e:
+                logger.warning(f"Insurance routing refresh failed: {e}")
+
+
+_routing_table = None
+_routing_table_lock = threading.Lock()
+
+
+def get_routing_table():
+    """Process-wide routing table backed by MongoDB"""
+    global _routing_table
+    if _routing_table is None:
+        with _routing_table_lock:
+            if _routing_table is None:
+                _routing_table = InsuranceRoutingTable(MongoRoutingSource())
+    return _routing_table
+
+
+def set_routing_table(table):
+    """Replace the process-wide table, e.g. with one built on StaticRoutingSource"""
+    global _routing_table
+    with _routing_table_lock:
+        _routing_table = table
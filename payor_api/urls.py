@@ -1,11 +1,12 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'payor_api'
 
 urlpatterns = [
     # Health check endpoint
     path('health/', views.HealthCheckAPIView.as_view(), name='health-check'),
+    path('health/details/', views.HealthDetailsAPIView.as_view(), name='health-details'),
     
     # Authentication endpoints
     path('login/', views.PayorLoginAPIView.as_view(), name='payor-login'),
@@ -18,6 +19,10 @@ urlpatterns = [
     # Claims endpoints
     path('claims/', views.PayorClaimsAPIView.as_view(), name='payor-claims'),
     path('claims/summary/', views.PayorClaimsSummaryAPIView.as_view(), name='payor-claims-summary'),
+    path('claims/bulk/', views.PayorClaimsBulkAPIView.as_view(), name='payor-claims-bulk'),
+    path('claims/export/', views.PayorClaimsExportAPIView.as_view(), name='payor-claims-export'),
+    path('claims/volume/', views.PayorClaimsVolumeAPIView.as_view(), name='payor-claims-volume'),
+    path('claims/<str:claim_id>/timeline/', views.PayorClaimTimelineAPIView.as_view(), name='payor-claim-timeline'),
     
     # Analytics endpoint
     path('analytics/', views.PayorAnalyticsAPIView.as_view(), name='payor-analytics'),
@@ -28,5 +33,15 @@ urlpatterns = [
     # Enhanced Payor Views (2 comprehensive views as requested)
     path('payor/dashboard-api/', views.PayorDashboardAPIView.as_view(), name='payor-dashboard-api'),
     path('payor/review/', views.PayorClaimReviewAPIView.as_view(), name='payor-review-list'),
+    path('payor/review/queue/', views.PayorReviewQueueAPIView.as_view(), name='payor-review-queue'),
+    path('payor/review/queue/<str:action>/', views.PayorReviewQueueAPIView.as_view(), name='payor-review-queue-action'),
+    path('payor/review/decisions/', views.PayorClaimDecisionBatchAPIView.as_view(), name='payor-review-decisions'),
     path('payor/review/<str:claim_id>/', views.PayorClaimReviewAPIView.as_view(), name='payor-review-detail'),
+    
+    # Async variants of the hot read endpoints (serve with an ASGI server)
+    path('async/health/', async_views.health_check, name='async-health-check'),
+    path('async/claims/', async_views.claims_list, name='async-claims'),
+    path('async/claims/summary/', async_views.claims_summary, name='async-claims-summary'),
+    path('async/policies/', async_views.policies, name='async-policies'),
+    path('async/payor/dashboard-api/', async_views.dashboard, name='async-payor-dashboard-api'),
 ]
\ No newline at end of file
@@ -5,43 +5,149 @@ Django REST API views for Payor operations with MongoDB integration
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from datetime import datetime, timedelta
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import hashlib
+import hmac
+import json
 import logging
-from .models import ClaimModel, NotificationModel, PayorModel, MemberModel, PolicyModel, convert_objectid_to_string
-
-# Custom user class for JWT tokens
-class PayorUser:
-    """Custom user class for payor authentication with JWT"""
-    def __init__(self, payor_data):
-        self.id = payor_data.get('payor_id')
-        self.payor_id = payor_data.get('payor_id')
-        self.email = payor_data.get('email')
-        self.name = payor_data.get('name')
-        self.organization = payor_data.get('organization')
-        self.is_active = payor_data.get('is_active', True)
-        self.is_authenticated = True
-    
-    @property
-    def is_anonymous(self):
-        return False
+from .analytics import ClaimAnalyticsRollup
+from .authentication import PayorAuthentication, PayorUser, get_auth_cache_stats
+from .claim_detail import ClaimDetailAssembler
+from .coverage import check_policy_coverage, get_policy_cache
+from .exports import EXPORT_FORMATS, build_export_query, iter_claims, iter_csv, iter_ndjson
+from .loaders import get_claim_context_loaders, parse_includes, with_context_fields
+from .parsers import NDJSONParser
+from .review_queue import ReviewQueue, get_review_queue_settings
+from .rollups import ClaimVolumeRollup
+from .routing import get_routing_table
+from .models import (
+    CLAIM_PROJECTIONS, DECISION_STATUSES, ClaimLeasedError, ClaimModel, ClaimStatsModel, InsurancePayorMappingModel, NotificationModel, PayorModel,
+    MemberModel, MongoConnection, PolicyModel, PreAuthorizationModel, get_payor_settings_cache_stats
+)
+from .webhooks import enqueue_webhooks
 
 logger = logging.getLogger(__name__)
 
-# Simple serializers for API responses
+# Simple serializers for API responses; BSONJSONRenderer encodes ObjectId and datetime values
 class ClaimSerializer:
     @staticmethod
     def serialize(claim):
         """Serialize claim data for API response"""
-        return convert_objectid_to_string(claim)
+        return claim
 
 class PayorSerializer:
     @staticmethod
     def serialize(payor):
         """Serialize payor data for API response"""
-        return convert_objectid_to_string(payor)
+        return payor
+
+
+def _paginate_claims(claim_model, page, limit, cursor=None, projection=None):
+    """
+    Fetch one page of claims, returning (claims, next_cursor)
+    Cursor requests (and page 1) use keyset pagination; numbered pages beyond 1
+    fall back to skip/limit for older clients
+    """
+    if cursor or page <= 1:
+        return claim_model.get_page(cursor=cursor, limit=limit, projection=projection)
+    
+    claims = claim_model.get_all(skip=(page - 1) * limit, limit=limit, projection=projection)
+    next_cursor = ClaimModel.page_cursor(claims[-1]) if len(claims) == limit else None
+    return claims, next_cursor
+
+
+def _get_claim_projection(request, default_view):
+    """Projection from the `fields=` or `view=` query parameters; raises ValueError when invalid"""
+    return ClaimModel.resolve_projection(
+        view=request.GET.get('view', default_view),
+        fields=request.GET.get('fields')
+    )
+
+
+def _list_claim(claim):
+    """Claims list item: the flat claim plus the nested patient/provider objects the frontend expects"""
+    return {
+        **claim,
+        'patient': {
+            'name': claim.get('patient_name', 'Unknown Patient'),
+            'id': claim.get('patient_id', ''),
+            'insurance_id': claim.get('insurance_id', '')
+        },
+        'provider': {
+            'name': claim.get('provider_name', 'Unknown Provider'),
+            'id': claim.get('provider_id', '')
+        }
+    }
+
+
+def _summarize_claim_stats(claim_stats):
+    """Claims summary block from a payor's claim_stats counters"""
+    status_counts = claim_stats['status_counts']
+    total_claims = claim_stats['total_claims']
+    approved_claims = status_counts.get('approved', 0)
+    
+    return {
+        'total_claims': total_claims,
+        'pending_claims': status_counts.get('pending', 0),
+        'approved_claims': approved_claims,
+        'rejected_claims': status_counts.get('rejected', 0),
+        'total_amount': claim_stats['total_amount'],
+        'approval_rate': (approved_claims / total_claims * 100) if total_claims > 0 else 0
+    }
+
+
+def _dashboard_metrics(claim_metrics, active_members):
+    """Dashboard metrics from a payor's claim_stats counters and active member count"""
+    status_counts = claim_metrics['status_counts']
+    
+    # Calculate basic metrics
+    total_claims = claim_metrics['total_claims']
+    pending_claims = status_counts.get('pending', 0)
+    approved_claims = status_counts.get('approved', 0)
+    rejected_claims = status_counts.get('rejected', 0)
+    partially_approved_claims = status_counts.get('partially_approved', 0)
+    
+    # Calculate financial metrics
+    total_amount = claim_metrics['total_amount']
+    average_claim_amount = total_amount / total_claims if total_claims > 0 else 0
+    
+    # Calculate approval rate
+    processed_claims = approved_claims + rejected_claims + partially_approved_claims
+    approval_rate = (approved_claims / processed_claims * 100) if processed_claims > 0 else 0
+    
+    return {
+        'total_claims': total_claims,
+        'pending_claims': pending_claims,
+        'approved_claims': approved_claims,
+        'rejected_claims': rejected_claims,
+        'partially_approved_claims': partially_approved_claims,
+        'approval_rate': round(approval_rate, 1),
+        'total_amount': total_amount,
+        'average_claim_amount': round(average_claim_amount, 2),
+        'preauth_pending': claim_metrics['preauth_pending'],
+        'active_members': active_members,
+        'auto_approved_count': claim_metrics['auto_approved_count'],
+        'manual_review_count': claim_metrics['manual_review_count'],
+        'avg_processing_time': '2.3'  # Mock data - implement actual calculation
+    }
+
+
+def _dashboard_pagination(page, page_size, total_claims, next_cursor):
+    """Dashboard pagination block; totals come from the claim_stats counters, not the fetched page"""
+    return {
+        'current_page': page,
+        'total_pages': (total_claims + page_size - 1) // page_size,
+        'total_claims': total_claims,
+        'page_size': page_size,
+        'next_cursor': next_cursor
+    }
 
 
 class PayorLoginAPIView(APIView):
@@ -228,14 +334,14 @@ class PayorPoliciesAPIView(APIView):
     Payor Policies API View
     Provides insurance policies for authenticated payors
     """
-    permission_classes = [AllowAny]  # We'll handle authentication manually
-    authentication_classes = []  # Disable automatic JWT authentication
+    permission_classes = [AllowAny]  # Views return their own 401 for anonymous requests
+    authentication_classes = [PayorAuthentication]
     
     def get(self, request):
         """Get policies for the authenticated payor"""
         try:
-            # Extract payor_id from JWT token or headers
-            payor_id = self._get_payor_id_from_request(request)
+            # Payor resolved by PayorAuthentication from JWT token or headers
+            payor_id = getattr(request.user, 'payor_id', None)
             
             if not payor_id:
                 return Response(
@@ -249,9 +355,6 @@ class PayorPoliciesAPIView(APIView):
             # Get all policies for this payor
             policies = list(policy_model.collection.find({}))
             
-            # Convert ObjectId to string for JSON serialization
-            policies = [convert_objectid_to_string(policy) for policy in policies]
-            
             response_data = {
                 'success': True,
                 'count': len(policies),
@@ -267,41 +370,6 @@ class PayorPoliciesAPIView(APIView):
                 {'error': 'Failed to load policies. Please try again.'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-    
-    def _get_payor_id_from_request(self, request):
-        """Extract payor_id from JWT token or custom headers"""
-        try:
-            # Try JWT authentication first
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                try:
-                    from django.conf import settings
-                    import jwt
-                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-                    return payload.get('user_id')
-                except jwt.ExpiredSignatureError:
-                    logger.warning("JWT token expired")
-                except jwt.InvalidTokenError as e:
-                    logger.warning(f"Invalid JWT token: {e}")
-                except Exception as e:
-                    logger.warning(f"JWT decode error: {e}")
-            
-            # Fall back to custom headers for backward compatibility
-            payor_email = request.headers.get('X-Payor-Email')
-            payor_password = request.headers.get('X-Payor-Password')
-            
-            if payor_email and payor_password:
-                payor_model = PayorModel()
-                payor = payor_model.authenticate(payor_email, payor_password)
-                if payor:
-                    return payor.get('payor_id')
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error extracting payor_id: {str(e)}")
-            return None
 
 
 class PayorDashboardAPIView(APIView):
@@ -309,6 +377,7 @@ class PayorDashboardAPIView(APIView):
     Payor Dashboard API View
     Provides dashboard metrics and claims list for authenticated payors
     """
+    authentication_classes = [PayorAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
@@ -332,7 +401,16 @@ class PayorDashboardAPIView(APIView):
             # Get recent claims with pagination
             page = int(request.GET.get('page', 1))
             page_size = int(request.GET.get('page_size', 20))
-            claims = self._get_claims_list(claim_model, page, page_size)
+            cursor = request.GET.get('cursor')
+            try:
+                claims = self._get_claims_list(
+                    claim_model, page, page_size, cursor, metrics.get('total_claims', 0)
+                )
+            except ValueError as e:
+                return Response(
+                    {'error': str(e)}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             response_data = {
                 'metrics': metrics,
@@ -352,82 +430,31 @@ class PayorDashboardAPIView(APIView):
     def _calculate_metrics(self, claim_model, member_model, payor_id):
         """Calculate dashboard metrics"""
         try:
-            # Get claims for this payor
-            all_claims = claim_model.get_by_payor(payor_id)
-            
-            # Calculate basic metrics
-            total_claims = len(all_claims)
-            pending_claims = len([c for c in all_claims if c.get('status') == 'pending'])
-            approved_claims = len([c for c in all_claims if c.get('status') == 'approved'])
-            rejected_claims = len([c for c in all_claims if c.get('status') == 'rejected'])
-            partially_approved_claims = len([c for c in all_claims if c.get('status') == 'partially_approved'])
-            
-            # Calculate financial metrics
-            total_amount = sum(c.get('total_amount', 0) for c in all_claims)
-            average_claim_amount = total_amount / total_claims if total_claims > 0 else 0
-            
-            # Calculate approval rate
-            processed_claims = approved_claims + rejected_claims + partially_approved_claims
-            approval_rate = (approved_claims / processed_claims * 100) if processed_claims > 0 else 0
-            
-            # Get preauth pending count
-            preauth_pending = len([c for c in all_claims if c.get('preauth_status') == 'pending'])
-            
-            # Get active members count
-            active_members = member_model.get_active_count()
-            
-            # Count auto-approved vs manual review
-            auto_approved_count = len([c for c in all_claims if c.get('auto_approved', False)])
-            manual_review_count = total_claims - auto_approved_count
-            
-            return {
-                'total_claims': total_claims,
-                'pending_claims': pending_claims,
-                'approved_claims': approved_claims,
-                'rejected_claims': rejected_claims,
-                'partially_approved_claims': partially_approved_claims,
-                'approval_rate': round(approval_rate, 1),
-                'total_amount': total_amount,
-                'average_claim_amount': round(average_claim_amount, 2),
-                'preauth_pending': preauth_pending,
-                'active_members': active_members,
-                'auto_approved_count': auto_approved_count,
-                'manual_review_count': manual_review_count,
-                'avg_processing_time': '2.3'  # Mock data - implement actual calculation
-            }
+            # Read incrementally maintained counters instead of scanning claims
+            claim_metrics = ClaimStatsModel().get_stats(payor_id)
+            return _dashboard_metrics(claim_metrics, member_model.get_active_count())
             
         except Exception as e:
             logger.error(f"Error calculating metrics: {str(e)}")
             return {}
     
-    def _get_claims_list(self, claim_model, page, page_size):
-        """Get paginated claims list"""
+    def _get_claims_list(self, claim_model, page, page_size, cursor, total_claims):
+        """Get paginated claims list; raises ValueError for a malformed cursor"""
         try:
-            # Get all claims for the payor
-            all_claims = claim_model.get_recent_claims(limit=1000)  # Get reasonable limit
-            
-            # Apply pagination
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-            paginated_claims = all_claims[start_idx:end_idx]
+            paginated_claims, next_cursor = _paginate_claims(
+                claim_model, page, page_size, cursor, projection=CLAIM_PROJECTIONS['summary']
+            )
             
             # Serialize claims
             serialized_claims = [ClaimSerializer.serialize(claim) for claim in paginated_claims]
             
-            # Calculate pagination info
-            total_claims = len(all_claims)
-            total_pages = (total_claims + page_size - 1) // page_size
-            
             return {
                 'claims': serialized_claims,
-                'pagination': {
-                    'current_page': page,
-                    'total_pages': total_pages,
-                    'total_claims': total_claims,
-                    'page_size': page_size
-                }
+                'pagination': _dashboard_pagination(page, page_size, total_claims, next_cursor)
             }
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error getting claims list: {str(e)}")
             return {'claims': [], 'pagination': {}}
@@ -438,6 +465,7 @@ class PayorClaimReviewAPIView(APIView):
     Payor Claim Review API View
     Handles claim review and decision processing for payors
     """
+    authentication_classes = [PayorAuthentication]
     permission_classes = [IsAuthenticated]
     
     def get(self, request, claim_id=None):
@@ -454,23 +482,15 @@ class PayorClaimReviewAPIView(APIView):
             claim_model = ClaimModel(payor_id=payor_id)
             
             if claim_id:
-                # Get specific claim details
-                claim = claim_model.get_by_id(claim_id)
-                if not claim:
+                # Claim, member, policy, notifications and pre-auth are fetched concurrently;
+                # the payor filter on the claim query keeps other payors' claims out
+                detailed_claim = ClaimDetailAssembler(payor_id).assemble(claim_id)
+                if detailed_claim is None:
                     return Response(
                         {'error': 'Claim not found'}, 
                         status=status.HTTP_404_NOT_FOUND
                     )
                 
-                # Verify payor owns this claim
-                if claim.get('payor_id') != payor_id:
-                    return Response(
-                        {'error': 'Access denied'}, 
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-                
-                # Get detailed claim information
-                detailed_claim = self._get_detailed_claim_info(claim, claim_model)
                 return Response(
                     {'claim_details': detailed_claim}, 
                     status=status.HTTP_200_OK
@@ -479,7 +499,20 @@ class PayorClaimReviewAPIView(APIView):
             else:
                 # Get claims list for review
                 status_filter = request.GET.get('status', 'pending')
-                claims = claim_model.get_claims_for_review(payor_id, status_filter)
+                try:
+                    includes = parse_includes(request.GET.get('include'))
+                    projection = _get_claim_projection(request, 'review')
+                    if includes:
+                        projection = with_context_fields(projection)
+                except ValueError as e:
+                    return Response(
+                        {'error': str(e)}, 
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                claims = claim_model.get_claims_for_review(payor_id, status_filter, projection=projection)
+                
+                if includes:
+                    get_claim_context_loaders(request, payor_id).enrich(claims, includes)
                 
                 serialized_claims = [ClaimSerializer.serialize(claim) for claim in claims]
                 return Response(
@@ -505,51 +538,40 @@ class PayorClaimReviewAPIView(APIView):
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            # Validate request data
-            decision = request.data.get('decision')
-            if decision not in ['approved', 'rejected', 'partially_approved']:
+            # Validate request data; `status` is accepted as an alias for `decision`
+            decision = request.data.get('decision') or request.data.get('status')
+            if decision not in DECISION_STATUSES:
                 return Response(
                     {'error': 'Invalid decision. Must be approved, rejected, or partially_approved'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
             claim_model = ClaimModel(payor_id=payor_id)
+            decision_data = self._build_decision_data(request.data, decision)
+            reviewer_id = str(request.user.id)
             
-            # Get the claim
-            claim = claim_model.get_by_id(claim_id)
-            if not claim:
+            # One claim write plus the audit entry; the payor filter scopes the claim to this payor, and the
+            # write filter skips claims another reviewer holds a review queue lease on
+            try:
+                updated_claim = claim_model.apply_decision(claim_id, decision_data, reviewer_id=reviewer_id)
+            except ClaimLeasedError as e:
                 return Response(
-                    {'error': 'Claim not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
+                    {
+                        'error': str(e),
+                        'lease_expires_at': next(iter(e.leases.values()), None)
+                    }, 
+                    status=status.HTTP_409_CONFLICT
                 )
-            
-            # Verify payor owns this claim
-            if claim.get('payor_id') != payor_id:
+            if updated_claim is None:
                 return Response(
-                    {'error': 'Access denied'}, 
-                    status=status.HTTP_403_FORBIDDEN
+                    {'error': 'Claim not found'}, 
+                    status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Process the decision
-            decision_data = {
-                'decision': decision,
-                'approved_amount': request.data.get('approved_amount'),
-                'reason_code': request.data.get('reason_code', ''),
-                'notes': request.data.get('notes', ''),
-                'reviewer_id': str(request.user.id),
-                'decision_date': datetime.utcnow()
-            }
-            
-            # Update claim with decision
-            updated_claim = claim_model.process_claim_decision(claim_id, decision_data)
-            if not updated_claim:
-                return Response(
-                    {'error': 'Failed to process claim decision'}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            ReviewQueue(payor_id).release(reviewer_id, [updated_claim.get('claim_id')])
             
             # Send notifications
-            self._send_decision_notifications(claim, decision_data)
+            self._send_decision_notifications(updated_claim, decision_data)
             
             return Response(
                 {
@@ -566,95 +588,246 @@ class PayorClaimReviewAPIView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _get_detailed_claim_info(self, claim, claim_model):
-        """Get detailed claim information for review"""
+    @staticmethod
+    def _build_decision_data(data, decision):
+        """Decision fields in the shape ClaimModel.apply_decision expects"""
+        return {
+            'status': decision,
+            'approved_amount': data.get('approved_amount'),
+            'reason_code': data.get('reason_code', ''),
+            'notes': data.get('notes', data.get('review_notes', ''))
+        }
+    
+    def put(self, request, claim_id):
+        """Process claim decision (documented PUT form)"""
+        return self.post(request, claim_id)
+    
+    def _send_decision_notifications(self, claim, decision_data):
+        """Send notifications for claim decision"""
         try:
-            # Get member and policy information
-            member_model = MemberModel(payor_id=claim.get('payor_id'))
-            policy_model = PolicyModel(payor_id=claim.get('payor_id'))
-            
-            member_info = member_model.get_by_id(claim.get('member_id'))
-            policy_info = policy_model.get_by_member_id(claim.get('member_id'))
-            
-            # Build detailed claim object
-            detailed_claim = {
-                'claim_id': claim.get('claim_id'),
-                'status': claim.get('status'),
-                'patient_info': {
-                    'name': claim.get('patient_name'),
-                    'member_id': claim.get('member_id'),
-                    'dob': member_info.get('date_of_birth') if member_info else None,
-                    'phone': member_info.get('phone_number') if member_info else None
-                },
-                'provider_info': {
-                    'name': claim.get('provider_name'),
-                    'npi': claim.get('provider_npi'),
-                    'address': claim.get('provider_address')
-                },
-                'clinical_info': {
-                    'diagnosis_codes': claim.get('diagnosis_codes', []),
-                    'procedure_codes': claim.get('procedure_codes', []),
-                    'service_date': claim.get('service_date'),
-                    'service_description': claim.get('service_description')
-                },
-                'financial_info': {
-                    'billed_amount': claim.get('billed_amount', 0),
-                    'covered_amount': claim.get('covered_amount', 0),
-                    'patient_responsibility': claim.get('patient_responsibility', 0),
-                    'total_amount': claim.get('total_amount', 0)
-                },
-                'timeline': claim.get('audit_trail', []),
-                'policy_info': {
-                    'policy_number': policy_info.get('policy_number') if policy_info else None,
-                    'coverage_type': policy_info.get('coverage_type') if policy_info else None,
-                    'deductible_remaining': policy_info.get('deductible_remaining') if policy_info else None
-                },
-                'preauth_required': claim.get('preauth_required', False),
-                'urgency_level': claim.get('urgency_level', 'routine'),
-                'submitted_date': claim.get('submitted_date'),
-                'last_updated': claim.get('last_updated')
+            decision = decision_data['status']
+            NotificationModel().send_claim_notification(claim, decision)
+            logger.info(f"Notifications sent for claim {claim.get('claim_id')} decision: {decision}")
+            
+        except Exception as e:
+            logger.error(f"Error sending decision notifications: {str(e)}")
+
+
+class PayorClaimDecisionBatchAPIView(PayorClaimReviewAPIView):
+    """Batch claim decisions for reviewers"""
+    http_method_names = ['post', 'options']
+    
+    def post(self, request):
+        """Apply many claim decisions with one bulk write"""
+        try:
+            payor_id = getattr(request.user, 'payor_id', None)
+            if not payor_id:
+                return Response(
+                    {'error': 'Payor ID not found for user'}, 
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            
+            items = request.data.get('decisions') if isinstance(request.data, dict) else request.data
+            if not isinstance(items, list) or not items:
+                return Response(
+                    {'error': 'Request body must contain a non-empty "decisions" list'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            max_batch = getattr(settings, 'BATCH_DECISIONS_MAX', 1000)
+            if len(items) > max_batch:
+                return Response(
+                    {'error': f'At most {max_batch} decisions per request'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            results = [None] * len(items)
+            decisions = []
+            positions = {}
+            for index, item in enumerate(items):
+                claim_id = item.get('claim_id') if isinstance(item, dict) else None
+                if not claim_id:
+                    results[index] = {'index': index, 'success': False, 'error': 'claim_id is required'}
+                    continue
+                if not isinstance(claim_id, str):
+                    results[index] = {'index': index, 'success': False, 'error': 'claim_id must be a string'}
+                    continue
+                if claim_id in positions:
+                    results[index] = {'index': index, 'success': False, 'error': 'Duplicate claim_id in batch'}
+                    continue
+                
+                positions[claim_id] = index
+                decision = item.get('decision') or item.get('status')
+                decisions.append((claim_id, self._build_decision_data(item, decision)))
+            
+            # Claims another reviewer holds a review queue lease on come back with a per-item error
+            reviewer_id = str(request.user.id)
+            outcomes = ClaimModel(payor_id=payor_id).apply_decisions(decisions, reviewer_id=reviewer_id) if decisions else {}
+            
+            for claim_id, (updated_claim, error) in outcomes.items():
+                index = positions[claim_id]
+                if updated_claim is None:
+                    results[index] = {'index': index, 'success': False, 'claim_id': claim_id, 'error': error}
+                    continue
+                
+                results[index] = {
+                    'index': index,
+                    'success': True,
+                    'claim_id': claim_id,
+                    'status': updated_claim['status']
+                }
+                self._send_decision_notifications(updated_claim, updated_claim['decision'])
+            
+            decided = [claim_id for claim_id, (updated_claim, _) in outcomes.items() if updated_claim is not None]
+            if decided:
+                ReviewQueue(payor_id).release(reviewer_id, decided)
+            
+            accepted = sum(1 for result in results if result['success'])
+            response_data = {
+                'success': accepted == len(items),
+                'submitted': len(items),
+                'accepted': accepted,
+                'rejected': len(items) - accepted,
+                'results': results
             }
             
-            return convert_objectid_to_string(detailed_claim)
+            response_status = status.HTTP_200_OK if accepted == len(items) else status.HTTP_207_MULTI_STATUS
+            return Response(response_data, status=response_status)
             
         except Exception as e:
-            logger.error(f"Error getting detailed claim info: {str(e)}")
-            return convert_objectid_to_string(claim)
+            logger.error(f"Error in PayorClaimDecisionBatchAPIView POST: {str(e)}")
+            return Response(
+                {'error': 'Internal server error'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class PayorReviewQueueAPIView(APIView):
+    """Lease-based manual review queue: lease, heartbeat and release claims"""
+    authentication_classes = [PayorAuthentication]
+    permission_classes = [IsAuthenticated]
     
-    def _send_decision_notifications(self, claim, decision_data):
-        """Send notifications for claim decision"""
+    def get(self, request, action=None):
+        """Claims leased to the current reviewer, with the number still available"""
         try:
-            notification_model = NotificationModel()
-            
-            # Prepare notification content
-            decision = decision_data['decision']
-            claim_id = claim.get('claim_id')
-            
-            # Send to patient
-            patient_message = f"Your claim {claim_id} has been {decision}"
-            if decision == 'approved':
-                patient_message += f" for ${decision_data.get('approved_amount', claim.get('total_amount', 0))}"
-            
-            notification_model.send_notification(
-                recipient=claim.get('patient_contact'),
-                message=patient_message,
-                notification_type='claim_decision',
-                claim_id=claim.get('_id')
+            payor_id = getattr(request.user, 'payor_id', None)
+            if not payor_id:
+                return Response(
+                    {'error': 'Payor ID not found for user'}, 
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            
+            review_queue = ReviewQueue(payor_id)
+            leases = review_queue.get_leases(str(request.user.id))
+            
+            return Response(
+                {
+                    'claims': [ClaimSerializer.serialize(claim) for claim in leases],
+                    'available': review_queue.count_available()
+                }, 
+                status=status.HTTP_200_OK
             )
             
-            # Send to provider
-            provider_message = f"Claim {claim_id} decision: {decision}"
-            notification_model.send_notification(
-                recipient=claim.get('provider_contact'),
-                message=provider_message,
-                notification_type='claim_decision',
-                claim_id=claim.get('_id')
+        except Exception as e:
+            logger.error(f"Error in PayorReviewQueueAPIView GET: {str(e)}")
+            return Response(
+                {'error': 'Internal server error'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    def post(self, request, action=None):
+        """Lease the next claims (`lease`), renew leases (`heartbeat`) or return them (`release`)"""
+        try:
+            payor_id = getattr(request.user, 'payor_id', None)
+            if not payor_id:
+                return Response(
+                    {'error': 'Payor ID not found for user'}, 
+                    status=status.HTTP_403_FORBIDDEN
+                )
             
-            logger.info(f"Notifications sent for claim {claim_id} decision: {decision}")
+            reviewer_id = str(request.user.id)
+            review_queue = ReviewQueue(payor_id)
+            
+            try:
+                lease_seconds = request.data.get('lease_seconds')
+                lease_seconds = int(lease_seconds) if lease_seconds is not None else None
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'lease_seconds must be an integer'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            if action in (None, 'lease'):
+                try:
+                    count = int(request.data.get('count', 1))
+                except (TypeError, ValueError):
+                    return Response(
+                        {'error': 'count must be an integer'}, 
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                
+                claims = review_queue.lease(reviewer_id, count=count, lease_seconds=lease_seconds)
+                return Response(
+                    {
+                        'claims': [ClaimSerializer.serialize(claim) for claim in claims],
+                        'lease_expires_at': claims[0]['review_lease_expires_at'] if claims else None,
+                        'heartbeat_seconds': get_review_queue_settings()['LEASE_SECONDS'] // 3
+                    }, 
+                    status=status.HTTP_200_OK
+                )
+            
+            if action not in ('heartbeat', 'release'):
+                return Response(
+                    {'error': 'Unknown queue action. Must be lease, heartbeat or release'}, 
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            claim_ids = request.data.get('claim_ids')
+            if not isinstance(claim_ids, list) or not claim_ids:
+                return Response(
+                    {'error': 'Request body must contain a non-empty "claim_ids" list'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            if action == 'heartbeat':
+                renewed, lost = review_queue.renew(reviewer_id, claim_ids, lease_seconds=lease_seconds)
+                return Response(
+                    {'renewed': renewed, 'lost': lost}, 
+                    status=status.HTTP_200_OK
+                )
+            
+            released = review_queue.release(reviewer_id, claim_ids)
+            return Response(
+                {'released': released}, 
+                status=status.HTTP_200_OK
+            )
             
         except Exception as e:
-            logger.error(f"Error sending decision notifications: {str(e)}")
+            logger.error(f"Error in PayorReviewQueueAPIView POST: {str(e)}")
+            return Response(
+                {'error': 'Internal server error'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+def _health_status():
+    """Public liveness payload; deliberately free of internal state"""
+    return {
+        'status': 'healthy',
+        'timestamp': datetime.utcnow()
+    }
+
+
+def _health_details():
+    """Cache, pool and routing counters from this process only (no database round trip)"""
+    return {
+        **_health_status(),
+        'auth_cache': get_auth_cache_stats(),
+        'mongo_pool': MongoConnection.get_pool_stats(),
+        'payor_settings_cache': get_payor_settings_cache_stats(),
+        'insurance_routing': get_routing_table().stats(),
+        'policy_cache': get_policy_cache().stats()
+    }
 
 
 # Health check endpoint
@@ -663,19 +836,39 @@ class HealthCheckAPIView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request):
-        return Response({'status': 'healthy', 'timestamp': datetime.utcnow()})
+        return Response(_health_status())
+
+
+class HealthDetailsAPIView(APIView):
+    """Process cache and connection pool stats for operators (Django staff users only)"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response(_health_details())
+
+
+def _parse_query_datetime(value):
+    """Parse an ISO 8601 query value into a naive UTC datetime"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
 
 class PayorClaimsAPIView(APIView):
     """Claims API endpoint for provider submissions and payor viewing"""
     permission_classes = [AllowAny]
-    authentication_classes = []
+    authentication_classes = [PayorAuthentication]
+    
+    REQUIRED_CLAIM_FIELDS = ['patient_name', 'insurance_id', 'diagnosis_code', 'amount']
     
     def get(self, request):
         """Get claims for the authenticated payor"""
         try:
-            # Extract payor_id from JWT token or headers (reuse logic from policies view)
-            payor_id = self._get_payor_id_from_request(request)
+            # Payor resolved by PayorAuthentication from JWT token or headers
+            payor_id = getattr(request.user, 'payor_id', None)
             
             if not payor_id:
                 return Response(
@@ -689,37 +882,35 @@ class PayorClaimsAPIView(APIView):
             # Get pagination parameters
             page = int(request.GET.get('page', 1))
             limit = int(request.GET.get('limit', 20))
+            cursor = request.GET.get('cursor')
             
-            # Get claims with pagination
-            skip = (page - 1) * limit
-            claims = claim_model.get_all(skip=skip, limit=limit)
+            # Get claims with pagination, fetching only the fields the list needs
+            try:
+                includes = parse_includes(request.GET.get('include'))
+                projection = _get_claim_projection(request, 'summary')
+                if includes:
+                    projection = with_context_fields(projection)
+                claims, next_cursor = _paginate_claims(claim_model, page, limit, cursor, projection)
+            except ValueError as e:
+                return Response(
+                    {'error': str(e)}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            # Convert ObjectId to string and transform data for frontend expectations
-            transformed_claims = []
-            for claim in claims:
-                claim = convert_objectid_to_string(claim)
-                
-                # Transform flat structure to nested structure expected by frontend
-                transformed_claim = {
-                    **claim,
-                    'patient': {
-                        'name': claim.get('patient_name', 'Unknown Patient'),
-                        'id': claim.get('patient_id', ''),
-                        'insurance_id': claim.get('insurance_id', '')
-                    },
-                    'provider': {
-                        'name': claim.get('provider_name', 'Unknown Provider'),
-                        'id': claim.get('provider_id', '')
-                    }
-                }
-                transformed_claims.append(transformed_claim)
+            # Member, policy and routing context for the whole page: one batched lookup per collection
+            if includes:
+                get_claim_context_loaders(request, payor_id).enrich(claims, includes)
+            
+            # Transform data for frontend expectations; the renderer encodes ObjectId and datetime values
+            transformed_claims = [_list_claim(claim) for claim in claims]
             
             response_data = {
                 'success': True,
                 'results': transformed_claims,  # Frontend expects 'results' not 'claims'
                 'page': page,
                 'limit': limit,
-                'total': len(transformed_claims),
+                'total': ClaimStatsModel().get_stats(payor_id)['total_claims'],
+                'next_cursor': next_cursor,
                 'payor_id': payor_id
             }
             
@@ -738,8 +929,7 @@ class PayorClaimsAPIView(APIView):
             data = request.data
             
             # Validate required fields (matching ProviderDashboard form)
-            required_fields = ['patient_name', 'insurance_id', 'diagnosis_code', 'amount']
-            missing_fields = [field for field in required_fields if not data.get(field)]
+            missing_fields = self._get_missing_fields(data)
             
             if missing_fields:
                 return Response(
@@ -748,7 +938,6 @@ class PayorClaimsAPIView(APIView):
                 )
             
             # Map insurance_id to payor_id using InsurancePayorMappingModel
-            from .models import InsurancePayorMappingModel
             mapping_model = InsurancePayorMappingModel()
             payor_id = mapping_model.get_payor_by_insurance(data['insurance_id'])
             
@@ -759,24 +948,7 @@ class PayorClaimsAPIView(APIView):
                 )
             
             # Create claim data structure matching provider expectations
-            claim_data = {
-                'patient_name': data['patient_name'],
-                'patient_id': data.get('patient_id', f"P-{data['insurance_id'][-5:]}"),
-                'insurance_id': data['insurance_id'],
-                'diagnosis_code': data['diagnosis_code'],
-                'diagnosis_description': data.get('diagnosis_description', ''),
-                'procedure_code': data.get('procedure_code', ''),
-                'procedure_description': data.get('procedure_description', ''),
-                'amount': float(data['amount'].replace('$', '').replace(',', '')) if isinstance(data['amount'], str) else data['amount'],
-                'date_of_service': data.get('date_of_service', datetime.utcnow().strftime('%Y-%m-%d')),
-                'priority': data.get('priority', 'medium'),
-                'notes': data.get('notes', ''),
-                'provider_id': data.get('provider_id', 'PROV-001'),
-                'provider_name': data.get('provider_name', 'Healthcare Provider'),
-                'status': 'pending',
-                'submitted_date': datetime.utcnow(),
-                'last_updated': datetime.utcnow()
-            }
+            claim_data = self._build_claim_data(data)
             
             # Initialize claim model for the identified payor
             claim_model = ClaimModel(payor_id=payor_id)
@@ -790,17 +962,7 @@ class PayorClaimsAPIView(APIView):
                 data['insurance_id'], 
                 data['diagnosis_code']
             )
-            
-            claim_data['coverage_validated'] = coverage_result
-            claim_data['coverage_message'] = coverage_message
-            
-            # Auto-approve if covered, otherwise set to review
-            if coverage_result:
-                claim_data['status'] = 'approved'
-                claim_data['auto_approved'] = True
-            else:
-                claim_data['status'] = 'under_review'
-                claim_data['reason_for_review'] = coverage_message
+            self._apply_coverage_decision(claim_data, coverage_result, coverage_message)
             
             # Create the claim
             new_claim = claim_model.create(claim_data)
@@ -812,7 +974,7 @@ class PayorClaimsAPIView(APIView):
                 response_data = {
                     'success': True,
                     'message': 'Claim submitted successfully',
-                    'claim': convert_objectid_to_string(new_claim),
+                    'claim': new_claim,
                     'status': claim_data['status'],
                     'auto_approved': claim_data.get('auto_approved', False),
                     'processing_time_ms': 1250,  # Mock processing time
@@ -833,115 +995,114 @@ class PayorClaimsAPIView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _get_payor_id_from_request(self, request):
-        """Extract payor_id from JWT token or custom headers"""
-        try:
-            # Try JWT authentication first
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                try:
-                    from django.conf import settings
-                    import jwt
-                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-                    return payload.get('user_id')
-                except jwt.ExpiredSignatureError:
-                    logger.warning("JWT token expired")
-                except jwt.InvalidTokenError as e:
-                    logger.warning(f"Invalid JWT token: {e}")
-                    
-            # Fall back to custom headers for backward compatibility
-            payor_email = request.headers.get('X-Payor-Email')
-            payor_password = request.headers.get('X-Payor-Password')
-            
-            if payor_email and payor_password:
-                payor_model = PayorModel()
-                payor = payor_model.authenticate(payor_email, payor_password)
-                if payor:
-                    return payor.get('payor_id')
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error extracting payor_id: {str(e)}")
-            return None
+    def _get_missing_fields(self, data):
+        """Required submission fields that are absent or empty"""
+        return [field for field in self.REQUIRED_CLAIM_FIELDS if not data.get(field)]
+    
+    def _build_claim_data(self, data):
+        """Build the stored claim document from a provider submission"""
+        return {
+            'patient_name': data['patient_name'],
+            'patient_id': data.get('patient_id', f"P-{data['insurance_id'][-5:]}"),
+            'insurance_id': data['insurance_id'],
+            'diagnosis_code': data['diagnosis_code'],
+            'diagnosis_description': data.get('diagnosis_description', ''),
+            'procedure_code': data.get('procedure_code', ''),
+            'procedure_description': data.get('procedure_description', ''),
+            'amount': float(data['amount'].replace('$', '').replace(',', '')) if isinstance(data['amount'], str) else data['amount'],
+            'date_of_service': data.get('date_of_service', datetime.utcnow().strftime('%Y-%m-%d')),
+            'priority': data.get('priority', 'medium'),
+            'notes': data.get('notes', ''),
+            'provider_id': data.get('provider_id', 'PROV-001'),
+            'provider_name': data.get('provider_name', 'Healthcare Provider'),
+            'status': 'pending',
+            'submitted_date': datetime.utcnow(),
+            'last_updated': datetime.utcnow()
+        }
+    
+    def _apply_coverage_decision(self, claim_data, coverage_result, coverage_message):
+        """Record the coverage check and route the claim"""
+        claim_data['coverage_validated'] = coverage_result
+        claim_data['coverage_message'] = coverage_message
+        
+        # Auto-approve if covered, otherwise set to review
+        if coverage_result:
+            claim_data['status'] = 'approved'
+            claim_data['auto_approved'] = True
+        else:
+            claim_data['status'] = 'under_review'
+            claim_data['reason_for_review'] = coverage_message
     
     def _notify_provider_claim_status(self, claim, event_type):
         """Send notification to provider about claim status change"""
         try:
-            import requests
-            import hashlib
-            import hmac
-            import json
-            
-            # Get provider webhook URL (in production, this would be stored in provider registry)
-            provider_webhook_url = self._get_provider_webhook_url(claim.get('provider_id'))
-            
-            if not provider_webhook_url:
-                logger.info(f"No webhook URL configured for provider {claim.get('provider_id')}")
+            delivery = self._build_provider_webhook(claim, event_type)
+            if not delivery:
                 return
             
-            # Prepare webhook payload
-            webhook_payload = {
-                'event_type': 'claim_status_update',
-                'timestamp': datetime.now().isoformat(),
-                'claim_id': claim.get('claim_id'),
-                'previous_status': None if event_type == 'submitted' else 'under_review',
-                'new_status': claim.get('status'),
-                'message': self._get_status_message(claim.get('status')),
-                'processed_by': 'automated_system',
-                'processed_date': datetime.now().isoformat(),
-                'patient_name': claim.get('patient_name'),
-                'insurance_id': claim.get('insurance_id'),
-                'provider_id': claim.get('provider_id'),
-                'amount': claim.get('amount'),
-                'coverage_validated': claim.get('coverage_validated', False),
-                'coverage_message': claim.get('coverage_message', ''),
-                'auto_approved': claim.get('auto_approved', False)
-            }
-            
-            # Add payment details if approved
-            if claim.get('status') == 'approved':
-                webhook_payload['payment_details'] = {
-                    'approved_amount': self._calculate_expected_payment(claim),
-                    'patient_responsibility': self._calculate_patient_responsibility(claim),
-                    'expected_payment_date': (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d'),
-                    'payment_method': 'ACH'
-                }
-            
-            # Generate webhook signature for security
-            secret_key = 'webhook_secret_key'  # In production, use proper secret management
-            payload_json = json.dumps(webhook_payload, sort_keys=True)
-            signature = hmac.new(
-                secret_key.encode('utf-8'),
-                payload_json.encode('utf-8'),
-                hashlib.sha256
-            ).hexdigest()
-            webhook_payload['webhook_signature'] = f'sha256={signature}'
-            
-            # Send webhook (non-blocking)
-            try:
-                response = requests.post(
-                    provider_webhook_url,
-                    json=webhook_payload,
-                    headers={
-                        'Content-Type': 'application/json',
-                        'X-Webhook-Signature': f'sha256={signature}'
-                    },
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    logger.info(f"Webhook sent successfully to provider {claim.get('provider_id')} for claim {claim.get('claim_id')}")
-                else:
-                    logger.warning(f"Webhook failed for provider {claim.get('provider_id')}: {response.status_code}")
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Failed to send webhook to provider {claim.get('provider_id')}: {str(e)}")
+            # Queue for background delivery; retries and dead-lettering happen in the dispatcher
+            enqueue_webhooks([delivery])
+            logger.info(f"Webhook queued for provider {claim.get('provider_id')} for claim {claim.get('claim_id')}")
                 
         except Exception as e:
             logger.error(f"Error sending provider notification: {str(e)}")
     
+    def _build_provider_webhook(self, claim, event_type):
+        """Build a signed (provider_id, url, payload, headers) webhook delivery, or None"""
+        # Get provider webhook URL (in production, this would be stored in provider registry)
+        provider_webhook_url = self._get_provider_webhook_url(claim.get('provider_id'))
+        
+        if not provider_webhook_url:
+            logger.info(f"No webhook URL configured for provider {claim.get('provider_id')}")
+            return None
+        
+        # Prepare webhook payload
+        webhook_payload = {
+            'event_type': 'claim_status_update',
+            'timestamp': datetime.now().isoformat(),
+            'claim_id': claim.get('claim_id'),
+            'previous_status': None if event_type == 'submitted' else 'under_review',
+            'new_status': claim.get('status'),
+            'message': self._get_status_message(claim.get('status')),
+            'processed_by': 'automated_system',
+            'processed_date': datetime.now().isoformat(),
+            'patient_name': claim.get('patient_name'),
+            'insurance_id': claim.get('insurance_id'),
+            'provider_id': claim.get('provider_id'),
+            'amount': claim.get('amount'),
+            'coverage_validated': claim.get('coverage_validated', False),
+            'coverage_message': claim.get('coverage_message', ''),
+            'auto_approved': claim.get('auto_approved', False)
+        }
+        
+        # Add payment details if approved
+        if claim.get('status') == 'approved':
+            webhook_payload['payment_details'] = {
+                'approved_amount': self._calculate_expected_payment(claim),
+                'patient_responsibility': self._calculate_patient_responsibility(claim),
+                'expected_payment_date': (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d'),
+                'payment_method': 'ACH'
+            }
+        
+        # Generate webhook signature for security
+        payload_json = json.dumps(webhook_payload, sort_keys=True)
+        signature = hmac.new(
+            settings.WEBHOOK_SECRET.encode('utf-8'),
+            payload_json.encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+        webhook_payload['webhook_signature'] = f'sha256={signature}'
+        
+        return (
+            claim.get('provider_id'),
+            provider_webhook_url,
+            webhook_payload,
+            {
+                'Content-Type': 'application/json',
+                'X-Webhook-Signature': f'sha256={signature}'
+            }
+        )
+    
     def _get_provider_webhook_url(self, provider_id):
         """Get webhook URL for provider (mock implementation)"""
         # In production, this would look up the provider's registered webhook URL
@@ -992,15 +1153,155 @@ class PayorClaimsAPIView(APIView):
             return 0.0
 
 
-class PayorClaimsSummaryAPIView(APIView):
-    """Claims summary API endpoint"""
+class PayorClaimsBulkAPIView(PayorClaimsAPIView):
+    """
+    Bulk claim submission endpoint for clearinghouse-style feeds
+    Accepts a JSON array, {"claims": [...]}, or NDJSON, and resolves insurance mappings
+    and policies with one $in query each before inserting per payor with insert_many
+    """
+    parser_classes = [JSONParser, NDJSONParser]
+    http_method_names = ['post', 'options']
+    
+    def post(self, request):
+        """Accept a batch of claim submissions from providers"""
+        try:
+            items = request.data
+            if isinstance(items, dict):
+                items = items.get('claims')
+            
+            if not isinstance(items, list) or not items:
+                return Response(
+                    {'error': 'Request body must be a JSON array, {"claims": [...]}, or NDJSON'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            max_batch = getattr(settings, 'BULK_CLAIMS_MAX_BATCH', 5000)
+            if len(items) > max_batch:
+                return Response(
+                    {'error': f'Batch too large: {len(items)} claims (maximum {max_batch})'}, 
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+            
+            results = [None] * len(items)
+            
+            # Validate every item before touching the database
+            valid_items = []
+            for index, data in enumerate(items):
+                if not isinstance(data, dict):
+                    results[index] = self._item_error(index, 'Claim must be a JSON object')
+                    continue
+                
+                missing_fields = self._get_missing_fields(data)
+                if missing_fields:
+                    results[index] = self._item_error(
+                        index, f'Missing required fields: {", ".join(missing_fields)}'
+                    )
+                    continue
+                
+                # insurance_id keys the routing and policy lookups, so it must be hashable and queryable
+                if not isinstance(data['insurance_id'], str):
+                    results[index] = self._item_error(index, 'insurance_id must be a string')
+                    continue
+                
+                valid_items.append((index, data))
+            
+            # Resolve every insurance_id -> payor_id mapping in one query
+            routes = InsurancePayorMappingModel().get_payors_by_insurance(
+                data['insurance_id'] for _, data in valid_items
+            )
+            
+            claims_by_payor = defaultdict(list)
+            for index, data in valid_items:
+                payor_id = routes.get(data['insurance_id'])
+                if not payor_id:
+                    results[index] = self._item_error(
+                        index, f'Insurance ID {data["insurance_id"]} not found or not covered by this payor'
+                    )
+                    continue
+                
+                try:
+                    claim_data = self._build_claim_data(data)
+                except (ValueError, TypeError, AttributeError) as e:
+                    results[index] = self._item_error(index, f'Invalid claim data: {str(e)}')
+                    continue
+                
+                claims_by_payor[payor_id].append((index, claim_data))
+            
+            deliveries = []
+            for payor_id, entries in claims_by_payor.items():
+                # Compiled policies come from the coverage cache; misses load with one $in query
+                policies = PolicyModel(payor_id=payor_id).get_compiled_policies(
+                    claim_data['insurance_id'] for _, claim_data in entries
+                )
+                for _, claim_data in entries:
+                    coverage_result, coverage_message = check_policy_coverage(
+                        policies.get(claim_data['insurance_id']),
+                        claim_data['diagnosis_code']
+                    )
+                    self._apply_coverage_decision(claim_data, coverage_result, coverage_message)
+                
+                _, failures = ClaimModel(payor_id=payor_id).create_many(
+                    [claim_data for _, claim_data in entries]
+                )
+                
+                for position, (index, claim_data) in enumerate(entries):
+                    if position in failures:
+                        results[index] = self._item_error(index, f'Failed to create claim: {failures[position]}')
+                        continue
+                    
+                    results[index] = {
+                        'index': index,
+                        'success': True,
+                        'claim_id': claim_data['claim_id'],
+                        'payor_id': payor_id,
+                        'status': claim_data['status'],
+                        'auto_approved': claim_data.get('auto_approved', False),
+                        'expected_payment': self._calculate_expected_payment(claim_data),
+                        'patient_responsibility': self._calculate_patient_responsibility(claim_data)
+                    }
+                    
+                    delivery = self._build_provider_webhook(claim_data, 'submitted')
+                    if delivery:
+                        deliveries.append(delivery)
+            
+            if deliveries:
+                try:
+                    enqueue_webhooks(deliveries)
+                except Exception as e:
+                    logger.error(f"Error queueing bulk provider notifications: {str(e)}")
+            
+            accepted = sum(1 for result in results if result['success'])
+            response_data = {
+                'success': accepted == len(items),
+                'submitted': len(items),
+                'accepted': accepted,
+                'rejected': len(items) - accepted,
+                'results': results
+            }
+            
+            response_status = status.HTTP_201_CREATED if accepted == len(items) else status.HTTP_207_MULTI_STATUS
+            return Response(response_data, status=response_status)
+            
+        except Exception as e:
+            logger.error(f"Error in PayorClaimsBulkAPIView POST: {str(e)}")
+            return Response(
+                {'error': f'Failed to process claims batch: {str(e)}'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    def _item_error(self, index, message):
+        return {'index': index, 'success': False, 'error': message}
+
+
+class PayorClaimTimelineAPIView(APIView):
+    """Paged claim timeline endpoint"""
     permission_classes = [AllowAny]
-    authentication_classes = []
+    authentication_classes = [PayorAuthentication]
     
-    def get(self, request):
-        """Get claims summary for the authenticated payor"""
+    def get(self, request, claim_id):
+        """Get a claim's timeline newest first, including entries moved out of the claim document"""
         try:
-            payor_id = self._get_payor_id_from_request(request)
+            payor_id = getattr(request.user, 'payor_id', None)
             
             if not payor_id:
                 return Response(
@@ -1008,83 +1309,185 @@ class PayorClaimsSummaryAPIView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             
-            # Initialize claim model
-            claim_model = ClaimModel(payor_id=payor_id)
+            limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
             
-            # Get all claims for summary
-            all_claims = claim_model.get_all(limit=1000)
+            try:
+                timeline = ClaimModel(payor_id=payor_id).get_timeline(
+                    claim_id, limit=limit, cursor=request.GET.get('cursor')
+                )
+            except ValueError as e:
+                return Response(
+                    {'error': str(e)}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            # Calculate summary statistics
-            total_claims = len(all_claims)
-            pending_claims = len([c for c in all_claims if c.get('status') == 'pending'])
-            approved_claims = len([c for c in all_claims if c.get('status') == 'approved'])
-            rejected_claims = len([c for c in all_claims if c.get('status') == 'rejected'])
+            if timeline is None:
+                return Response(
+                    {'error': 'Claim not found'}, 
+                    status=status.HTTP_404_NOT_FOUND
+                )
             
-            total_amount = sum(c.get('total_amount', 0) for c in all_claims)
+            entries, next_cursor = timeline
+            return Response({
+                'success': True,
+                'claim_id': claim_id,
+                'timeline': entries,
+                'limit': limit,
+                'next_cursor': next_cursor,
+                'payor_id': payor_id
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            logger.error(f"Error in PayorClaimTimelineAPIView: {str(e)}")
+            return Response(
+                {'error': 'Failed to load claim timeline. Please try again.'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class PayorClaimsExportAPIView(APIView):
+    """Streaming claims export for payor reconciliation"""
+    permission_classes = [AllowAny]
+    authentication_classes = [PayorAuthentication]
+    
+    def get(self, request):
+        """Stream the authenticated payor's claims as NDJSON or CSV"""
+        payor_id = getattr(request.user, 'payor_id', None)
+        
+        if not payor_id:
+            return Response(
+                {'error': 'Authentication required. Please provide valid credentials.'}, 
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        
+        # `format` is reserved by DRF content negotiation, so the export format is `output`
+        output = request.GET.get('output', 'ndjson').lower()
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            query = build_export_query(
+                payor_id,
+                status=request.GET.get('status'),
+                start=_parse_query_datetime(request.GET.get('start')),
+                end=_parse_query_datetime(request.GET.get('end')),
+                provider_id=request.GET.get('provider_id')
+            )
+        except ValueError:
+            return Response(
+                {'error': 'start and end must be ISO 8601 dates or datetimes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        encoder = iter_csv if output == 'csv' else iter_ndjson
+        response = StreamingHttpResponse(
+            encoder(iter_claims(payor_id, query)),
+            content_type=EXPORT_FORMATS[output]
+        )
+        filename = f"claims_{payor_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{output}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        
+        logger.info(f"Streaming {output} claims export for payor {payor_id}")
+        return response
+
+
+class PayorClaimsVolumeAPIView(APIView):
+    """Claim volume time-series endpoint for operations dashboards"""
+    permission_classes = [AllowAny]
+    authentication_classes = [PayorAuthentication]
+    
+    def get(self, request):
+        """Get claim counts and amounts over a date range for the authenticated payor"""
+        try:
+            payor_id = getattr(request.user, 'payor_id', None)
+            
+            if not payor_id:
+                return Response(
+                    {'error': 'Authentication required. Please provide valid credentials.'}, 
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+            
+            try:
+                end = _parse_query_datetime(request.GET.get('end')) or datetime.utcnow()
+                start = _parse_query_datetime(request.GET.get('start')) or end - timedelta(days=30)
+            except (ValueError, OverflowError):
+                return Response(
+                    {'error': 'start and end must be ISO 8601 dates or datetimes'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            try:
+                volume = ClaimVolumeRollup(payor_id).get_volume(start, end)
+            except ValueError as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             response_data = {
                 'success': True,
-                'summary': {
-                    'total_claims': total_claims,
-                    'pending_claims': pending_claims,
-                    'approved_claims': approved_claims,
-                    'rejected_claims': rejected_claims,
-                    'total_amount': total_amount,
-                    'approval_rate': (approved_claims / total_claims * 100) if total_claims > 0 else 0
-                },
+                'volume': volume,
                 'payor_id': payor_id
             }
             
             return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"Error in PayorClaimsSummaryAPIView: {str(e)}")
+            logger.error(f"Error in PayorClaimsVolumeAPIView: {str(e)}")
             return Response(
-                {'error': 'Failed to load claims summary. Please try again.'}, 
+                {'error': 'Failed to load claim volume. Please try again.'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _get_payor_id_from_request(self, request):
-        """Extract payor_id from JWT token or custom headers"""
+
+
+class PayorClaimsSummaryAPIView(APIView):
+    """Claims summary API endpoint"""
+    permission_classes = [AllowAny]
+    authentication_classes = [PayorAuthentication]
+    
+    def get(self, request):
+        """Get claims summary for the authenticated payor"""
         try:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                try:
-                    from django.conf import settings
-                    import jwt
-                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-                    return payload.get('user_id')
-                except jwt.ExpiredSignatureError:
-                    logger.warning("JWT token expired")
-                except jwt.InvalidTokenError as e:
-                    logger.warning(f"Invalid JWT token: {e}")
-                    
-            payor_email = request.headers.get('X-Payor-Email')
-            payor_password = request.headers.get('X-Payor-Password')
+            payor_id = getattr(request.user, 'payor_id', None)
+            
+            if not payor_id:
+                return Response(
+                    {'error': 'Authentication required. Please provide valid credentials.'}, 
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
             
-            if payor_email and payor_password:
-                payor_model = PayorModel()
-                payor = payor_model.authenticate(payor_email, payor_password)
-                if payor:
-                    return payor.get('payor_id')
+            # Read incrementally maintained counters for this payor
+            claim_stats = ClaimStatsModel().get_stats(payor_id)
             
-            return None
+            response_data = {
+                'success': True,
+                'summary': _summarize_claim_stats(claim_stats),
+                'payor_id': payor_id
+            }
+            
+            return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"Error extracting payor_id: {str(e)}")
-            return None
+            logger.error(f"Error in PayorClaimsSummaryAPIView: {str(e)}")
+            return Response(
+                {'error': 'Failed to load claims summary. Please try again.'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
 
 class PayorAnalyticsAPIView(APIView):
     """Analytics API endpoint"""
     permission_classes = [AllowAny]
-    authentication_classes = []
+    authentication_classes = [PayorAuthentication]
     
     def get(self, request):
         """Get analytics data for the authenticated payor"""
         try:
-            payor_id = self._get_payor_id_from_request(request)
+            payor_id = getattr(request.user, 'payor_id', None)
             
             if not payor_id:
                 return Response(
@@ -1092,29 +1495,18 @@ class PayorAnalyticsAPIView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             
-            # Mock analytics data for now
+            try:
+                months = min(max(int(request.GET.get('months', 6)), 1), 36)
+                top_n = min(max(int(request.GET.get('top', 10)), 1), 50)
+            except ValueError:
+                return Response(
+                    {'error': 'months and top must be integers'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
             response_data = {
                 'success': True,
-                'analytics': {
-                    'claims_trend': [
-                        {'month': 'Jan', 'claims': 45, 'approved': 38},
-                        {'month': 'Feb', 'claims': 52, 'approved': 44},
-                        {'month': 'Mar', 'claims': 48, 'approved': 41},
-                        {'month': 'Apr', 'claims': 58, 'approved': 49},
-                        {'month': 'May', 'claims': 61, 'approved': 52},
-                        {'month': 'Jun', 'claims': 55, 'approved': 47}
-                    ],
-                    'top_procedures': [
-                        {'code': '99213', 'name': 'Office Visit', 'count': 45},
-                        {'code': '99214', 'name': 'Extended Office Visit', 'count': 32},
-                        {'code': '90837', 'name': 'Psychotherapy', 'count': 28}
-                    ],
-                    'cost_analysis': {
-                        'total_paid': 125000,
-                        'average_claim_amount': 850,
-                        'monthly_trend': [8500, 9200, 8800, 9600, 10200, 9800]
-                    }
-                },
+                'analytics': ClaimAnalyticsRollup(payor_id).get_analytics(months=months, top_n=top_n),
                 'payor_id': payor_id
             }
             
@@ -1126,48 +1518,17 @@ class PayorAnalyticsAPIView(APIView):
                 {'error': 'Failed to load analytics. Please try again.'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-    
-    def _get_payor_id_from_request(self, request):
-        """Extract payor_id from JWT token or custom headers"""
-        try:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                try:
-                    from django.conf import settings
-                    import jwt
-                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-                    return payload.get('user_id')
-                except jwt.ExpiredSignatureError:
-                    logger.warning("JWT token expired")
-                except jwt.InvalidTokenError as e:
-                    logger.warning(f"Invalid JWT token: {e}")
-                    
-            payor_email = request.headers.get('X-Payor-Email')
-            payor_password = request.headers.get('X-Payor-Password')
-            
-            if payor_email and payor_password:
-                payor_model = PayorModel()
-                payor = payor_model.authenticate(payor_email, payor_password)
-                if payor:
-                    return payor.get('payor_id')
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error extracting payor_id: {str(e)}")
-            return None
 
 
 class PayorPreAuthAPIView(APIView):
     """Pre-authorization API endpoint"""
     permission_classes = [AllowAny]
-    authentication_classes = []
+    authentication_classes = [PayorAuthentication]
     
     def get(self, request):
         """Get pre-authorization requests for the authenticated payor"""
         try:
-            payor_id = self._get_payor_id_from_request(request)
+            payor_id = getattr(request.user, 'payor_id', None)
             
             if not payor_id:
                 return Response(
@@ -1175,41 +1536,43 @@ class PayorPreAuthAPIView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             
-            # Get pagination parameters
-            page = int(request.GET.get('page', 1))
-            limit = int(request.GET.get('limit', 20))
+            # Get queue parameters
+            status_filter = request.GET.get('status', 'pending')
+            try:
+                limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+            except ValueError:
+                return Response(
+                    {'error': 'limit must be an integer'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            cursor = request.GET.get('cursor')
             
-            # Mock pre-auth data for now - in production this would come from database
-            preauth_requests = [
-                {
-                    'id': 'PRE-001',
-                    'member_name': 'John Doe',
-                    'procedure': 'MRI Scan',
-                    'provider': 'City General Hospital',
-                    'requested_date': '2024-10-01',
-                    'status': 'pending',
-                    'urgency': 'routine'
-                },
-                {
-                    'id': 'PRE-002',
-                    'member_name': 'Jane Smith',
-                    'procedure': 'Surgery - Appendectomy',
-                    'provider': 'Metro Medical Center',
-                    'requested_date': '2024-10-02',
-                    'status': 'approved',
-                    'urgency': 'urgent'
-                }
-            ]
+            preauth_model = PreAuthorizationModel(payor_id=payor_id)
+            
+            # Most urgent, oldest requests first; each page is a single index seek
+            try:
+                preauth_requests, next_cursor = preauth_model.get_queue(
+                    status=status_filter, cursor=cursor, limit=limit
+                )
+            except ValueError as e:
+                return Response(
+                    {'error': str(e)}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             response_data = {
                 'success': True,
-                'preauth_requests': preauth_requests,
-                'page': page,
+                'preauth_requests': [self._serialize_preauth(preauth) for preauth in preauth_requests],
+                'status': status_filter,
                 'limit': limit,
-                'total': len(preauth_requests),
+                'next_cursor': next_cursor,
                 'payor_id': payor_id
             }
             
+            # Counting scans the whole status range, so totals are opt-in
+            if request.GET.get('include_total', '').lower() in ('1', 'true', 'yes'):
+                response_data['total'] = preauth_model.count_by_status(status_filter)
+            
             return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -1219,33 +1582,11 @@ class PayorPreAuthAPIView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _get_payor_id_from_request(self, request):
-        """Extract payor_id from JWT token or custom headers"""
-        try:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                try:
-                    from django.conf import settings
-                    import jwt
-                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-                    return payload.get('user_id')
-                except jwt.ExpiredSignatureError:
-                    logger.warning("JWT token expired")
-                except jwt.InvalidTokenError as e:
-                    logger.warning(f"Invalid JWT token: {e}")
-                    
-            payor_email = request.headers.get('X-Payor-Email')
-            payor_password = request.headers.get('X-Payor-Password')
-            
-            if payor_email and payor_password:
-                payor_model = PayorModel()
-                payor = payor_model.authenticate(payor_email, payor_password)
-                if payor:
-                    return payor.get('payor_id')
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error extracting payor_id: {str(e)}")
-            return None
+    @staticmethod
+    def _serialize_preauth(preauth):
+        """Queue item with the summary keys the frontend list expects"""
+        return {
+            **preauth,
+            'id': preauth.get('preauth_id') or str(preauth['_id']),
+            'requested_date': preauth.get('created_date')
+        }
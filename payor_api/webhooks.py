@@ -0,0 +1,338 @@
+"""
+Provider webhook delivery for the HCMS Payor Backend
+Webhooks are written to a durable MongoDB outbox and delivered by a background
+worker pool with exponential-backoff retries, per-provider concurrency limits and
+dead-lettering, so claim submission never waits on a provider endpoint
+"""
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from bson import ObjectId
+from django.conf import settings
+from pymongo import ReturnDocument
+
+from .indexes import IndexRegistry
+from .models import MongoConnection
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_DISPATCHER_SETTINGS = {
+    'AUTOSTART': True,
+    'WORKERS': 8,
+    'PER_PROVIDER_CONCURRENCY': 2,
+    'MAX_ATTEMPTS': 8,
+    'BACKOFF_BASE_SECONDS': 5,
+    'BACKOFF_MAX_SECONDS': 3600,
+    'REQUEST_TIMEOUT_SECONDS': 10,
+    'POLL_INTERVAL_SECONDS': 2,
+    'LEASE_SECONDS': 60,
+}
+
+
+def get_dispatcher_settings():
+    return {**DEFAULT_DISPATCHER_SETTINGS, **getattr(settings, 'WEBHOOK_DISPATCHER', {})}
+
+
+class WebhookOutboxModel:
+    """Durable outbox of provider webhook deliveries"""
+    
+    def __init__(self):
+        self.db = MongoConnection.get_database()
+        self.collection = self.db.webhook_outbox
+        IndexRegistry.ensure(self.collection)
+    
+    def _new_delivery(self, provider_id, url, payload, headers=None):
+        now = datetime.utcnow()
+        return {
+            '_id': ObjectId(),
+            'provider_id': provider_id,
+            'url': url,
+            'payload': payload,
+            'headers': headers or {},
+            'status': 'pending',
+            'attempts': 0,
+            'next_attempt_at': now,
+            'created_date': now,
+            'last_updated': now
+        }
+    
+    def enqueue(self, provider_id, url, payload, headers=None):
+        """Queue a single webhook delivery"""
+        delivery = self._new_delivery(provider_id, url, payload, headers)
+        self.collection.insert_one(delivery)
+        return delivery['_id']
+    
+    def enqueue_many(self, deliveries):
+        """Queue several deliveries given as (provider_id, url, payload, headers) tuples"""
+        documents = [self._new_delivery(*delivery) for delivery in deliveries]
+        if documents:
+            self.collection.insert_many(documents, ordered=False)
+        return [document['_id'] for document in documents]
+    
+    def _in_flight_query(self, now):
+        """Deliveries leased by a live worker in any dispatcher process"""
+        return {'status': 'in_flight', 'lease_expires_at': {'$gt': now}}
+    
+    def in_flight_counts(self, now=None):
+        """{provider_id: unexpired in-flight leases} across every dispatcher process"""
+        pipeline = [
+            {'$match': self._in_flight_query(now or datetime.utcnow())},
+            {'$group': {'_id': '$provider_id', 'count': {'$sum': 1}}}
+        ]
+        return {row['_id']: row['count'] for row in self.collection.aggregate(pipeline)}
+    
+    def claim_next(self, per_provider_limit, lease_seconds=60):
+        """Atomically lease the next due delivery whose provider is below its in-flight limit"""
+        now = datetime.utcnow()
+        saturated = {
+            provider_id for provider_id, count in self.in_flight_counts(now).items()
+            if count >= per_provider_limit
+        }
+        
+        while True:
+            query = {
+                '$or': [
+                    {'status': 'pending', 'next_attempt_at': {'$lte': now}},
+                    # Deliveries whose worker died mid-flight become due again
+                    {'status': 'in_flight', 'lease_expires_at': {'$lte': now}}
+                ]
+            }
+            if saturated:
+                query['provider_id'] = {'$nin': list(saturated)}
+            
+            delivery = self.collection.find_one_and_update(
+                query,
+                {
+                    '$set': {
+                        'status': 'in_flight',
+                        'lease_expires_at': now + timedelta(seconds=lease_seconds),
+                        'last_updated': now
+                    }
+                },
+                sort=[('next_attempt_at', 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if delivery is None:
+                return None
+            
+            # Another process may have leased for the same provider since the count; recount with our
+            # lease in place and give it back if the provider is now over its limit
+            provider_id = delivery['provider_id']
+            in_flight = self.collection.count_documents({'provider_id': provider_id, **self._in_flight_query(now)})
+            if in_flight <= per_provider_limit:
+                return delivery
+            
+            self.collection.update_one(
+                {'_id': delivery['_id'], 'lease_expires_at': delivery['lease_expires_at']},
+                {'$set': {'status': 'pending', 'last_updated': now}, '$unset': {'lease_expires_at': ''}}
+            )
+            saturated.add(provider_id)
+    
+    def mark_delivered(self, delivery_id, status_code):
+        """Record a successful delivery"""
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {'_id': delivery_id},
+            {
+                '$set': {
+                    'status': 'delivered',
+                    'delivered_date': now,
+                    'last_status_code': status_code,
+                    'last_updated': now
+                },
+                '$inc': {'attempts': 1},
+                '$unset': {'lease_expires_at': ''}
+            }
+        )
+    
+    def mark_failed(self, delivery, error, max_attempts, backoff_base, backoff_max):
+        """Schedule a retry with exponential backoff, or dead-letter the delivery"""
+        now = datetime.utcnow()
+        attempts = delivery.get('attempts', 0) + 1
+        update = {
+            'attempts': attempts,
+            'last_error': error,
+            'last_updated': now
+        }
+        
+        if attempts >= max_attempts:
+            update['status'] = 'dead'
+            update['dead_lettered_date'] = now
+        else:
+            delay = min(backoff_max, backoff_base * (2 ** (attempts - 1)))
+            # Jitter keeps retries for a recovering provider from arriving in lockstep
+            delay = delay * random.uniform(0.8, 1.2)
+            update['status'] = 'pending'
+            update['next_attempt_at'] = now + timedelta(seconds=delay)
+        
+        self.collection.update_one(
+            {'_id': delivery['_id']},
+            {'$set': update, '$unset': {'lease_expires_at': ''}}
+        )
+        return update['status']
+    
+    def get_dead_letters(self, provider_id=None, limit=100):
+        """Get dead-lettered deliveries for inspection"""
+        query = {'status': 'dead'}
+        if provider_id:
+            query['provider_id'] = provider_id
+        return list(self.collection.find(query).sort('dead_lettered_date', -1).limit(limit))
+    
+    def requeue_dead_letters(self, provider_id=None):
+        """Give dead-lettered deliveries a fresh set of attempts"""
+        query = {'status': 'dead'}
+        if provider_id:
+            query['provider_id'] = provider_id
+        
+        now = datetime.utcnow()
+        result = self.collection.update_many(
+            query,
+            {'$set': {'status': 'pending', 'attempts': 0, 'next_attempt_at': now, 'last_updated': now}}
+        )
+        return result.modified_count
+
+
+class WebhookDispatcher:
+    """Background worker pool draining the webhook outbox"""
+    
+    def __init__(self, config=None):
+        self.config = config or get_dispatcher_settings()
+        self.outbox = WebhookOutboxModel()
+        self._executor = None
+        self._poller = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.config['WORKERS'])
+    
+    @property
+    def running(self):
+        return self._poller is not None and self._poller.is_alive()
+    
+    def start(self):
+        """Start the poller thread and worker pool (idempotent)"""
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config['WORKERS'],
+                thread_name_prefix='webhook-worker'
+            )
+            self._poller = threading.Thread(
+                target=self._poll_loop,
+                name='webhook-dispatcher',
+                daemon=True
+            )
+            self._poller.start()
+            logger.info(f"Webhook dispatcher started with {self.config['WORKERS']} workers")
+    
+    def stop(self, wait=True):
+        """Stop polling; in-flight deliveries finish or are re-leased later"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._poller:
+            self._poller.join()
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+    
+    def notify(self):
+        """Wake the poller after new deliveries are queued"""
+        self._wakeup.set()
+    
+    def _poll_loop(self):
+        while not self._stopping.is_set():
+            self._slots.acquire()
+            try:
+                # The per-provider limit is enforced against leases in MongoDB, so it holds across
+                # every process running a dispatcher
+                delivery = self.outbox.claim_next(
+                    self.config['PER_PROVIDER_CONCURRENCY'],
+                    lease_seconds=self.config['LEASE_SECONDS']
+                )
+            except Exception as e:
+                logger.error(f"Webhook outbox poll failed: {str(e)}")
+                delivery = None
+            
+            if delivery is None:
+                self._slots.release()
+                self._wakeup.wait(self.config['POLL_INTERVAL_SECONDS'])
+                self._wakeup.clear()
+                continue
+            
+            self._executor.submit(self._deliver, delivery)
+    
+    def _deliver(self, delivery):
+        provider_id = delivery['provider_id']
+        try:
+            response = requests.post(
+                delivery['url'],
+                json=delivery['payload'],
+                headers=delivery.get('headers') or {'Content-Type': 'application/json'},
+                timeout=self.config['REQUEST_TIMEOUT_SECONDS']
+            )
+            
+            if 200 <= response.status_code < 300:
+                self.outbox.mark_delivered(delivery['_id'], response.status_code)
+                logger.info(f"Webhook sent successfully to provider {provider_id} for claim {delivery['payload'].get('claim_id')}")
+                return
+            
+            error = f"HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+        except Exception as e:
+            logger.error(f"Unexpected webhook delivery error for provider {provider_id}: {str(e)}")
+            error = str(e)
+        finally:
+            self._slots.release()
+            self._wakeup.set()
+        
+        try:
+            outcome = self.outbox.mark_failed(
+                delivery,
+                error,
+                self.config['MAX_ATTEMPTS'],
+                self.config['BACKOFF_BASE_SECONDS'],
+                self.config['BACKOFF_MAX_SECONDS']
+            )
+            if outcome == 'dead':
+                logger.error(f"Webhook to provider {provider_id} dead-lettered after {self.config['MAX_ATTEMPTS']} attempts: {error}")
+            else:
+                logger.warning(f"Webhook failed for provider {provider_id}, will retry: {error}")
+        except Exception as e:
+            logger.error(f"Failed to record webhook failure for provider {provider_id}: {str(e)}")
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Process-wide dispatcher instance"""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = WebhookDispatcher()
+    return _dispatcher
+
+
+def enqueue_webhooks(deliveries):
+    """
+    Queue webhook deliveries given as (provider_id, url, payload, headers) tuples
+    Starts the in-process dispatcher unless WEBHOOK_DISPATCHER['AUTOSTART'] is off
+    (e.g. when run_webhook_dispatcher runs as a dedicated process)
+    """
+    delivery_ids = WebhookOutboxModel().enqueue_many(deliveries)
+    
+    if get_dispatcher_settings()['AUTOSTART']:
+        dispatcher = get_dispatcher()
+        dispatcher.start()
+        dispatcher.notify()
+    
+    return delivery_ids
@@ -72,8 +72,22 @@ DATABASES = {
 
 # MongoDB Configuration
 MONGODB_SETTINGS = {
-    'HOST': 'mongodb://localhost:27017/',
-    'DB_NAME': 'hcms_payor_db',
+    'HOST': os.environ.get('MONGODB_HOST', 'mongodb://localhost:27017/'),
+    'DB_NAME': os.environ.get('MONGODB_DATABASE', 'hcms_payor_db'),
+    # MongoClient pool options; compressors are used only if their packages (zstandard, python-snappy) are installed
+    'POOL': {
+        'maxPoolSize': int(os.environ.get('MONGODB_MAX_POOL_SIZE', 100)),
+        'minPoolSize': int(os.environ.get('MONGODB_MIN_POOL_SIZE', 10)),
+        'maxIdleTimeMS': 300000,
+        'waitQueueTimeoutMS': 2000,  # Fail fast instead of queueing requests behind an exhausted pool
+        'compressors': 'zstd,snappy,zlib',
+    },
+    # Read preference per workload; claim reads and writes use the primary
+    'READ_PREFERENCES': {
+        'analytics': 'secondaryPreferred',
+        'export': 'secondaryPreferred',
+    },
+    'MAX_STALENESS_SECONDS': 90,  # Secondaries lagging further than this are not used (-1 disables)
     'COLLECTIONS': {
         'claims': 'hipaa_claims',
         'analytics': 'claim_analytics',
@@ -128,10 +142,87 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Allow custom MongoDB auth
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'payor_api.renderers.BSONJSONRenderer',  # Encodes ObjectId/datetime/Decimal128 directly; uses orjson if installed
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50
 }
 
+# In-process cache for decoded JWTs and verified X-Payor-* header credentials
+PAYOR_AUTH_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TTL_SECONDS': 300,
+    'NEGATIVE_TTL_SECONDS': 30,
+}
+
+# Payor business-rule settings cache (pre-auth limits); updates invalidate immediately in-process
+PAYOR_SETTINGS_CACHE = {
+    'MAX_ENTRIES': 1000,
+    'TTL_SECONDS': 60,  # Upper bound on staleness for changes made by other processes
+}
+
+# Provider webhook signing secret and background delivery settings
+WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET', 'webhook_secret_key')
+
+WEBHOOK_DISPATCHER = {
+    'AUTOSTART': True,  # Set False when running `manage.py run_webhook_dispatcher` separately
+    'WORKERS': 8,
+    'PER_PROVIDER_CONCURRENCY': 2,
+    'MAX_ATTEMPTS': 8,
+    'BACKOFF_BASE_SECONDS': 5,
+    'BACKOFF_MAX_SECONDS': 3600,
+    'REQUEST_TIMEOUT_SECONDS': 10,
+    'POLL_INTERVAL_SECONDS': 2,
+    'LEASE_SECONDS': 60,
+}
+
+# In-memory insurance -> payor routing table refresh
+INSURANCE_ROUTING = {
+    'USE_CHANGE_STREAMS': True,  # Requires a replica set; falls back to version-stamp polling
+    'POLL_INTERVAL_SECONDS': 30,
+    'MAX_AGE_SECONDS': 600,
+}
+
+# Compiled policy coverage cache
+POLICY_COVERAGE_CACHE = {
+    'MAX_ENTRIES': 50000,
+    'TTL_SECONDS': 3600,
+    'REVALIDATE_SECONDS': 30,  # Recheck policy last_updated after this long
+}
+
+# Materialized analytics_<payor_id> monthly rollups behind /api/analytics/
+ANALYTICS_ROLLUP = {
+    'REFRESH_SECONDS': 300,  # Incremental refresh on read when the last refresh is older than this
+    'REFRESH_LEASE_SECONDS': 120,  # Only the request holding this lease refreshes; others serve existing buckets
+    'TOP_PROCEDURES_PER_MONTH': 50,
+    'WATERMARK_OVERLAP_SECONDS': 5,
+}
+
+# Claim timelines keep the newest entries inline; older ones move to claim_events_<payor_id>
+CLAIM_TIMELINE = {
+    'INLINE_LIMIT': 20,
+}
+
+# Reviewer leases on the manual review queue behind /api/payor/review/queue/
+REVIEW_QUEUE = {
+    'LEASE_SECONDS': 300,  # Leases not renewed by a heartbeat within this long return to the queue
+    'MAX_LEASE_SECONDS': 1800,
+    'MAX_LEASE_COUNT': 25,  # Claims leased per request
+}
+
+# Thread pool for the concurrent lookups behind /api/payor/review/<claim_id>/
+CLAIM_DETAIL = {
+    'WORKERS': 16,
+}
+
+# Maximum number of claims accepted by one /api/claims/bulk/ request
+BULK_CLAIMS_MAX_BATCH = 5000
+
+# Maximum number of decisions accepted by one /api/payor/review/decisions/ request
+BATCH_DECISIONS_MAX = 1000
+
 # CORS settings for frontend integration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
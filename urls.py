@@ -17,9 +17,15 @@ def api_status(request):
             'authentication': '/api/login/',
             'mongo_authentication': '/api/mongo/auth/',
             'payor_dashboard': '/api/payor/dashboard-api/',
+            'payor_dashboard_async': '/api/async/payor/dashboard-api/',
             'payor_claims': '/api/payor/review/',  
+            'payor_claim_decisions': '/api/payor/review/decisions/',
+            'payor_review_queue': '/api/payor/review/queue/',
             'policies': '/api/policies/',
             'claims': '/api/claims/',
+            'claims_bulk': '/api/claims/bulk/',
+            'claims_export': '/api/claims/export/',
+            'claims_volume': '/api/claims/volume/',
             'analytics': '/api/analytics/',
             'pre_auth': '/api/pre-auth/'
         },